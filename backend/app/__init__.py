@@ -2,7 +2,30 @@ from flask import Flask
 from flask_cors import CORS
 from flask_restx import Api
 import logging
-from app.database import db, migrate
+from app.database import db, migrate, worker_concurrency, worker_engine_options
+from app.utils.cache import TTLCache
+from app.utils.catalog_cache import init_product_list_cache
+from app.utils.metrics import init_metrics
+from app.utils.query_guard import init_query_guard
+from app.utils.replicas import init_replicas, replica_binds
+from app.utils.scheduler import init_scheduler
+from app.utils.sqlite import init_sqlite_profile, sqlite_engine_options
+
+# CORS das rotas /api/* (também aplicado pelas leituras async do modo ASGI)
+CORS_OPTIONS = {
+    "origins": [
+        "http://localhost:5173",
+        "http://localhost:3000",
+        "http://127.0.0.1:5173",
+        "http://127.0.0.1:3000"
+    ],
+    "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    "allow_headers": ["Content-Type", "Authorization", "If-None-Match", "If-Modified-Since"],
+    "expose_headers": ["ETag", "Last-Modified"],
+    # O frontend roda em outra origem: sem credenciais o navegador não envia o
+    # cookie de read-after-write das réplicas (READ_AFTER_WRITE_COOKIE)
+    "supports_credentials": True
+}
 
 def create_app(config_class=None):
     """Factory pattern para criar a aplicação Flask"""
@@ -15,23 +38,55 @@ def create_app(config_class=None):
     else:
         app.config.from_object('config.DevelopmentConfig')
     
+    # Réplicas de leitura viram binds replica_N (ver app/utils/replicas.py)
+    if app.config.get('DATABASE_REPLICA_URLS'):
+        app.config['SQLALCHEMY_BINDS'] = {
+            **(app.config.get('SQLALCHEMY_BINDS') or {}),
+            **replica_binds(app.config['DATABASE_REPLICA_URLS'])
+        }
+    
+    # Pool do perfil SQLite (WAL) e, por processo, orçamento global de conexões dividido entre os workers (wsgi.py)
+    app.config['WEB_CONCURRENCY'], app.config['WEB_THREADS'] = worker_concurrency(app.config)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = sqlite_engine_options(app.config)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = worker_engine_options(app.config)
+    
     # Inicializar extensões
     db.init_app(app)
+    
+    # PRAGMAs de alto throughput (WAL, synchronous=NORMAL...) em cada conexão SQLite nova
+    init_sqlite_profile(app, db)
     migrate.init_app(app, db)
     
+    # Roteamento de leituras para as réplicas, com health check periódico
+    replicas = init_replicas(app, db)
+    if replicas is not None:
+        init_scheduler(
+            app,
+            'replica_health_check',
+            lambda: replicas.check(
+                {name: db.engines[name] for name in replicas.names},
+                app.config['REPLICA_HEALTH_CHECK_QUERY']
+            ),
+            app.config['REPLICA_HEALTH_CHECK_INTERVAL']
+        )
+    
+    # Cache em memória de cupons por código (por processo)
+    app.extensions['coupon_cache'] = TTLCache(
+        maxsize=app.config.get('COUPON_CACHE_MAXSIZE', 1024),
+        ttl=app.config.get('COUPON_CACHE_TTL', 30)
+    )
+    
+    # Cache de resultados da listagem de produtos, invalidado por geração a cada escrita no catálogo
+    init_product_list_cache(app)
+    
     # Configurar CORS para liberar o Vite (5173), React (3000) e variações localhost
-    CORS(app, resources={
-        r"/api/*": {
-            "origins": [
-                "http://localhost:5173",
-                "http://localhost:3000",
-                "http://127.0.0.1:5173",
-                "http://127.0.0.1:3000"
-            ],
-            "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
-        }
-    })
+    CORS(app, resources={r"/api/*": CORS_OPTIONS})
+    
+    # Métricas por requisição (latência, status e queries SQL)
+    init_metrics(app)
+    
+    # Orçamento de queries e detecção de N+1 (testes e desenvolvimento)
+    init_query_guard(app)
     
     # Configurar logging
     if not app.debug and not app.testing:
@@ -51,12 +106,37 @@ def create_app(config_class=None):
     from app.api import register_blueprints
     register_blueprints(api)
     
+    # Comandos de manutenção (flask archive-applications, flask run-discount-schedule, flask sweep-coupon-statuses)
+    from app.cli import register_commands
+    register_commands(app)
+    
+    # Agendador das janelas de desconto (uma thread por processo)
+    if app.config.get('DISCOUNT_SCHEDULER_ENABLED'):
+        from app.services.discount_schedule_service import DiscountScheduleService
+        init_scheduler(
+            app,
+            'discount_scheduler',
+            lambda: DiscountScheduleService.run_due(batch_size=app.config['DISCOUNT_SCHEDULER_BATCH_SIZE']),
+            app.config['DISCOUNT_SCHEDULER_INTERVAL']
+        )
+    
+    # Varredura da situação persistida dos cupons (sustenta o índice parcial de vigentes)
+    if app.config.get('COUPON_STATUS_SWEEPER_ENABLED'):
+        from app.services.coupon_service import CouponService
+        init_scheduler(
+            app,
+            'coupon_status_sweeper',
+            CouponService.sweep_statuses,
+            app.config['COUPON_STATUS_SWEEP_INTERVAL']
+        )
+    
     # Importar modelos (importante para migrations)
-    from app.models import product, coupon, product_coupon_application
+    from app.models import product, coupon, product_coupon_application, product_coupon_application_archive
     
     # Criar tabelas no contexto da aplicação (opcional, só para dev/teste)
+    # (só no primário: as réplicas são somente leitura)
     with app.app_context():
-        db.create_all()
+        db.create_all(bind_key=None)
     
     # Handler de erro global
     @app.errorhandler(404)
@@ -11,6 +11,10 @@ def register_blueprints(api):
     from app.api.coupons.routes import coupons_ns
     api.add_namespace(coupons_ns, path='/coupons')
 
+    # Métricas no formato Prometheus
+    from app.api.metrics.routes import metrics_ns
+    api.add_namespace(metrics_ns, path='/metrics')
+
     # Blueprint para health check
     from app.api.common.routes import common_ns
     api.add_namespace(common_ns, path='/health')
@@ -1,5 +1,6 @@
 from flask_restx import Namespace, Resource
-from flask import jsonify
+from flask import current_app, jsonify
+from app.services.coupon_service import CouponService
 
 common_ns = Namespace('health', description='Endpoints de saúde da API')
 
@@ -30,4 +31,24 @@ class APIRoot(Resource):
                 'health': '/api/v1/health/',
                 'docs': '/api/docs/'
             }
-        }
\ No newline at end of file
+        }
+
+@common_ns.route('/cache')
+class CacheStatsResource(Resource):
+    def get(self):
+        """Estatísticas dos caches em memória (acertos, falhas, tamanho)"""
+        product_lists = current_app.extensions.get('product_list_cache')
+        return {
+            'coupons': CouponService.cache_stats(),
+            'productLists': product_lists.stats() if product_lists is not None else None
+        }
+
+
+@common_ns.route('/replicas')
+class ReplicaStatsResource(Resource):
+    def get(self):
+        """Réplicas de leitura: saúde e leituras atendidas por cada uma"""
+        replicas = current_app.extensions.get('replicas')
+        if replicas is None:
+            return {'enabled': False}
+        return {'enabled': True, **replicas.stats()}
@@ -1,6 +1,8 @@
 from flask import request
 from flask_restx import Namespace, Resource, fields
 from app.services.coupon_service import CouponService
+from app.utils.decorators import conditional_get, conditional_payload
+from app.utils.fast_json import json_response
 
 
 coupons_ns = Namespace('coupons', description='Operações com cupons promocionais')
@@ -36,6 +38,7 @@ coupon_response_model = coupons_ns.model('CouponResponse', {
     'usage_limit': fields.Integer(description='Limite de uso'),
     'usage_count': fields.Integer(description='Quantidade de usos'),
     'is_active': fields.Boolean(description='Se o cupom está ativo'),
+    'status': fields.String(description='Situação persistida', enum=['scheduled', 'valid', 'expired', 'exhausted', 'inactive']),
     'is_valid': fields.Boolean(description='Se o cupom está válido'),
     'is_expired': fields.Boolean(description='Se o cupom está expirado'),
     'remaining_uses': fields.Integer(description='Usos restantes'),
@@ -43,31 +46,42 @@ coupon_response_model = coupons_ns.model('CouponResponse', {
     'updatedAt': fields.String(description='Data de atualização')
 })
 
+coupon_list_model = coupons_ns.model('CouponList', {
+    'data': fields.List(fields.Nested(coupon_response_model)),
+    'meta': fields.Raw(description='Metadados da paginação')
+})
+
+def coupon_list_filters(args):
+    """Filtros da listagem a partir da query string (também usado pelo modo ASGI)"""
+    filters = {
+        'search': args.get('search'),
+        'min_discount': args.get('min_discount', type=float),
+        'max_discount': args.get('max_discount', type=float),
+        'is_valid': args.get('is_valid', type=bool),
+        'page': args.get('page', 1, type=int),
+        'limit': args.get('limit', 10, type=int),
+        'sort_by': args.get('sort_by', 'created_at'),
+        'sort_order': args.get('sort_order', 'desc')
+    }
+    # Remover filtros None
+    return {k: v for k, v in filters.items() if v is not None}
+
 @coupons_ns.route('/')
 class CouponListResource(Resource):
     """Listagem e criação de cupons"""
     
     @coupons_ns.doc('list_coupons')
-    @coupons_ns.marshal_list_with(coupon_response_model, envelope='data')
+    @coupons_ns.response(200, 'Success', coupon_list_model)
+    @conditional_payload
     def get(self):
         """Lista cupons disponíveis"""
         try:
             # Pegar filtros da query string
-            filters = {
-                'search': request.args.get('search'),
-                'min_discount': request.args.get('min_discount', type=float),
-                'max_discount': request.args.get('max_discount', type=float),
-                'is_valid': request.args.get('is_valid', type=bool),
-                'page': request.args.get('page', 1, type=int),
-                'limit': request.args.get('limit', 10, type=int),
-                'sort_by': request.args.get('sort_by', 'created_at'),
-                'sort_order': request.args.get('sort_order', 'desc')
-            }
-            # Remover filtros None
-            filters = {k: v for k, v in filters.items() if v is not None}
+            filters = coupon_list_filters(request.args)
             
             result = CouponService.list_coupons(filters)
-            return result
+            # Caminho rápido: _serialize_coupon já entrega o formato final, sem marshal_with
+            return json_response({'data': result['coupons'], 'meta': result['meta']})
         except Exception as e:
             coupons_ns.abort(500, f'Erro interno: {str(e)}')
     
@@ -105,6 +119,7 @@ class CouponResource(Resource):
     """Operações em cupom específico"""
     
     @coupons_ns.doc('get_coupon')
+    @conditional_get(lambda self, coupon_code: CouponService.get_coupon_version(coupon_code))
     @coupons_ns.marshal_with(coupon_response_model)
     def get(self, coupon_code):
         """Detalhes de um cupom pelo código"""
@@ -0,0 +1,49 @@
+from flask import current_app
+from flask_restx import Namespace, Resource
+from werkzeug.wrappers import Response
+from app.services.coupon_service import CouponService
+
+metrics_ns = Namespace('metrics', description='Métricas da API (formato Prometheus)')
+
+@metrics_ns.route('/')
+class MetricsResource(Resource):
+    """Exposição de métricas para o Prometheus"""
+
+    @metrics_ns.doc('metrics')
+    def get(self):
+        """Contadores de requisições, histogramas de latência e queries SQL por rota"""
+        cache_stats = CouponService.cache_stats()
+        gauges = [
+            ('coupon_cache_hits', 'Acertos do cache de cupons', [({}, cache_stats['hits'])]),
+            ('coupon_cache_misses', 'Falhas do cache de cupons', [({}, cache_stats['misses'])]),
+            ('coupon_cache_size', 'Entradas no cache de cupons', [({}, cache_stats['size'])]),
+        ]
+        product_lists = current_app.extensions.get('product_list_cache')
+        if product_lists is not None:
+            list_stats = product_lists.stats()
+            gauges += [
+                ('product_list_cache_hits', 'Acertos do cache da listagem de produtos', [({}, list_stats['hits'])]),
+                ('product_list_cache_misses', 'Falhas do cache da listagem de produtos', [({}, list_stats['misses'])]),
+                ('product_list_cache_hit_rate', 'Taxa de acerto do cache da listagem de produtos',
+                 [({}, list_stats['hitRate'])]),
+                ('product_list_cache_bytes', 'Memória aproximada do cache da listagem (bytes)',
+                 [({}, list_stats['bytes'])]),
+                ('product_list_cache_evictions', 'Entradas despejadas pelo limite de memória',
+                 [({}, list_stats['evictions'])]),
+                ('catalog_generation', 'Geração do catálogo (incrementada a cada escrita confirmada)',
+                 [({}, list_stats['generation'])]),
+            ]
+
+        replicas = current_app.extensions.get('replicas')
+        if replicas is not None:
+            replica_stats = replicas.stats()
+            gauges += [
+                ('db_replica_healthy', 'Réplica de leitura no rodízio (1) ou em quarentena (0)',
+                 [({'replica': name}, int(stats['healthy'])) for name, stats in replica_stats['replicas'].items()]),
+                ('db_replica_reads', 'Requisições de leitura atendidas por réplica',
+                 [({'replica': name}, stats['reads']) for name, stats in replica_stats['replicas'].items()]),
+                ('db_replica_primary_fallbacks', 'Leituras enviadas ao primário por falta de réplica saudável',
+                 [({}, replica_stats['primary_fallbacks'])]),
+            ]
+        body = current_app.extensions['metrics'].render(extra_gauges=gauges)
+        return Response(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,8 +1,12 @@
 from flask import request, jsonify
-from flask import jsonify
+from flask import jsonify, Response, stream_with_context
 from flask_restx import Namespace, Resource, fields
-from app.services.product_service import ProductService
-from app.utils.decorators import handle_exceptions
+from app.services.product_service import InsufficientStockError, ProductService
+from app.services.product_import_service import ProductImportService
+from app.services.product_export_service import ProductExportService
+from app.services.application_archive_service import ApplicationArchiveService
+from app.utils.decorators import handle_exceptions, conditional_get, conditional_payload
+from app.utils.fast_json import json_response
 import logging
 
 # Criar namespace para produtos
@@ -30,6 +34,7 @@ product_output_model = products_ns.model('ProductOutput', {
     'isOutOfStock': fields.Boolean(description='Produto sem estoque'),
     'is_active': fields.Boolean(description='Produto ativo'),
     'discount': fields.Raw(description='Informações do desconto ativo'),
+    'scheduledDiscount': fields.Raw(description='Desconto agendado (ativado automaticamente no início da janela)'),
     'hasCouponApplied': fields.Boolean(description='Possui cupom aplicado'),
     'created_at': fields.String(description='Data de criação'),  # ← MUDOU
     'updated_at': fields.String(description='Data de atualização')  # ← MUDOU
@@ -42,13 +47,70 @@ product_list_model = products_ns.model('ProductList', {
 
 discount_input_model = products_ns.model('DiscountInput', {
     'percentage': fields.Float(required=True, min=1, max=80,
-                              description='Percentual de desconto (1-80)')
+                              description='Percentual de desconto (1-80)'),
+    'startsAt': fields.String(description='Início do desconto (ISO 8601, UTC); no futuro, o desconto é agendado'),
+    'endsAt': fields.String(description='Fim do desconto (ISO 8601, UTC); o desconto expira automaticamente')
+})
+
+bulk_discount_input_model = products_ns.model('BulkDiscountInput', {
+    'percentage': fields.Float(required=True, min=1, max=80,
+                              description='Percentual de desconto (1-80)'),
+    'productIds': fields.List(fields.Integer, description='IDs dos produtos'),
+    'search': fields.String(description='Busca por nome ou descrição'),
+    'minPrice': fields.Float(description='Preço final mínimo'),
+    'maxPrice': fields.Float(description='Preço final máximo'),
+    'minStock': fields.Integer(description='Estoque mínimo'),
+    'maxStock': fields.Integer(description='Estoque máximo'),
+    'startsAt': fields.String(description='Início do desconto (ISO 8601, UTC); no futuro, o desconto é agendado'),
+    'endsAt': fields.String(description='Fim do desconto (ISO 8601, UTC); o desconto expira automaticamente')
+})
+
+stock_operation_model = products_ns.model('StockOperation', {
+    'quantity': fields.Integer(required=True, min=1, max=999999,
+                              description='Quantidade de unidades')
+})
+
+stock_result_model = products_ns.model('StockOperationResult', {
+    'productId': fields.Integer(description='ID do produto'),
+    'quantity': fields.Integer(description='Quantidade reservada/devolvida'),
+    'stock': fields.Integer(description='Estoque após a operação')
+})
+
+stock_adjustment_model = products_ns.model('StockAdjustment', {
+    'productId': fields.Integer(description='ID do produto (ou name)'),
+    'name': fields.String(description='Nome do produto (ou productId)'),
+    'delta': fields.Integer(description='Variação do estoque (ou stock)'),
+    'stock': fields.Integer(min=0, max=999999, description='Estoque absoluto (ou delta)')
+})
+
+stock_batch_input_model = products_ns.model('StockBatchInput', {
+    'items': fields.List(fields.Nested(stock_adjustment_model), required=True,
+                        description='Ajustes de estoque; itens do mesmo produto são aplicados em ordem'),
+    'chunkSize': fields.Integer(min=1, max=10000, default=1000,
+                               description='Produtos por SELECT/UPDATE em lote (mesma transação)')
 })
 
 coupon_input_model = products_ns.model('CouponApplication', {
-    'code': fields.String(required=True, description='Código do cupom')
+    'code': fields.String(required=True, description='Código do cupom'),
+    'startsAt': fields.String(description='Início do desconto (ISO 8601, UTC); no futuro, o desconto é agendado'),
+    'endsAt': fields.String(description='Fim do desconto (ISO 8601, UTC); o desconto expira automaticamente')
 })
 
+def product_list_filters(args):
+    """Filtros da listagem a partir da query string (também usado pelo modo ASGI)"""
+    return {
+        'page': args.get('page', 1, type=int),
+        'limit': max(min(args.get('limit', 10, type=int), 50), 1),
+        'search': args.get('search', '').strip(),
+        'min_price': args.get('minPrice', type=float),
+        'max_price': args.get('maxPrice', type=float),
+        'has_discount': args.get('hasDiscount', type=bool),
+        'sort_by': args.get('sortBy'),
+        'sort_order': args.get('sortOrder', 'asc'),
+        'only_out_of_stock': args.get('onlyOutOfStock', type=bool),
+        'cursor': args.get('cursor')
+    }
+
 @products_ns.route('/')
 class ProductListResource(Resource):
     """Recurso para listagem e criação de produtos"""
@@ -60,38 +122,34 @@ class ProductListResource(Resource):
     @products_ns.param('minPrice', 'Preço mínimo', type=float)
     @products_ns.param('maxPrice', 'Preço máximo', type=float)
     @products_ns.param('hasDiscount', 'Filtrar produtos com desconto', type=bool)
-    @products_ns.param('sortBy', 'Campo para ordenação', type=str, 
-                      enum=['name', 'price', 'stock', 'created_at'])
+    @products_ns.param('sortBy', 'Campo para ordenação (padrão: relevance com busca, senão name)', type=str, 
+                      enum=['name', 'price', 'stock', 'created_at', 'relevance'])
     @products_ns.param('sortOrder', 'Direção da ordenação', type=str, 
                       enum=['asc', 'desc'], default='asc')
     @products_ns.param('onlyOutOfStock', 'Apenas produtos sem estoque', type=bool)
+    @products_ns.param('cursor', 'Cursor opaco (meta.nextCursor) para paginação por cursor; '
+                                 'envie vazio para iniciar a partir da primeira página', type=str)
+    @products_ns.response(200, 'Success', product_list_model)
+    @conditional_payload
     #@handle_exceptions
     def get(self):
         """Lista produtos com filtros avançados e paginação"""
 
         # Extrair e validar parâmetros
-        filters = {
-            'page': request.args.get('page', 1, type=int),
-            'limit': min(request.args.get('limit', 10, type=int), 50),
-            'search': request.args.get('search', '').strip(),
-            'min_price': request.args.get('minPrice', type=float),
-            'max_price': request.args.get('maxPrice', type=float),
-            'has_discount': request.args.get('hasDiscount', type=bool),
-            'sort_by': request.args.get('sortBy', 'name'),
-            'sort_order': request.args.get('sortOrder', 'asc'),
-            'only_out_of_stock': request.args.get('onlyOutOfStock', type=bool)
-        }
+        filters = product_list_filters(request.args)
 
         logging.info(f"Listando produtos com filtros: {filters}")
 
         # Chamar service
-        result = ProductService.list_products_with_discount_info(filters)
-        print("DEBUG result:", result)
+        try:
+            result = ProductService.list_products_with_discount_info(filters)
+        except ValueError as e:
+            products_ns.abort(400, str(e))
 
         # Verificar se obteve dados válidos
         if not result or 'products' not in result:
             logging.error("Service retornou resultado inválido")
-            return {'data': [], 'meta': {}}, 200
+            return json_response({'data': [], 'meta': {}})
 
         # Montar resposta no formato certo
         response_data = {
@@ -99,10 +157,10 @@ class ProductListResource(Resource):
             'meta': result['meta']
         }
 
-        logging.info(f"Response data keys: {list(response_data.keys())}")
-        logging.info(f"Data length: {len(response_data['data']) if response_data['data'] else 0}")
+        logging.debug(f"Data length: {len(response_data['data']) if response_data['data'] else 0}")
 
-        return response_data, 200
+        # Caminho rápido: os dicts do service já estão no formato final, sem marshal_with
+        return json_response(response_data)
 
        
     @products_ns.doc('create_product')
@@ -120,11 +178,100 @@ class ProductListResource(Resource):
         
         return product, 201
 
+@products_ns.route('/import')
+class ProductImportResource(Resource):
+    """Importação em massa de produtos"""
+
+    @products_ns.doc('import_products')
+    @products_ns.param('format', 'Formato do corpo (ndjson ou csv); padrão pelo Content-Type', type=str,
+                      enum=['ndjson', 'csv'])
+    @products_ns.param('mode', 'insert (padrão) ou upsert (atualiza produtos com o mesmo nome)', type=str,
+                      enum=['insert', 'upsert'], default='insert')
+    @products_ns.param('batchSize', 'Registros por transação (1-10000)', type=int, default=1000)
+    def post(self):
+        """Importa produtos em lote a partir de NDJSON ou CSV (corpo lido em streaming)"""
+
+        import_format = request.args.get('format')
+        if not import_format:
+            import_format = 'csv' if (request.mimetype or '').endswith('csv') else 'ndjson'
+        if import_format not in ('ndjson', 'csv'):
+            products_ns.abort(400, 'Formato deve ser ndjson ou csv')
+
+        mode = request.args.get('mode', 'insert')
+        if mode not in ('insert', 'upsert'):
+            products_ns.abort(400, 'Modo deve ser insert ou upsert')
+
+        batch_size = max(min(request.args.get('batchSize', 1000, type=int), 10000), 1)
+
+        logging.info(f"Importando produtos ({import_format}, modo {mode}, lotes de {batch_size})")
+
+        # O corpo é consumido linha a linha, sem carregar o arquivo inteiro em memória
+        if import_format == 'csv':
+            records = ProductImportService.parse_csv(request.stream)
+        else:
+            records = ProductImportService.parse_ndjson(request.stream)
+
+        report = ProductImportService.import_products(
+            records,
+            schema=product_input_model.__schema__,
+            upsert=mode == 'upsert',
+            batch_size=batch_size
+        )
+        return report, 200
+
+@products_ns.route('/export')
+class ProductExportResource(Resource):
+    """Exportação do catálogo completo em streaming"""
+
+    @products_ns.doc('export_products')
+    @products_ns.param('format', 'Formato da saída', type=str, enum=['ndjson', 'csv'], default='ndjson')
+    @products_ns.param('search', 'Busca por nome ou descrição', type=str)
+    @products_ns.param('minPrice', 'Preço mínimo', type=float)
+    @products_ns.param('maxPrice', 'Preço máximo', type=float)
+    @products_ns.param('minStock', 'Estoque mínimo', type=int)
+    @products_ns.param('maxStock', 'Estoque máximo', type=int)
+    @products_ns.param('hasDiscount', 'Filtrar produtos com desconto', type=bool)
+    @products_ns.param('onlyOutOfStock', 'Apenas produtos sem estoque', type=bool)
+    @products_ns.param('batchSize', 'Linhas buscadas por vez no banco (100-10000)', type=int, default=1000)
+    def get(self):
+        """Exporta produtos com informações de desconto em NDJSON ou CSV (streaming)"""
+
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in ('ndjson', 'csv'):
+            products_ns.abort(400, 'Formato deve ser ndjson ou csv')
+
+        filters = {
+            'search': request.args.get('search', '').strip(),
+            'min_price': request.args.get('minPrice', type=float),
+            'max_price': request.args.get('maxPrice', type=float),
+            'min_stock': request.args.get('minStock', type=int),
+            'max_stock': 0 if request.args.get('onlyOutOfStock', type=bool) else request.args.get('maxStock', type=int),
+            'has_discount': request.args.get('hasDiscount', type=bool),
+        }
+        batch_size = max(min(request.args.get('batchSize', 1000, type=int), 10000), 100)
+
+        logging.info(f"Exportando produtos ({export_format}) com filtros: {filters}")
+
+        if export_format == 'csv':
+            rows = ProductExportService.generate_csv(filters, batch_size)
+            mimetype = 'text/csv'
+        else:
+            rows = ProductExportService.generate_ndjson(filters, batch_size)
+            mimetype = 'application/x-ndjson'
+
+        # O gerador roda depois do return: stream_with_context mantém a sessão e o contexto vivos
+        return Response(
+            stream_with_context(rows),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename=products.{export_format}'}
+        )
+
 @products_ns.route('/<int:product_id>')
 class ProductResource(Resource):
     """Recurso para operações em produto específico"""
     
     @products_ns.doc('get_product')
+    @conditional_get(lambda self, product_id: ProductService.get_product_version(product_id))
     @products_ns.marshal_with(product_output_model)
     @handle_exceptions
     def get(self, product_id):
@@ -166,6 +313,74 @@ class ProductResource(Resource):
         
         return '', 204
 
+@products_ns.route('/stock/batch')
+class ProductStockBatchResource(Resource):
+    """Ajuste de estoque em lote (sincronização com o depósito)"""
+    
+    @products_ns.doc('adjust_stock_batch')
+    @products_ns.expect(stock_batch_input_model, validate=True)
+    @handle_exceptions
+    def post(self):
+        """Aplica ajustes de estoque (delta ou absoluto) a vários produtos numa única transação"""
+        
+        data = request.get_json()
+        items = data['items']
+        chunk_size = data.get('chunkSize') or 1000
+        
+        logging.info(f"Ajustando estoque em lote: {len(items)} itens (blocos de {chunk_size})")
+        
+        report = ProductService.adjust_stock_batch(items, chunk_size=chunk_size)
+        return report, 200
+
+@products_ns.route('/<int:product_id>/stock/reserve')
+class ProductStockReserveResource(Resource):
+    """Reserva atômica de estoque (checkout)"""
+    
+    @products_ns.doc('reserve_stock')
+    @products_ns.expect(stock_operation_model, validate=True)
+    @products_ns.response(200, 'Estoque reservado', stock_result_model)
+    @products_ns.response(409, 'Estoque insuficiente')
+    @handle_exceptions
+    def post(self, product_id):
+        """Reserva unidades do produto se houver estoque (nunca vende além do disponível)"""
+        
+        quantity = request.get_json()['quantity']
+        
+        try:
+            stock = ProductService.reserve_stock(product_id, quantity)
+        except InsufficientStockError as e:
+            return {'message': str(e), 'stock': e.available}, 409
+        except ValueError as e:
+            products_ns.abort(400, str(e))
+        
+        if stock is None:
+            products_ns.abort(404, 'Produto não encontrado')
+        
+        return {'productId': product_id, 'quantity': quantity, 'stock': stock}, 200
+
+@products_ns.route('/<int:product_id>/stock/release')
+class ProductStockReleaseResource(Resource):
+    """Devolução de estoque reservado"""
+    
+    @products_ns.doc('release_stock')
+    @products_ns.expect(stock_operation_model, validate=True)
+    @products_ns.response(200, 'Estoque devolvido', stock_result_model)
+    @handle_exceptions
+    def post(self, product_id):
+        """Devolve unidades ao estoque do produto (checkout cancelado)"""
+        
+        quantity = request.get_json()['quantity']
+        
+        try:
+            stock = ProductService.release_stock(product_id, quantity)
+        except ValueError as e:
+            products_ns.abort(400, str(e))
+        
+        if stock is None:
+            products_ns.abort(404, 'Produto não encontrado')
+        
+        return {'productId': product_id, 'quantity': quantity, 'stock': stock}, 200
+
 @products_ns.route('/<int:product_id>/discount/percent')
 class ProductPercentDiscountResource(Resource):
     """Aplicar desconto percentual"""
@@ -182,13 +397,50 @@ class ProductPercentDiscountResource(Resource):
         logging.info(f"Aplicando desconto {percentage}% ao produto {product_id}")
         
         try:
-            ProductService.apply_percentage_discount(product_id, percentage)
-            return {'message': 'Desconto aplicado com sucesso'}, 200
+            product = ProductService.apply_percentage_discount(
+                product_id, percentage, starts_at=data.get('startsAt'), ends_at=data.get('endsAt')
+            )
+            return {
+                'message': 'Desconto aplicado com sucesso',
+                'discount': product['discount'],
+                'scheduledDiscount': product['scheduledDiscount']
+            }, 200
         except ValueError as e:
             products_ns.abort(400, str(e))
         except Exception as e:
             products_ns.abort(422, str(e))
 
+@products_ns.route('/discount/percent')
+class ProductBulkPercentDiscountResource(Resource):
+    """Aplicar desconto percentual em massa"""
+
+    @products_ns.doc('apply_bulk_percent_discount')
+    @products_ns.expect(bulk_discount_input_model, validate=True)
+    def post(self):
+        """Aplica desconto percentual a todos os produtos que atendem ao filtro"""
+
+        data = request.get_json()
+        percentage = data.get('percentage')
+        filters = {
+            'product_ids': data.get('productIds'),
+            'search': (data.get('search') or '').strip(),
+            'min_price': data.get('minPrice'),
+            'max_price': data.get('maxPrice'),
+            'min_stock': data.get('minStock'),
+            'max_stock': data.get('maxStock')
+        }
+
+        logging.info(f"Aplicando desconto {percentage}% em massa com filtros: {filters}")
+
+        try:
+            result = ProductService.apply_bulk_percentage_discount(
+                filters, percentage, starts_at=data.get('startsAt'), ends_at=data.get('endsAt')
+            )
+        except ValueError as e:
+            products_ns.abort(400, str(e))
+
+        return {'message': 'Desconto aplicado com sucesso', **result}, 200
+
 @products_ns.route('/<int:product_id>/discount/coupon')
 class ProductCouponDiscountResource(Resource):
     """Aplicar cupom promocional"""
@@ -205,8 +457,14 @@ class ProductCouponDiscountResource(Resource):
         logging.info(f"Aplicando cupom {coupon_code} ao produto {product_id}")
         
         try:
-            ProductService.apply_coupon_discount(product_id, coupon_code)  
-            return {'message': 'Cupom aplicado com sucesso'}, 200
+            product = ProductService.apply_coupon_discount(
+                product_id, coupon_code, starts_at=data.get('startsAt'), ends_at=data.get('endsAt')
+            )
+            return {
+                'message': 'Cupom aplicado com sucesso',
+                'discount': product['discount'],
+                'scheduledDiscount': product['scheduledDiscount']
+            }, 200
         except ValueError as e:
             products_ns.abort(400, str(e))
         except Exception as e:
@@ -219,7 +477,7 @@ class ProductDiscountResource(Resource):
     @products_ns.doc('remove_discount')
     @handle_exceptions
     def delete(self, product_id):
-        """Remove desconto ativo do produto"""
+        """Remove o desconto ativo e cancela o agendado, se houver"""
         
         logging.info(f"Removendo desconto do produto {product_id}")
         
@@ -228,4 +486,21 @@ class ProductDiscountResource(Resource):
         if not success:
             products_ns.abort(404, 'Produto não encontrado ou sem desconto ativo')
         
-        return '', 204
\ No newline at end of file
+        return '', 204
+
+@products_ns.route('/<int:product_id>/discount/history')
+class ProductDiscountHistoryResource(Resource):
+    """Histórico de descontos do produto (aplicações vivas e arquivadas)"""
+
+    @products_ns.doc('discount_history')
+    @products_ns.param('limit', 'Itens por página (1-200)', type=int, default=50)
+    @products_ns.param('offset', 'Deslocamento', type=int, default=0)
+    @handle_exceptions
+    def get(self, product_id):
+        """Lista o histórico de descontos do produto, mais recentes primeiro"""
+
+        limit = max(min(request.args.get('limit', 50, type=int), 200), 1)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+
+        history = ApplicationArchiveService.get_history(product_id=product_id, limit=limit, offset=offset)
+        return {'data': history, 'meta': {'limit': limit, 'offset': offset}}, 200
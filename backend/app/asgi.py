@@ -0,0 +1,184 @@
+import hashlib
+import re
+import time
+from urllib.parse import parse_qsl
+
+from flask_restx import marshal
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_date, parse_etags
+
+try:
+    from asgiref.sync import ThreadSensitiveContext
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # asgiref é opcional; só o modo ASGI depende dele
+    WsgiToAsgi = None
+
+from app import CORS_OPTIONS, create_app
+from app.api.coupons.routes import coupon_list_filters
+from app.api.products.routes import product_list_filters, product_output_model
+from app.async_database import init_async_db
+from app.services.async_catalog_service import AsyncCatalogService
+from app.services.product_service import ProductService
+from app.utils.decorators import is_not_modified, make_etag, validator_headers
+from app.utils.fast_json import dumps
+from app.utils.metrics import track_task_queries
+from app.utils.scheduler import start_schedulers, stop_schedulers
+
+
+class AsgiRequest:
+    """Vista mínima de uma requisição ASGI: caminho, query string e cabeçalhos"""
+
+    def __init__(self, scope):
+        self.path = scope['path']
+        self.args = MultiDict(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))
+        self.headers = {
+            name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']
+        }
+
+
+class CatalogAsgiApp:
+    """Aplicação ASGI: leituras de catálogo em sessões async e o restante via Flask.
+
+    GET da listagem de produtos, do detalhe de produto e da listagem de
+    cupons rodam no event loop, que atende centenas de conexões enquanto
+    elas esperam o banco. As demais rotas, e os casos fora do caminho feliz
+    (produto inexistente, filtro inválido), seguem para o app Flask via
+    WsgiToAsgi e respondem exatamente como no modo WSGI.
+    """
+
+    def __init__(self, flask_app):
+        if WsgiToAsgi is None:
+            raise RuntimeError("Modo ASGI requer asgiref e um driver async (pip install asgiref aiosqlite)")
+
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.db = init_async_db(flask_app)
+        self.metrics = flask_app.extensions['metrics']
+
+        # (caminho, regra usada nas métricas, handler); mesmas regras do Flask
+        self.routes = (
+            (re.compile(r'/api/products/'), '/api/products/', self.list_products),
+            (re.compile(r'/api/products/(\d+)'), '/api/products/<int:product_id>', self.get_product),
+            (re.compile(r'/api/coupons/'), '/api/coupons/', self.list_coupons),
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            for pattern, rule, handler in self.routes:
+                match = pattern.fullmatch(scope['path'])
+                if match and await self._dispatch(scope, send, rule, handler, match.groups()):
+                    return
+
+        # Uma thread por requisição: sem o contexto, o WsgiToAsgi serializa tudo numa thread só
+        async with ThreadSensitiveContext():
+            await self.wsgi(scope, receive, send)
+
+    async def list_products(self, session, request):
+        try:
+            result = await AsyncCatalogService.list_products(session, product_list_filters(request.args))
+        except ValueError:
+            return None
+        return self._payload_response(request, {'data': result['products'], 'meta': result['meta']})
+
+    async def get_product(self, session, request, product_id):
+        product = await AsyncCatalogService.get_product(session, int(product_id))
+        if product is None:
+            return None
+
+        # Mesma versão/ETag do GET condicional do modo WSGI
+        version_key, last_modified = ProductService.version_of(product)
+        etag = make_etag(version_key)
+        headers = validator_headers(etag, last_modified)
+        if self._not_modified(request, etag, last_modified):
+            return 304, b'', headers
+
+        body = dumps(marshal(product.to_dict(), product_output_model))
+        return 200, body, {**headers, 'Content-Type': 'application/json'}
+
+    async def list_coupons(self, session, request):
+        result = await AsyncCatalogService.list_coupons(session, coupon_list_filters(request.args))
+        return self._payload_response(request, {'data': result['coupons'], 'meta': result['meta']})
+
+    async def _dispatch(self, scope, send, rule, handler, params):
+        """Executa um handler async; retorna False para deixar o Flask responder"""
+        started = time.perf_counter()
+        query_stats = track_task_queries()
+        request = AsgiRequest(scope)
+
+        # App context: a montagem das consultas consulta o dialeto em db.engine
+        with self.flask_app.app_context():
+            async with self.db.session() as session:
+                response = await handler(session, request, *params)
+        if response is None:
+            return False
+
+        status, body, headers = response
+        headers.update(self._cors_headers(request))
+        headers['Content-Length'] = str(len(body))
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+        self.metrics.observe_request(
+            'GET', rule, status, time.perf_counter() - started, query_stats[0], query_stats[1]
+        )
+        return True
+
+    def _payload_response(self, request, data):
+        """Corpo JSON com ETag pelo hash do corpo (mesma ETag de conditional_payload)"""
+        body = dumps(data)
+        etag = hashlib.sha1(body).hexdigest()
+        headers = validator_headers(etag, None)
+        if self._not_modified(request, etag, None):
+            return 304, b'', headers
+        return 200, body, {**headers, 'Content-Type': 'application/json'}
+
+    @staticmethod
+    def _not_modified(request, etag, last_modified):
+        if_none_match = request.headers.get('if-none-match')
+        return is_not_modified(
+            etag,
+            last_modified,
+            parse_etags(if_none_match) if if_none_match else None,
+            parse_date(request.headers.get('if-modified-since'))
+        )
+
+    @staticmethod
+    def _cors_headers(request):
+        """Mesmos cabeçalhos que o Flask-CORS envia para uma origem liberada"""
+        origin = request.headers.get('origin')
+        if origin not in CORS_OPTIONS['origins']:
+            return {}
+        headers = {
+            'Access-Control-Allow-Origin': origin,
+            'Access-Control-Expose-Headers': ', '.join(CORS_OPTIONS['expose_headers']),
+            'Vary': 'Origin'
+        }
+        if CORS_OPTIONS.get('supports_credentials'):
+            headers['Access-Control-Allow-Credentials'] = 'true'
+        return headers
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Agendadores na subida do worker: as leituras rápidas nem passam pelos hooks do Flask
+                start_schedulers(self.flask_app)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                stop_schedulers(self.flask_app, timeout=5)
+                await self.db.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(config_class=None):
+    """Factory do modo ASGI: o app Flask completo com as leituras async na frente"""
+    return CatalogAsgiApp(create_app(config_class))
@@ -0,0 +1,68 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.database import db
+from app.utils.sqlite import apply_sqlite_pragmas, sqlite_pragmas
+
+# Driver async equivalente a cada backend síncrono
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+class AsyncDatabase:
+    """Engine async e fábrica de sessões do modo ASGI.
+
+    Usa os mesmos modelos de app.models (o mapeamento não depende do
+    engine); só a execução das queries passa a ser não bloqueante.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def dispose(self):
+        await self.engine.dispose()
+
+
+def async_database_url(app):
+    """URL async: ASYNC_DATABASE_URL ou a URL do Flask-SQLAlchemy com o driver trocado"""
+    if app.config.get('ASYNC_DATABASE_URL'):
+        return make_url(app.config['ASYNC_DATABASE_URL'])
+
+    # db.engine.url já tem caminhos relativos do SQLite resolvidos pelo Flask-SQLAlchemy
+    with app.app_context():
+        url = db.engine.url
+
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"Sem driver async para '{backend}'; defina ASYNC_DATABASE_URL")
+    if backend == 'sqlite' and url.database in (None, '', ':memory:'):
+        raise RuntimeError("SQLite em memória não é compartilhado entre engines; use um arquivo")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def init_async_db(app):
+    """Cria o engine async a partir da configuração do app (app.extensions['async_db'])"""
+    url = async_database_url(app)
+    options = {
+        'pool_pre_ping': True,
+        'pool_recycle': 300,
+        'pool_size': app.config['ASYNC_DB_POOL_SIZE'],
+        'max_overflow': app.config['ASYNC_DB_MAX_OVERFLOW'],
+    }
+    if url.get_backend_name() == 'sqlite':
+        # O padrão do aiosqlite para arquivos é NullPool: uma conexão (e uma thread) nova por sessão
+        options['poolclass'] = AsyncAdaptedQueuePool
+
+    engine = create_async_engine(url, **options)
+    if url.get_backend_name() == 'sqlite' and app.config.get('SQLITE_PERFORMANCE_PROFILE'):
+        # Mesmos PRAGMAs das conexões síncronas (o evento de conexão fica no sync_engine)
+        apply_sqlite_pragmas(engine.sync_engine, sqlite_pragmas(app.config))
+
+    async_db = AsyncDatabase(engine)
+    app.extensions['async_db'] = async_db
+    return async_db
@@ -0,0 +1,41 @@
+import click
+
+from app.services.application_archive_service import ApplicationArchiveService
+from app.services.coupon_service import CouponService
+from app.services.discount_schedule_service import DiscountScheduleService
+
+
+def register_commands(app):
+    """Comandos de manutenção (flask <comando>)"""
+
+    @app.cli.command('archive-applications')
+    @click.option('--retention-days', type=int, default=None,
+                  help='Arquiva inativas aplicadas há mais de N dias (padrão: APPLICATION_RETENTION_DAYS)')
+    @click.option('--batch-size', type=int, default=None,
+                  help='Linhas por transação (padrão: APPLICATION_ARCHIVE_BATCH_SIZE)')
+    @click.option('--max-batches', type=int, default=None, help='Interrompe após N lotes')
+    @click.option('--pause', type=float, default=0.0, help='Pausa em segundos entre lotes')
+    def archive_applications(retention_days, batch_size, max_batches, pause):
+        """Move aplicações de desconto inativas antigas para a tabela de arquivo"""
+        result = ApplicationArchiveService.archive_inactive(
+            retention_days=retention_days if retention_days is not None else app.config['APPLICATION_RETENTION_DAYS'],
+            batch_size=batch_size or app.config['APPLICATION_ARCHIVE_BATCH_SIZE'],
+            max_batches=max_batches,
+            pause=pause
+        )
+        click.echo(f"{result['archived']} aplicações arquivadas em {result['batches']} lotes "
+                   f"(aplicadas antes de {result['cutoff']})")
+
+    @app.cli.command('run-discount-schedule')
+    @click.option('--batch-size', type=int, default=None,
+                  help='Produtos por lote (padrão: DISCOUNT_SCHEDULER_BATCH_SIZE)')
+    def run_discount_schedule(batch_size):
+        """Ativa e expira as janelas de desconto vencidas (para uso via cron)"""
+        result = DiscountScheduleService.run_due(batch_size=batch_size or app.config['DISCOUNT_SCHEDULER_BATCH_SIZE'])
+        click.echo(f"{result['activated']} descontos ativados, {result['expired']} expirados")
+
+    @app.cli.command('sweep-coupon-statuses')
+    def sweep_coupon_statuses():
+        """Atualiza o status dos cupons que iniciaram ou expiraram (para uso via cron)"""
+        result = CouponService.sweep_statuses()
+        click.echo(f"{result['activated']} cupons vigentes, {result['expired']} expirados")
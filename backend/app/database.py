@@ -1,5 +1,62 @@
+import logging
+import os
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 
-db = SQLAlchemy()
-migrate = Migrate()
\ No newline at end of file
+from app.utils.replicas import RoutingSession
+
+# RoutingSession manda leituras para réplicas quando DATABASE_REPLICA_URLS estiver configurado
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+migrate = Migrate()
+
+
+def worker_concurrency(config):
+    """(workers, threads) do servidor de produção, limitados pelo orçamento de conexões.
+
+    Sem WEB_CONCURRENCY explícito, o padrão é 2 x CPUs + 1. Com
+    DB_CONNECTION_BUDGET > 0, cada worker precisa de uma conexão por thread:
+    os workers são reduzidos a budget // threads (e as threads ao próprio
+    orçamento, se ele não cobrir nem um worker), com um aviso quando um
+    valor explícito é cortado. Assim o pool de cada worker nunca é menor
+    que o número de threads que disputam por ele.
+    """
+    threads = max(config.get('WEB_THREADS') or 1, 1)
+    requested = config.get('WEB_CONCURRENCY')
+    workers = max(requested or (os.cpu_count() or 1) * 2 + 1, 1)
+    budget = config.get('DB_CONNECTION_BUDGET') or 0
+    if budget <= 0:
+        return workers, threads
+
+    if threads > budget:
+        logging.warning(f"WEB_THREADS={threads} reduzido para {budget}: DB_CONNECTION_BUDGET={budget}")
+        threads = budget
+
+    max_workers = budget // threads
+    if workers > max_workers:
+        if requested:
+            logging.warning(
+                f"WEB_CONCURRENCY={requested} reduzido para {max_workers}: "
+                f"DB_CONNECTION_BUDGET={budget} cobre {max_workers} workers x {threads} threads"
+            )
+        workers = max_workers
+    return workers, threads
+
+
+def worker_engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS de um worker quando há orçamento global de conexões.
+
+    Com DB_CONNECTION_BUDGET > 0, o orçamento é dividido entre os
+    WEB_CONCURRENCY processos: cada um recebe budget // workers conexões
+    (pool_size) e nenhuma extra (max_overflow=0), então o total de conexões
+    abertas nunca passa do orçamento. WEB_CONCURRENCY e WEB_THREADS já vêm
+    ajustados por worker_concurrency (pool_size >= threads).
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    budget = config.get('DB_CONNECTION_BUDGET') or 0
+    if budget <= 0:
+        return options
+
+    workers = max(config.get('WEB_CONCURRENCY') or 1, 1)
+    options.update(pool_size=max(budget // workers, 1), max_overflow=0)
+    return options
@@ -17,6 +17,12 @@ except ImportError as e:
     print(f"Erro ao importar ProductCouponApplication: {e}")
     ProductCouponApplication = None
 
+try:
+    from .product_coupon_application_archive import ProductCouponApplicationArchive
+except ImportError as e:
+    print(f"Erro ao importar ProductCouponApplicationArchive: {e}")
+    ProductCouponApplicationArchive = None
+
 # Exportar apenas os modelos que foram importados com sucesso
 __all__ = []
 
@@ -25,4 +31,6 @@ if Product:
 if Coupon:
     __all__.append('Coupon')
 if ProductCouponApplication:
-    __all__.append('ProductCouponApplication')
\ No newline at end of file
+    __all__.append('ProductCouponApplication')
+if ProductCouponApplicationArchive:
+    __all__.append('ProductCouponApplicationArchive')
\ No newline at end of file
@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from sqlalchemy import event
 try:
     from app.database import db
 except ImportError:
@@ -28,11 +29,26 @@ class Coupon(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
     
+    # Situação persistida: recalculada a cada escrita, no resgate e pela varredura periódica
+    STATUS_SCHEDULED = 'scheduled'
+    STATUS_VALID = 'valid'
+    STATUS_EXPIRED = 'expired'
+    STATUS_EXHAUSTED = 'exhausted'
+    STATUS_INACTIVE = 'inactive'
+    status = db.Column(db.String(20), nullable=False, default=STATUS_VALID)
+    
     # Índices para otimização
     __table_args__ = (
         db.Index('idx_coupon_code_active', 'code', 'is_active'),
         db.Index('idx_coupon_validity', 'valid_from', 'valid_until'),
         db.Index('idx_coupon_active', 'is_active'),
+        # Índices parciais: só cupons vigentes/agendados (listagem de válidos e varredura)
+        db.Index('idx_coupon_valid_created', 'created_at',
+                 sqlite_where=db.text("status = 'valid'"), postgresql_where=db.text("status = 'valid'")),
+        db.Index('idx_coupon_valid_until', 'valid_until',
+                 sqlite_where=db.text("status = 'valid'"), postgresql_where=db.text("status = 'valid'")),
+        db.Index('idx_coupon_scheduled_from', 'valid_from',
+                 sqlite_where=db.text("status = 'scheduled'"), postgresql_where=db.text("status = 'scheduled'")),
     )
     
     def __init__(self, code, discount_percentage, valid_from, valid_until, 
@@ -49,25 +65,48 @@ class Coupon(db.Model):
     def __repr__(self):
         return f'<Coupon {self.code}>'
     
+    def compute_status(self, now=None):
+        """Situação do cupom num instante (inativo > expirado > esgotado > agendado > válido)"""
+        now = now or datetime.utcnow()
+        if not self.is_active:
+            return Coupon.STATUS_INACTIVE
+        if now > _naive_utc(self.valid_until):
+            return Coupon.STATUS_EXPIRED
+        if self.usage_count >= self.usage_limit:
+            return Coupon.STATUS_EXHAUSTED
+        if now < _naive_utc(self.valid_from):
+            return Coupon.STATUS_SCHEDULED
+        return Coupon.STATUS_VALID
+    
+    def refresh_status(self, now=None):
+        """Atualiza a coluna status a partir dos demais campos"""
+        self.status = self.compute_status(now)
+    
+    @classmethod
+    def status_expression(cls, now):
+        """Mesmo cálculo de compute_status em SQL, para UPDATEs em lote"""
+        return db.case(
+            (cls.is_active == False, cls.STATUS_INACTIVE),
+            (cls.valid_until < now, cls.STATUS_EXPIRED),
+            (cls.usage_count >= cls.usage_limit, cls.STATUS_EXHAUSTED),
+            (cls.valid_from > now, cls.STATUS_SCHEDULED),
+            else_=cls.STATUS_VALID
+        )
+    
     @property
     def is_valid(self):
-        """Verifica se o cupom está válido"""
-        now = datetime.utcnow()
-        return (
-            self.is_active and
-            self.valid_from <= now <= self.valid_until and
-            self.usage_count < self.usage_limit
-        )
+        """Verifica se o cupom está válido agora (a coluna status pode aguardar a varredura)"""
+        return self.compute_status() == Coupon.STATUS_VALID
     
     @property
     def is_expired(self):
         """Verifica se o cupom expirou"""
-        return datetime.utcnow() > self.valid_until
+        return self.compute_status() == Coupon.STATUS_EXPIRED
     
     @property
     def is_not_started(self):
         """Verifica se o cupom ainda não iniciou"""
-        return datetime.utcnow() < self.valid_from
+        return self.compute_status() == Coupon.STATUS_SCHEDULED
     
     @property
     def is_limit_reached(self):
@@ -106,6 +145,38 @@ class Coupon(db.Model):
         self.usage_count += 1
         self.updated_at = datetime.utcnow()
     
+    @staticmethod
+    def redeem(code):
+        """Registra um uso do cupom de forma atômica.
+
+        Um único UPDATE condicional incrementa usage_count somente se o cupom
+        estiver ativo, dentro da validade e abaixo do limite, então requisições
+        concorrentes nunca ultrapassam usage_limit. Retorna True se o uso foi
+        registrado; o commit fica a cargo de quem chama.
+        """
+        now = datetime.utcnow()
+        result = db.session.execute(
+            db.update(Coupon)
+            .where(
+                Coupon.code == code.upper(),
+                Coupon.is_active == True,
+                Coupon.valid_from <= now,
+                Coupon.valid_until >= now,
+                Coupon.usage_count < Coupon.usage_limit
+            )
+            .values(
+                usage_count=Coupon.usage_count + 1,
+                # O WHERE garante que o cupom estava vigente; o último uso o esgota
+                status=db.case(
+                    (Coupon.usage_count + 1 >= Coupon.usage_limit, Coupon.STATUS_EXHAUSTED),
+                    else_=Coupon.STATUS_VALID
+                ),
+                updated_at=now
+            )
+            .execution_options(synchronize_session='fetch')
+        )
+        return result.rowcount == 1
+    
     def to_dict(self, include_validity=True):
         """Converte para dicionário"""
         data = {
@@ -118,6 +189,7 @@ class Coupon(db.Model):
             'usage_limit': self.usage_limit,
             'usage_count': self.usage_count,
             'is_active': self.is_active,
+            'status': self.status,
             'created_at': self.created_at.isoformat() + 'Z',
             'updated_at': self.updated_at.isoformat() + 'Z' if self.updated_at else None
         }
@@ -131,4 +203,18 @@ class Coupon(db.Model):
                 'remaining_uses': self.remaining_uses
             })
         
-        return data
\ No newline at end of file
+        return data
+
+
+def _naive_utc(value):
+    # create_coupon atribui datas com fuso antes do flush; o banco guarda UTC sem fuso
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@event.listens_for(Coupon, 'before_insert')
+@event.listens_for(Coupon, 'before_update')
+def _sync_status(mapper, connection, target):
+    """Mantém status coerente em qualquer escrita via ORM (criação, edição, uso)"""
+    target.refresh_status()
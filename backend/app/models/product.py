@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy import DDL, event
 try:
     from app.database import db
 except ImportError:
@@ -31,6 +32,16 @@ class Product(db.Model):
     discount_end_date = db.Column(db.DateTime)
     has_active_discount = db.Column(db.Boolean, default=False)
     
+    # Preço efetivo (com desconto) persistido para filtrar/ordenar no banco
+    final_price = db.Column(db.Float, nullable=False)
+    
+    # Próximo desconto agendado; o agendador o ativa em lote quando a janela começa.
+    # scheduled_coupon_id guarda o cupom já resgatado (sem FK para não recriar a tabela no SQLite)
+    scheduled_discount_percentage = db.Column(db.Float)
+    scheduled_discount_start = db.Column(db.DateTime)
+    scheduled_discount_end = db.Column(db.DateTime)
+    scheduled_coupon_id = db.Column(db.Integer)
+    
     # Índices para otimização
     __table_args__ = (
         db.Index('idx_product_name_active', 'name', 'is_active'),
@@ -38,6 +49,14 @@ class Product(db.Model):
         db.Index('idx_product_stock', 'stock'),
         db.Index('idx_product_active', 'is_active'),
         db.Index('idx_product_discount', 'has_active_discount'),
+        # Índices compostos (coluna de ordenação, id) para paginação por cursor
+        db.Index('idx_product_name_id', 'name', 'id'),
+        db.Index('idx_product_final_price_id', 'final_price', 'id'),
+        db.Index('idx_product_stock_id', 'stock', 'id'),
+        db.Index('idx_product_created_at_id', 'created_at', 'id'),
+        # Fronteiras das janelas de desconto (varreduras do agendador)
+        db.Index('idx_product_discount_end', 'has_active_discount', 'discount_end_date'),
+        db.Index('idx_product_scheduled_start', 'scheduled_discount_start'),
     )
     
     def __init__(self, name, price, stock=0, description=''):
@@ -48,18 +67,33 @@ class Product(db.Model):
         self.is_active = True
         self.discount_percentage = 0.0
         self.has_active_discount = False
+        self.refresh_final_price()
     
     def __repr__(self):
         return f'<Product {self.name}>'
     
-    @property
-    def final_price(self):
+    def calculate_final_price(self):
         """Calcula o preço final com desconto"""
-        if self.has_active_discount and self.discount_percentage > 0:
+        if self.has_active_discount and self.discount_percentage and self.discount_percentage > 0:
             discount_amount = self.price * (self.discount_percentage / 100)
             return round(self.price - discount_amount, 2)
         return self.price
     
+    def refresh_final_price(self):
+        """Atualiza a coluna final_price a partir de preço e desconto"""
+        self.final_price = self.calculate_final_price()
+    
+    @classmethod
+    def final_price_expression(cls):
+        """Mesmo cálculo de calculate_final_price em SQL, para UPDATEs em lote"""
+        return db.case(
+            (
+                db.and_(cls.has_active_discount == True, cls.discount_percentage > 0),
+                db.func.round(cls.price - cls.price * cls.discount_percentage / 100, 2)
+            ),
+            else_=cls.price
+        )
+    
     @property
     def is_out_of_stock(self):
         """Verifica se está sem estoque"""
@@ -72,16 +106,41 @@ class Product(db.Model):
             return round(self.price * (self.discount_percentage / 100), 2)
         return 0.0
     
-    def apply_percentage_discount(self, percentage):
-        """Aplica desconto percentual"""
+    def apply_percentage_discount(self, percentage, ends_at=None):
+        """Aplica desconto percentual (opcionalmente com data de expiração)"""
         if not 1 <= percentage <= 80:
             raise ValueError("Percentual deve estar entre 1% e 80%")
         
         self.discount_percentage = percentage
         self.has_active_discount = True
         self.discount_start_date = datetime.utcnow()
+        self.discount_end_date = ends_at
+        self.updated_at = datetime.utcnow()
+        self.refresh_final_price()
+    
+    def schedule_discount(self, percentage, starts_at, ends_at=None, coupon_id=None):
+        """Agenda um desconto futuro; o desconto atual (se houver) segue valendo até lá"""
+        if not 1 <= percentage <= 80:
+            raise ValueError("Percentual deve estar entre 1% e 80%")
+        
+        self.scheduled_discount_percentage = percentage
+        self.scheduled_discount_start = starts_at
+        self.scheduled_discount_end = ends_at
+        self.scheduled_coupon_id = coupon_id
+        self.updated_at = datetime.utcnow()
+    
+    def cancel_scheduled_discount(self):
+        """Cancela o desconto agendado"""
+        self.scheduled_discount_percentage = None
+        self.scheduled_discount_start = None
+        self.scheduled_discount_end = None
+        self.scheduled_coupon_id = None
         self.updated_at = datetime.utcnow()
     
+    @property
+    def has_scheduled_discount(self):
+        return self.scheduled_discount_start is not None
+    
     def remove_discount(self):
         """Remove desconto ativo"""
         self.discount_percentage = 0.0
@@ -89,6 +148,7 @@ class Product(db.Model):
         self.discount_start_date = None
         self.discount_end_date = None
         self.updated_at = datetime.utcnow()
+        self.refresh_final_price()
     
     def update_stock(self, quantity):
         """Atualiza estoque"""
@@ -142,9 +202,97 @@ class Product(db.Model):
                     'end_date': self.discount_end_date.isoformat() + 'Z' if self.discount_end_date else None
                 }
             
+            scheduled_info = None
+            if self.scheduled_discount_start is not None:
+                scheduled_info = {
+                    'percentage': self.scheduled_discount_percentage,
+                    'start_date': self.scheduled_discount_start.isoformat() + 'Z',
+                    'end_date': self.scheduled_discount_end.isoformat() + 'Z' if self.scheduled_discount_end else None,
+                    'coupon_id': self.scheduled_coupon_id
+                }
+            
             data.update({
                 'discount': discount_info,
+                'scheduledDiscount': scheduled_info,
                 'hasCouponApplied': False  # Será atualizado pelo service se houver cupom
             })
         
-        return data
\ No newline at end of file
+        return data
+
+@event.listens_for(Product, 'before_insert')
+@event.listens_for(Product, 'before_update')
+def _sync_final_price(mapper, connection, target):
+    """Mantém final_price coerente em qualquer escrita via ORM (ex.: PATCH do preço)"""
+    target.refresh_final_price()
+
+
+class ProductRecord:
+    """Projeção somente leitura de Product para listagens.
+
+    Montada a partir de um select só das colunas necessárias: sem identity
+    map nem estado de instância do ORM. Reaproveita to_dict() e as
+    propriedades de Product, então a saída é idêntica.
+    """
+
+    __slots__ = (
+        'id', 'name', 'description', 'price', 'stock', 'final_price', 'is_active',
+        'created_at', 'updated_at', 'discount_percentage', 'discount_start_date',
+        'discount_end_date', 'has_active_discount', 'scheduled_discount_percentage',
+        'scheduled_discount_start', 'scheduled_discount_end', 'scheduled_coupon_id'
+    )
+
+    def __init__(self, row):
+        (self.id, self.name, self.description, self.price, self.stock, self.final_price,
+         self.is_active, self.created_at, self.updated_at, self.discount_percentage,
+         self.discount_start_date, self.discount_end_date, self.has_active_discount,
+         self.scheduled_discount_percentage, self.scheduled_discount_start,
+         self.scheduled_discount_end, self.scheduled_coupon_id) = row
+
+    @classmethod
+    def columns(cls):
+        """Colunas do select, na ordem esperada por __init__"""
+        return [getattr(Product, name) for name in cls.__slots__]
+
+    is_out_of_stock = Product.is_out_of_stock
+    discount_amount = Product.discount_amount
+    has_scheduled_discount = Product.has_scheduled_discount
+    to_dict = Product.to_dict
+
+
+# Índice full-text (SQLite FTS5) sobre nome e descrição.
+# Tabela de conteúdo externo: o texto fica em `products` e os triggers mantêm o índice sincronizado.
+PRODUCT_FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, description,
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO products_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+
+for _statement in PRODUCT_FTS_DDL:
+    event.listen(Product.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+# Referência leve à tabela FTS para montar consultas (não faz parte do metadata)
+products_fts = db.table('products_fts', db.column('rowid'), db.column('name'), db.column('description'))
@@ -34,6 +34,8 @@ class ProductCouponApplication(db.Model):
     __table_args__ = (
         db.Index('idx_product_coupon_active', 'product_id', 'is_active'),
         db.Index('idx_coupon_product_active', 'coupon_id', 'is_active'),
+        # Varredura do arquivamento (inativas mais antigas primeiro)
+        db.Index('idx_product_coupon_inactive_applied', 'is_active', 'applied_at'),
         # Removido o índice único problemático por enquanto
     )
     
@@ -129,6 +131,40 @@ class ProductCouponApplication(db.Model):
             is_active=True
         ).first()
     
+    @staticmethod
+    def get_active_discount_records_for_products(product_ids):
+        """Busca descontos ativos de vários produtos em uma única query.
+
+        Seleciona só as colunas e devolve {product_id: ProductCouponApplicationRecord},
+        evitando uma consulta por produto (N+1) e sem hidratar objetos ORM
+        (caminho somente leitura das listagens).
+        """
+        if not product_ids:
+            return {}
+
+        rows = db.session.execute(ProductCouponApplication.active_discount_records_query(product_ids))
+        return ProductCouponApplication.index_active_records(rows)
+
+    @staticmethod
+    def active_discount_records_query(product_ids):
+        """Select das projeções de aplicações ativas (executado pela sessão síncrona ou async)"""
+        return (
+            db.select(*ProductCouponApplicationRecord.columns())
+            .where(
+                ProductCouponApplication.product_id.in_(product_ids),
+                ProductCouponApplication.is_active == True
+            )
+            .order_by(ProductCouponApplication.id)
+        )
+
+    @staticmethod
+    def index_active_records(rows):
+        """{product_id: ProductCouponApplicationRecord}, mantendo a primeira aplicação de cada produto"""
+        active_by_product = {}
+        for row in rows:
+            active_by_product.setdefault(row.product_id, ProductCouponApplicationRecord(row))
+        return active_by_product
+
     @staticmethod
     def has_active_discount(product_id):
         """Verifica se produto tem desconto ativo"""
@@ -145,4 +181,21 @@ class ProductCouponApplication(db.Model):
     @staticmethod
     def get_by_coupon(coupon_id):
         """Retorna todas as aplicações de um cupom específico"""
-        return ProductCouponApplication.query.filter_by(coupon_id=coupon_id).all()
\ No newline at end of file
+        return ProductCouponApplication.query.filter_by(coupon_id=coupon_id).all()
+
+
+class ProductCouponApplicationRecord:
+    """Projeção somente leitura de ProductCouponApplication (mesmo to_dict)"""
+
+    __slots__ = ('id', 'product_id', 'coupon_id', 'discount_amount', 'discount_percentage', 'applied_at', 'is_active')
+
+    def __init__(self, row):
+        (self.id, self.product_id, self.coupon_id, self.discount_amount,
+         self.discount_percentage, self.applied_at, self.is_active) = row
+
+    @classmethod
+    def columns(cls):
+        """Colunas do select, na ordem esperada por __init__"""
+        return [getattr(ProductCouponApplication, name) for name in cls.__slots__]
+
+    to_dict = ProductCouponApplication.to_dict
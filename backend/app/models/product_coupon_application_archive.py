@@ -0,0 +1,26 @@
+from datetime import datetime
+from app.database import db
+
+
+class ProductCouponApplicationArchive(db.Model):
+    """Histórico arquivado de aplicações inativas (movidas de product_coupon_applications)"""
+
+    __tablename__ = 'product_coupon_applications_archive'
+
+    # Mesmo id da tabela viva: a linha só muda de lugar
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    product_id = db.Column(db.Integer, nullable=False)
+    coupon_id = db.Column(db.Integer, nullable=True)
+    discount_amount = db.Column(db.Float, nullable=False)
+    discount_percentage = db.Column(db.Float, default=0.0)
+    applied_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Sem FKs: o arquivo sobrevive à remoção de produtos/cupons
+    __table_args__ = (
+        db.Index('idx_application_archive_product_applied', 'product_id', 'applied_at'),
+        db.Index('idx_application_archive_coupon', 'coupon_id'),
+    )
+
+    def __repr__(self):
+        return f'<ProductCouponApplicationArchive {self.id} Product:{self.product_id}>'
@@ -0,0 +1,119 @@
+import logging
+import time
+from datetime import datetime, timedelta
+
+from app.models.product_coupon_application import ProductCouponApplication
+from app.models.product_coupon_application_archive import ProductCouponApplicationArchive
+from app.database import db
+
+ARCHIVE_COLUMNS = ('id', 'product_id', 'coupon_id', 'discount_amount', 'discount_percentage', 'applied_at')
+
+
+class ApplicationArchiveService:
+    """Arquivamento do histórico de aplicações de desconto e leitura unificada"""
+
+    @staticmethod
+    def archive_inactive(retention_days=90, batch_size=1000, max_batches=None, pause=0.0):
+        """Move aplicações inativas aplicadas antes da janela de retenção para o arquivo.
+
+        Cada lote é um INSERT ... SELECT seguido de DELETE na mesma transação,
+        com commit logo em seguida: o lock de escrita dura só um lote.
+        `pause` (segundos) dá espaço para outras escritas entre lotes.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        archived = 0
+        batches = 0
+
+        while max_batches is None or batches < max_batches:
+            # Mais antigas primeiro, seguindo o índice (is_active, applied_at)
+            ids = db.session.execute(
+                db.select(ProductCouponApplication.id)
+                .where(
+                    ProductCouponApplication.is_active == False,
+                    ProductCouponApplication.applied_at < cutoff
+                )
+                .order_by(ProductCouponApplication.applied_at, ProductCouponApplication.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+
+            batch = db.and_(
+                ProductCouponApplication.id.in_(ids),
+                ProductCouponApplication.is_active == False
+            )
+            try:
+                db.session.execute(
+                    db.insert(ProductCouponApplicationArchive).from_select(
+                        [*ARCHIVE_COLUMNS, 'archived_at'],
+                        db.select(
+                            *(getattr(ProductCouponApplication, column) for column in ARCHIVE_COLUMNS),
+                            db.literal(datetime.utcnow())
+                        ).where(batch)
+                    )
+                )
+                deleted = db.session.execute(
+                    db.delete(ProductCouponApplication).where(batch)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logging.exception("Erro ao arquivar lote de aplicações")
+                raise
+
+            archived += deleted
+            batches += 1
+            if pause:
+                time.sleep(pause)
+
+        logging.info(f"Arquivamento: {archived} aplicações em {batches} lotes (antes de {cutoff.isoformat()})")
+        return {'archived': archived, 'batches': batches, 'cutoff': cutoff.isoformat() + 'Z'}
+
+    @staticmethod
+    def history_query(product_id=None, coupon_id=None):
+        """UNION ALL das aplicações vivas e arquivadas, com a origem de cada linha"""
+        live = db.select(
+            *(getattr(ProductCouponApplication, column) for column in ARCHIVE_COLUMNS),
+            ProductCouponApplication.is_active,
+            db.literal('live').label('source')
+        )
+        archived = db.select(
+            *(getattr(ProductCouponApplicationArchive, column) for column in ARCHIVE_COLUMNS),
+            db.literal(False).label('is_active'),
+            db.literal('archive').label('source')
+        )
+
+        if product_id is not None:
+            live = live.where(ProductCouponApplication.product_id == product_id)
+            archived = archived.where(ProductCouponApplicationArchive.product_id == product_id)
+        if coupon_id is not None:
+            live = live.where(ProductCouponApplication.coupon_id == coupon_id)
+            archived = archived.where(ProductCouponApplicationArchive.coupon_id == coupon_id)
+
+        return db.union_all(live, archived)
+
+    @staticmethod
+    def get_history(product_id=None, coupon_id=None, limit=50, offset=0):
+        """Histórico de descontos (vivo + arquivo), mais recentes primeiro"""
+        history = ApplicationArchiveService.history_query(product_id, coupon_id).subquery()
+        rows = db.session.execute(
+            db.select(history)
+            .order_by(history.c.applied_at.desc(), history.c.id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        return [
+            {
+                'id': row.id,
+                'product_id': row.product_id,
+                'coupon_id': row.coupon_id,
+                'discount_amount': float(row.discount_amount),
+                'discount_percentage': float(row.discount_percentage or 0),
+                'applied_at': row.applied_at.isoformat() + 'Z' if row.applied_at else None,
+                'is_active': bool(row.is_active),
+                'is_coupon_discount': row.coupon_id is not None,
+                'source': row.source
+            }
+            for row in rows
+        ]
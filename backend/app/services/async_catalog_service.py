@@ -0,0 +1,65 @@
+from app.models.product import Product, ProductRecord
+from app.models.product_coupon_application import ProductCouponApplication
+from app.services.coupon_service import CouponService
+from app.services.product_service import ProductService
+from app.database import db
+from app.utils.catalog_cache import product_list_cache
+
+
+class AsyncCatalogService:
+    """Leituras de produtos e cupons em sessões async (modo ASGI).
+
+    Executa os mesmos selects montados por ProductService e CouponService e
+    monta a mesma resposta; muda só a execução, que libera o event loop
+    enquanto espera o banco. Precisa de app context (montagem dos filtros).
+    """
+
+    @staticmethod
+    async def list_products(session, filters):
+        """Equivalente a ProductService.list_products_with_discount_info (mesmo cache de resultados)"""
+        cache = product_list_cache()
+        key = cache.key(filters) if cache is not None else None
+        result = cache.get(key) if cache is not None else None
+        if result is None:
+            result = await AsyncCatalogService._query_listing(session, filters)
+            if cache is not None:
+                cache.set(key, result)
+        return result
+
+    @staticmethod
+    async def _query_listing(session, filters):
+        listing = ProductService._listing_statements(filters)
+
+        total = None
+        if listing['count'] is not None:
+            total = (await session.execute(listing['count'])).scalar()
+        items = [ProductRecord(row) for row in await session.execute(listing['query'])]
+
+        active_applications = {}
+        if items:
+            rows = await session.execute(
+                ProductCouponApplication.active_discount_records_query([item.id for item in items])
+            )
+            active_applications = ProductCouponApplication.index_active_records(rows)
+
+        return ProductService._listing_result(listing, items, total, active_applications)
+
+    @staticmethod
+    async def get_product(session, product_id):
+        """Projeção do produto (ProductRecord) ou None"""
+        row = (await session.execute(
+            db.select(*ProductRecord.columns()).where(Product.id == product_id)
+        )).first()
+        return ProductRecord(row) if row is not None else None
+
+    @staticmethod
+    async def list_coupons(session, filters):
+        """Equivalente a CouponService.list_coupons"""
+        query, page, limit = CouponService._list_query(filters)
+
+        total = (await session.execute(
+            db.select(db.func.count()).select_from(query.order_by(None).subquery())
+        )).scalar()
+        coupons = (await session.scalars(query.limit(limit).offset((page - 1) * limit))).all()
+
+        return CouponService._list_result(coupons, page, limit, total)
@@ -1,8 +1,9 @@
 from datetime import datetime
 import logging
-from sqlalchemy import and_
 from datetime import datetime, timezone
+from types import SimpleNamespace
 import pytz
+from flask import current_app
 
 try:
     from app.models.coupon import Coupon
@@ -20,7 +21,106 @@ except ImportError:
 class CouponService:
     """Serviço para gerenciamento de cupons (implementação real)"""
 
-    
+    # Motivo devolvido pela validação para cada situação que impede o uso
+    INVALID_STATUS_MESSAGES = {
+        Coupon.STATUS_SCHEDULED: 'Cupom ainda não é válido',
+        Coupon.STATUS_EXPIRED: 'Cupom expirado',
+        Coupon.STATUS_EXHAUSTED: 'Cupom atingiu limite de uso',
+        Coupon.STATUS_INACTIVE: 'Cupom inativo',
+    }
+
+    @staticmethod
+    def _cache():
+        """Cache de cupons por código (ver create_app)"""
+        return current_app.extensions['coupon_cache']
+
+    @staticmethod
+    def get_cached_coupon(code):
+        """Busca um cupom ativo pelo código passando pelo cache em memória.
+
+        O cache guarda apenas os campos do cupom (nunca o resultado da
+        validação), então a validade é recalculada a cada acerto.
+        """
+        key = code.upper()
+        cache = CouponService._cache()
+        snapshot = cache.get(key)
+        if snapshot is None:
+            coupon = Coupon.query.filter(Coupon.code == key, Coupon.is_active == True).first()
+            if not coupon:
+                return None
+            snapshot = SimpleNamespace(**{
+                column.key: getattr(coupon, column.key) for column in Coupon.__table__.columns
+            })
+            cache.set(key, snapshot)
+        return snapshot
+
+    @staticmethod
+    def invalidate_cached_coupon(*codes):
+        """Remove cupons do cache após qualquer escrita"""
+        cache = CouponService._cache()
+        for code in codes:
+            cache.invalidate(code.upper())
+
+    @staticmethod
+    def get_coupon_version(code):
+        """Versão do cupom para GET condicional: (chave, última modificação) ou None.
+
+        A chave inclui a situação calculada no momento, então um cupom que
+        vence (ou começa) muda de versão mesmo antes da varredura.
+        """
+        coupon = CouponService.get_cached_coupon(code)
+        if coupon is None:
+            return None
+
+        last_modified = coupon.updated_at or coupon.created_at
+        version = f"coupon:{coupon.id}:{last_modified.isoformat()}:{Coupon.compute_status(coupon)}"
+        return version, last_modified
+
+    @staticmethod
+    def sweep_statuses(now=None):
+        """Aplica as transições de status que dependem só do tempo.
+
+        Agendado -> vigente quando valid_from chega e vigente/esgotado ->
+        expirado quando valid_until passa (expirado prevalece sobre esgotado,
+        como em compute_status). Cada transição é um UPDATE filtrado pelo
+        status de origem (os vigentes e agendados pelo índice parcial); os
+        códigos alterados saem do cache local após o commit.
+        """
+        now = now or datetime.utcnow()
+        transitions = (
+            ('activated', Coupon.STATUS_SCHEDULED, Coupon.valid_from <= now),
+            ('expired', Coupon.STATUS_VALID, Coupon.valid_until < now),
+            ('expired', Coupon.STATUS_EXHAUSTED, Coupon.valid_until < now),
+        )
+        result = {'activated': 0, 'expired': 0}
+        changed_codes = []
+        try:
+            for name, current_status, boundary in transitions:
+                codes = db.session.execute(
+                    db.update(Coupon)
+                    .where(Coupon.status == db.literal_column(f"'{current_status}'"), boundary)
+                    .values(status=Coupon.status_expression(now), updated_at=now)
+                    .returning(Coupon.code)
+                    .execution_options(synchronize_session=False)
+                ).scalars().all()
+                changed_codes.extend(codes)
+                result[name] += len(codes)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        # Depois do commit: antes dele, uma leitura concorrente recolocaria no cache o status anterior
+        CouponService.invalidate_cached_coupon(*changed_codes)
+
+        if any(result.values()):
+            logging.info(f"Status de cupons: {result['activated']} vigentes, {result['expired']} expirados")
+        return result
+
+    @staticmethod
+    def cache_stats():
+        return CouponService._cache().stats()
+
 
     @staticmethod
     def list_coupons(filters=None):
@@ -28,68 +128,72 @@ class CouponService:
             filters = {}
 
         try:
-            query = Coupon.query.filter(Coupon.is_active == True)
-
-            if filters.get('search'):
-                search_term = f"%{filters['search']}%"
-                query = query.filter(
-                    Coupon.code.ilike(search_term) |
-                    Coupon.description.ilike(search_term)
-                )
+            query, page, limit = CouponService._list_query(filters)
 
-            if filters.get('min_discount'):
-                query = query.filter(Coupon.discount_percentage >= filters['min_discount'])
+            paginated = db.paginate(query, page=page, per_page=limit, error_out=False)
 
-            if filters.get('max_discount'):
-                query = query.filter(Coupon.discount_percentage <= filters['max_discount'])
-
-            if filters.get('is_valid') is not None:
-                now = datetime.utcnow()
-                if filters['is_valid']:
-                    query = query.filter(
-                        and_(
-                            Coupon.valid_from <= now,
-                            Coupon.valid_until >= now,
-                            Coupon.usage_count < Coupon.usage_limit
-                        )
-                    )
-                else:
-                    query = query.filter(
-                        (Coupon.valid_from > now) |
-                        (Coupon.valid_until < now) |
-                        (Coupon.usage_count >= Coupon.usage_limit)
-                    )
-
-            sort_by = filters.get('sort_by', 'created_at')
-            sort_order = filters.get('sort_order', 'desc')
-
-            if hasattr(Coupon, sort_by):
-                order_column = getattr(Coupon, sort_by)
-                query = query.order_by(order_column.desc() if sort_order == 'desc' else order_column.asc())
-
-            page = max(filters.get('page', 1), 1)
-            limit = min(max(filters.get('limit', 10), 1), 50)
-
-            paginated = query.paginate(page=page, per_page=limit, error_out=False)
-
-            coupons = [CouponService._serialize_coupon(c) for c in paginated.items]
-
-            return {
-                'coupons': coupons,
-                'meta': {
-                    'page': page,
-                    'pages': paginated.pages,
-                    'per_page': limit,
-                    'total': paginated.total,
-                    'has_next': paginated.has_next,
-                    'has_prev': paginated.has_prev
-                }
-            }
+            return CouponService._list_result(paginated.items, page, limit, paginated.total)
 
         except Exception as e:
             logging.error(f"Erro ao listar cupons: {str(e)}")
             raise
 
+    @staticmethod
+    def _list_query(filters):
+        """Select da listagem de cupons, sem paginação: (select, página, limite).
+
+        Compartilhado com o modo ASGI, que pagina o mesmo select numa sessão async.
+        """
+        # Só cupons ativos chegam a 'valid': com is_valid=True o filtro de status
+        # basta e o planner usa o índice parcial em vez de idx_coupon_active
+        valid = Coupon.status == db.literal_column(f"'{Coupon.STATUS_VALID}'")
+        if filters.get('is_valid'):
+            query = db.select(Coupon).filter(valid)
+        else:
+            query = db.select(Coupon).filter(Coupon.is_active == True)
+            if filters.get('is_valid') is not None:
+                query = query.filter(~valid)
+
+        if filters.get('search'):
+            search_term = f"%{filters['search']}%"
+            query = query.filter(
+                Coupon.code.ilike(search_term) |
+                Coupon.description.ilike(search_term)
+            )
+
+        if filters.get('min_discount'):
+            query = query.filter(Coupon.discount_percentage >= filters['min_discount'])
+
+        if filters.get('max_discount'):
+            query = query.filter(Coupon.discount_percentage <= filters['max_discount'])
+
+        sort_by = filters.get('sort_by', 'created_at')
+        sort_order = filters.get('sort_order', 'desc')
+
+        if hasattr(Coupon, sort_by):
+            order_column = getattr(Coupon, sort_by)
+            query = query.order_by(order_column.desc() if sort_order == 'desc' else order_column.asc())
+
+        page = max(filters.get('page', 1), 1)
+        limit = min(max(filters.get('limit', 10), 1), 50)
+        return query, page, limit
+
+    @staticmethod
+    def _list_result(coupons, page, limit, total):
+        """Resposta da listagem (mesmos metadados de Pagination do Flask-SQLAlchemy)"""
+        pages = -(-total // limit) if total else 0
+        return {
+            'coupons': [CouponService._serialize_coupon(c) for c in coupons],
+            'meta': {
+                'page': page,
+                'pages': pages,
+                'per_page': limit,
+                'total': total,
+                'has_next': page < pages,
+                'has_prev': page > 1
+            }
+        }
+
     @staticmethod
     def get_coupon_by_id(coupon_id):
         try:
@@ -102,7 +206,7 @@ class CouponService:
     @staticmethod
     def get_coupon_by_code(code):
         try:
-            coupon = Coupon.query.filter(Coupon.code == code.upper(), Coupon.is_active == True).first()
+            coupon = CouponService.get_cached_coupon(code)
             return CouponService._serialize_coupon(coupon) if coupon else None
         except Exception as e:
             logging.error(f"Erro ao buscar cupom por código {code}: {str(e)}")
@@ -168,6 +272,8 @@ class CouponService:
             if not coupon:
                 return None
 
+            previous_code = coupon.code
+
             if 'code' in data and data['code'].upper() != coupon.code:
                 existing = Coupon.query.filter(
                     Coupon.code == data['code'].upper(),
@@ -203,6 +309,7 @@ class CouponService:
 
             coupon.updated_at = datetime.utcnow()
             db.session.commit()
+            CouponService.invalidate_cached_coupon(previous_code, coupon.code)
             logging.info(f"Cupom atualizado: {coupon.code}")
             return CouponService._serialize_coupon(coupon)
 
@@ -223,6 +330,7 @@ class CouponService:
             coupon.is_active = False
             coupon.updated_at = datetime.utcnow()
             db.session.commit()
+            CouponService.invalidate_cached_coupon(coupon.code)
             logging.info(f"Cupom inativado: {coupon.code}")
             return True
         except Exception as e:
@@ -233,29 +341,17 @@ class CouponService:
     @staticmethod
     def validate_coupon(code):
         try:
-            coupon = Coupon.query.filter(Coupon.code == code.upper(), Coupon.is_active == True).first()
+            coupon = CouponService.get_cached_coupon(code)
             if not coupon:
                 return {'valid': False, 'message': 'Cupom não encontrado', 'coupon': None}
 
-            # Garantir timezone nas comparações
-            now = datetime.now(timezone.utc)
-            
-            def make_aware(dt):
-                if dt.tzinfo is None:
-                    return dt.replace(tzinfo=timezone.utc)
-                return dt
-            
-            valid_from = make_aware(coupon.valid_from)
-            valid_until = make_aware(coupon.valid_until)
-            
-            if now < valid_from:
-                return {'valid': False, 'message': 'Cupom ainda não é válido', 'coupon': CouponService._serialize_coupon(coupon)}
-            if now > valid_until:
-                return {'valid': False, 'message': 'Cupom expirado', 'coupon': CouponService._serialize_coupon(coupon)}
-            if coupon.usage_count >= coupon.usage_limit:
-                return {'valid': False, 'message': 'Cupom atingiu limite de uso', 'coupon': CouponService._serialize_coupon(coupon)}
-
-            return {'valid': True, 'message': 'Cupom válido', 'coupon': CouponService._serialize_coupon(coupon)}
+            # Validade e indicadores saem do mesmo cálculo (compute_status), não da coluna status
+            serialized = CouponService._serialize_coupon(coupon, datetime.utcnow())
+            status = serialized['status']
+            if status != Coupon.STATUS_VALID:
+                return {'valid': False, 'message': CouponService.INVALID_STATUS_MESSAGES[status], 'coupon': serialized}
+
+            return {'valid': True, 'message': 'Cupom válido', 'coupon': serialized}
 
         except Exception as e:
             logging.error(f"Erro ao validar cupom {code}: {str(e)}")
@@ -264,17 +360,18 @@ class CouponService:
     @staticmethod
     def use_coupon(code):
         try:
-            coupon = Coupon.query.filter(Coupon.code == code.upper(), Coupon.is_active == True).first()
-            if not coupon:
-                raise ValueError("Cupom não encontrado")
+            # Incremento condicional atômico: só um dos concorrentes leva o último uso
+            redeemed = Coupon.redeem(code)
+            if not redeemed:
+                validation = CouponService.validate_coupon(code)
+                if validation['coupon'] is None:
+                    raise ValueError("Cupom não encontrado")
+                raise ValueError(validation['message'] if not validation['valid'] else 'Cupom atingiu limite de uso')
 
-            validation = CouponService.validate_coupon(code)
-            if not validation['valid']:
-                raise ValueError(validation['message'])
-
-            coupon.usage_count += 1
-            coupon.updated_at = datetime.utcnow()
             db.session.commit()
+            # Só depois do commit: antes dele, uma leitura concorrente recolocaria no cache o uso anterior
+            CouponService.invalidate_cached_coupon(code)
+            coupon = Coupon.query.filter(Coupon.code == code.upper(), Coupon.is_active == True).first()
             logging.info(f"Cupom usado: {coupon.code} (uso {coupon.usage_count}/{coupon.usage_limit})")
             return CouponService._serialize_coupon(coupon)
 
@@ -287,9 +384,10 @@ class CouponService:
             raise
 
     @staticmethod
-    def _serialize_coupon(coupon):
-        now = datetime.utcnow()
-        is_valid = (coupon.is_active and coupon.valid_from <= now <= coupon.valid_until and coupon.usage_count < coupon.usage_limit)
+    def _serialize_coupon(coupon, now=None):
+        # Situação no instante da resposta: a coluna status só muda na próxima varredura.
+        # Aceita o Coupon ou o snapshot do cache (SimpleNamespace), por isso a chamada pela classe
+        status = Coupon.compute_status(coupon, now)
         return {
             'id': coupon.id,
             'code': coupon.code,
@@ -300,9 +398,10 @@ class CouponService:
             'usage_limit': coupon.usage_limit,
             'usage_count': coupon.usage_count,
             'is_active': coupon.is_active,
-            'is_valid': is_valid,
-            'is_expired': now > coupon.valid_until,
-            'is_not_started': now < coupon.valid_from,
+            'status': status,
+            'is_valid': status == Coupon.STATUS_VALID,
+            'is_expired': status == Coupon.STATUS_EXPIRED,
+            'is_not_started': status == Coupon.STATUS_SCHEDULED,
             'is_limit_reached': coupon.usage_count >= coupon.usage_limit,
             'remaining_uses': max(0, coupon.usage_limit - coupon.usage_count),
             'created_at': coupon.created_at.isoformat() + 'Z',
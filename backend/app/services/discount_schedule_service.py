@@ -0,0 +1,162 @@
+import logging
+from datetime import datetime
+
+from app.models.product import Product
+from app.models.product_coupon_application import ProductCouponApplication
+from app.database import db
+
+
+class DiscountScheduleService:
+    """Ativação e expiração das janelas de desconto em UPDATEs por lote.
+
+    As leituras só olham has_active_discount/final_price; quem faz valer as
+    datas é este serviço, chamado periodicamente pelo agendador em processo.
+    """
+
+    @staticmethod
+    def expire_due(now=None, batch_size=500):
+        """Encerra descontos ativos cujo discount_end_date já passou"""
+        now = now or datetime.utcnow()
+        expired = 0
+
+        while True:
+            ids = db.session.execute(
+                db.select(Product.id)
+                .where(Product.has_active_discount == True, Product.discount_end_date <= now)
+                .order_by(Product.discount_end_date)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+
+            due = db.and_(
+                Product.id.in_(ids),
+                Product.has_active_discount == True,
+                Product.discount_end_date <= now
+            )
+            try:
+                db.session.execute(
+                    db.update(ProductCouponApplication)
+                    .where(
+                        ProductCouponApplication.product_id.in_(db.select(Product.id).where(due)),
+                        ProductCouponApplication.is_active == True
+                    )
+                    .values(is_active=False)
+                    .execution_options(synchronize_session=False)
+                )
+                expired += db.session.execute(
+                    db.update(Product)
+                    .where(due)
+                    .values(
+                        discount_percentage=0.0,
+                        has_active_discount=False,
+                        final_price=Product.price,
+                        updated_at=now
+                    )
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+        return expired
+
+    @staticmethod
+    def activate_due(now=None, batch_size=500):
+        """Ativa descontos agendados cuja janela já começou (descarta janelas já encerradas)"""
+        now = now or datetime.utcnow()
+        activated = 0
+
+        while True:
+            ids = db.session.execute(
+                db.select(Product.id)
+                .where(Product.scheduled_discount_start <= now)
+                .order_by(Product.scheduled_discount_start)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+
+            window = db.and_(Product.id.in_(ids), Product.scheduled_discount_start <= now)
+            live = db.and_(
+                window,
+                db.or_(Product.scheduled_discount_end == None, Product.scheduled_discount_end > now)
+            )
+            stale = db.and_(window, Product.scheduled_discount_end <= now)
+            percentage = Product.scheduled_discount_percentage
+
+            try:
+                # Desativa as aplicações atuais dos produtos que vão trocar de desconto
+                db.session.execute(
+                    db.update(ProductCouponApplication)
+                    .where(
+                        ProductCouponApplication.product_id.in_(db.select(Product.id).where(live)),
+                        ProductCouponApplication.is_active == True
+                    )
+                    .values(is_active=False)
+                    .execution_options(synchronize_session=False)
+                )
+
+                # Registra as novas aplicações antes de limpar as colunas de agendamento
+                db.session.execute(
+                    db.insert(ProductCouponApplication.__table__).from_select(
+                        ['product_id', 'coupon_id', 'discount_amount', 'discount_percentage', 'applied_at', 'is_active'],
+                        db.select(
+                            Product.id,
+                            Product.scheduled_coupon_id,
+                            db.func.round(Product.price * percentage / 100, 2),
+                            percentage,
+                            db.literal(now),
+                            db.literal(True)
+                        ).where(live)
+                    )
+                )
+
+                activated += db.session.execute(
+                    db.update(Product)
+                    .where(live)
+                    .values(
+                        discount_percentage=percentage,
+                        has_active_discount=True,
+                        discount_start_date=Product.scheduled_discount_start,
+                        discount_end_date=Product.scheduled_discount_end,
+                        final_price=db.func.round(Product.price - Product.price * percentage / 100, 2),
+                        scheduled_discount_percentage=None,
+                        scheduled_discount_start=None,
+                        scheduled_discount_end=None,
+                        scheduled_coupon_id=None,
+                        updated_at=now
+                    )
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+
+                # Janela inteira no passado (agendador parado): só descarta o agendamento
+                db.session.execute(
+                    db.update(Product)
+                    .where(stale)
+                    .values(
+                        scheduled_discount_percentage=None,
+                        scheduled_discount_start=None,
+                        scheduled_discount_end=None,
+                        scheduled_coupon_id=None,
+                        updated_at=now
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+        return activated
+
+    @staticmethod
+    def run_due(now=None, batch_size=500):
+        """Um ciclo do agendador: expira primeiro, depois ativa (o agendado prevalece)"""
+        now = now or datetime.utcnow()
+        expired = DiscountScheduleService.expire_due(now, batch_size)
+        activated = DiscountScheduleService.activate_due(now, batch_size)
+        if expired or activated:
+            logging.info(f"Janelas de desconto: {activated} ativados, {expired} expirados")
+        return {'activated': activated, 'expired': expired}
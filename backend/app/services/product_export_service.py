@@ -0,0 +1,141 @@
+import csv
+import io
+import logging
+
+from app.models.coupon import Coupon
+from app.models.product import Product
+from app.models.product_coupon_application import ProductCouponApplication
+from app.services.product_service import ProductService
+from app.database import db
+from app.utils.fast_json import dumps
+
+
+class ProductExportService:
+    """Exportação do catálogo em streaming (NDJSON/CSV) com memória constante"""
+
+    CSV_COLUMNS = (
+        'id', 'name', 'description', 'price', 'finalPrice', 'stock', 'isOutOfStock', 'is_active',
+        'discountPercentage', 'discountAmount', 'couponCode', 'discountAppliedAt', 'created_at', 'updated_at'
+    )
+
+    @staticmethod
+    def export_query(filters):
+        """Select de colunas (sem hidratar objetos ORM) com o desconto ativo de cada produto.
+
+        Uma linha por produto: com mais de uma aplicação ativa, vale a mais
+        antiga (menor id), a mesma que a listagem exibe.
+        """
+        first_active_application = (
+            db.select(db.func.min(ProductCouponApplication.id))
+            .where(
+                ProductCouponApplication.product_id == Product.id,
+                ProductCouponApplication.is_active == True
+            )
+            .correlate(Product)
+            .scalar_subquery()
+        )
+        query = (
+            db.select(
+                Product.id,
+                Product.name,
+                Product.description,
+                Product.price,
+                Product.final_price,
+                Product.stock,
+                Product.is_active,
+                Product.created_at,
+                Product.updated_at,
+                ProductCouponApplication.discount_percentage,
+                ProductCouponApplication.discount_amount,
+                ProductCouponApplication.applied_at,
+                Coupon.code.label('coupon_code')
+            )
+            .outerjoin(ProductCouponApplication, ProductCouponApplication.id == first_active_application)
+            .outerjoin(Coupon, Coupon.id == ProductCouponApplication.coupon_id)
+        )
+        query, _ = ProductService._apply_filters(query, filters)
+        # Ordem estável pela chave primária: o export pode ser retomado por id
+        return query.order_by(Product.id)
+
+    @staticmethod
+    def iter_rows(filters=None, batch_size=1000):
+        """Gera as linhas do export buscando `batch_size` por vez no cursor"""
+        query = ProductExportService.export_query(filters or {})
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        for row in result:
+            yield row
+
+    @staticmethod
+    def to_record(row):
+        """Linha do select -> dicionário no formato da API"""
+        discount = None
+        if row.discount_percentage is not None:
+            discount = {
+                'percentage': row.discount_percentage,
+                'amount': row.discount_amount,
+                'couponCode': row.coupon_code,
+                'appliedAt': row.applied_at.isoformat() + 'Z' if row.applied_at else None
+            }
+        return {
+            'id': row.id,
+            'name': row.name,
+            'description': row.description,
+            'price': row.price,
+            'finalPrice': row.final_price,
+            'stock': row.stock,
+            'isOutOfStock': row.stock <= 0,
+            'is_active': row.is_active,
+            'discount': discount,
+            'created_at': row.created_at.isoformat() + 'Z',
+            'updated_at': row.updated_at.isoformat() + 'Z' if row.updated_at else None
+        }
+
+    @staticmethod
+    def generate_ndjson(filters=None, batch_size=1000):
+        """Gera o export em NDJSON, um bloco de bytes por lote do cursor"""
+        lines = []
+        try:
+            for row in ProductExportService.iter_rows(filters, batch_size):
+                lines.append(dumps(ProductExportService.to_record(row)))
+                if len(lines) >= batch_size:
+                    yield b'\n'.join(lines) + b'\n'
+                    lines = []
+            if lines:
+                yield b'\n'.join(lines) + b'\n'
+        except Exception:
+            # Cabeçalhos já foram enviados: só resta registrar e encerrar o stream
+            logging.exception("Erro durante exportação NDJSON de produtos")
+            raise
+
+    @staticmethod
+    def generate_csv(filters=None, batch_size=1000):
+        """Gera o export em CSV (cabeçalho + linhas), um bloco por lote do cursor"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(ProductExportService.CSV_COLUMNS)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+        pending = 0
+        try:
+            for row in ProductExportService.iter_rows(filters, batch_size):
+                writer.writerow((
+                    row.id, row.name, row.description, row.price, row.final_price, row.stock,
+                    row.stock <= 0, row.is_active,
+                    row.discount_percentage, row.discount_amount, row.coupon_code,
+                    row.applied_at.isoformat() + 'Z' if row.applied_at else None,
+                    row.created_at.isoformat() + 'Z',
+                    row.updated_at.isoformat() + 'Z' if row.updated_at else None
+                ))
+                pending += 1
+                if pending >= batch_size:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                    pending = 0
+            if pending:
+                yield buffer.getvalue()
+        except Exception:
+            logging.exception("Erro durante exportação CSV de produtos")
+            raise
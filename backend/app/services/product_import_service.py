@@ -0,0 +1,158 @@
+import csv
+import json
+import logging
+from datetime import datetime
+from itertools import islice
+
+from jsonschema import Draft4Validator
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models.product import Product
+from app.database import db
+
+
+class ProductImportService:
+    """Importação em massa de produtos (NDJSON/CSV) em lotes"""
+
+    IMPORT_FIELDS = ('name', 'description', 'price', 'stock')
+
+    @staticmethod
+    def parse_ndjson(lines):
+        """Gera (linha, dados, erro) a partir de linhas NDJSON"""
+        for line_number, raw in enumerate(lines, start=1):
+            line = raw.decode('utf-8') if isinstance(raw, bytes) else raw
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"JSON inválido: {e}"
+                continue
+            if not isinstance(data, dict):
+                yield line_number, None, "Cada linha deve ser um objeto JSON"
+                continue
+            yield line_number, data, None
+
+    @staticmethod
+    def parse_csv(lines):
+        """Gera (linha, dados, erro) a partir de CSV com cabeçalho"""
+        text_lines = (raw.decode('utf-8') if isinstance(raw, bytes) else raw for raw in lines)
+        reader = csv.DictReader(text_lines)
+        for row in reader:
+            data = {key: value for key, value in row.items() if key is not None}
+            # CSV chega como texto: converter para os tipos esperados pelo schema
+            for field, cast in (('price', float), ('stock', int)):
+                if data.get(field) not in (None, ''):
+                    try:
+                        data[field] = cast(data[field])
+                    except ValueError:
+                        pass
+                elif field in data:
+                    del data[field]
+            yield reader.line_num, data, None
+
+    @staticmethod
+    def import_products(records, schema, upsert=False, batch_size=1000):
+        """Valida e grava os registros em lotes, com uma transação por lote.
+
+        `records` vem de parse_ndjson/parse_csv e `schema` é o JSON schema do
+        modelo de entrada de produto (as mesmas regras do POST unitário).
+        No modo upsert, produtos com o mesmo nome são atualizados.
+        """
+        validator = Draft4Validator(schema)
+        report = {'inserted': 0, 'updated': 0, 'failed': 0, 'errors': []}
+
+        def fail(line_number, errors):
+            report['failed'] += 1
+            report['errors'].append({'row': line_number, 'errors': errors})
+
+        def valid_records():
+            for line_number, data, error in records:
+                if error:
+                    fail(line_number, {'row': error})
+                    continue
+                errors = ProductImportService._validation_errors(validator, data)
+                if errors:
+                    fail(line_number, errors)
+                    continue
+                yield line_number, {field: data.get(field) for field in ProductImportService.IMPORT_FIELDS}
+
+        rows = valid_records()
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            ProductImportService._import_batch(batch, upsert, report, fail)
+
+        logging.info(
+            f"Importação concluída: {report['inserted']} inseridos, "
+            f"{report['updated']} atualizados, {report['failed']} com erro"
+        )
+        return report
+
+    @staticmethod
+    def _validation_errors(validator, data):
+        errors = {}
+        for error in validator.iter_errors(data):
+            if error.validator == 'required':
+                field = error.message.split("'")[1]
+            else:
+                field = '.'.join(str(part) for part in error.path) or 'row'
+            errors[field] = error.message
+        return errors
+
+    @staticmethod
+    def _import_batch(batch, upsert, report, fail):
+        """Grava um lote: um SELECT dos nomes existentes, um INSERT e um UPDATE em massa"""
+        now = datetime.utcnow()
+        names = [data['name'] for _, data in batch]
+        existing = dict(db.session.execute(
+            db.select(Product.name, Product.id).where(Product.name.in_(names))
+        ).all())
+
+        inserts, updates = {}, {}
+        for line_number, data in batch:
+            name = data['name']
+            if name in existing:
+                if not upsert:
+                    fail(line_number, {'name': f"Produto '{name}' já existe"})
+                    continue
+                values = dict(data, id=existing[name], updated_at=now)
+                if values['description'] is None:
+                    del values['description']
+                updates[name] = (line_number, values)
+            elif name in inserts and not upsert:
+                fail(line_number, {'name': f"Produto '{name}' duplicado no arquivo"})
+            else:
+                # Sem desconto na criação: preço final igual ao preço
+                inserts[name] = (line_number, dict(
+                    data,
+                    description=data['description'] or '',
+                    final_price=data['price'],
+                    is_active=True,
+                    discount_percentage=0.0,
+                    has_active_discount=False
+                ))
+
+        try:
+            if inserts:
+                db.session.execute(db.insert(Product), [values for _, values in inserts.values()])
+            if updates:
+                db.session.execute(db.update(Product), [values for _, values in updates.values()])
+                # O novo preço pode ter desconto ativo: recalcula o preço final no banco
+                db.session.execute(
+                    db.update(Product)
+                    .where(Product.id.in_([values['id'] for _, values in updates.values()]))
+                    .values(final_price=Product.final_price_expression())
+                    .execution_options(synchronize_session=False)
+                )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logging.error(f"Erro ao importar lote de produtos: {str(e)}")
+            for line_number, _ in list(inserts.values()) + list(updates.values()):
+                fail(line_number, {'row': 'Erro ao gravar o lote no banco de dados'})
+            return
+
+        report['inserted'] += len(inserts)
+        report['updated'] += len(updates)
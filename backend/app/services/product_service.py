@@ -1,8 +1,32 @@
-from datetime import datetime
-from app.models.product import Product
+import logging
+import re
+from datetime import datetime, timezone
+from app.models.product import Product, ProductRecord, products_fts
 from app.models.coupon import Coupon
 from app.models.product_coupon_application import ProductCouponApplication  # se existir
+from app.services.coupon_service import CouponService
 from app.database import db
+from app.utils.catalog_cache import product_list_cache
+from app.utils.pagination import encode_cursor, decode_cursor
+
+# Colunas aceitas em sortBy; cada uma tem um índice composto (coluna, id).
+# "price" ordena pelo preço efetivamente pago (com desconto).
+SORTABLE_COLUMNS = {
+    'name': Product.name,
+    'price': Product.final_price,
+    'stock': Product.stock,
+    'created_at': Product.created_at,
+}
+
+class InsufficientStockError(ValueError):
+    """Reserva maior que o estoque disponível (available = estoque no momento da recusa)"""
+
+    def __init__(self, product_id, requested, available):
+        super().__init__(f"Estoque insuficiente: {requested} solicitado(s), {available} disponível(is)")
+        self.product_id = product_id
+        self.requested = requested
+        self.available = available
+
 
 class ProductService:
     """Serviço para operações com produtos"""
@@ -49,6 +73,25 @@ class ProductService:
         product = Product.query.get(product_id)
         return product.to_dict() if product else None
 
+    @staticmethod
+    def get_product_version(product_id):
+        """Versão do produto para GET condicional: (chave, última modificação) ou None.
+
+        Lê só id/created_at/updated_at; toda escrita no produto atualiza updated_at.
+        """
+        row = db.session.execute(
+            db.select(Product.id, Product.created_at, Product.updated_at).where(Product.id == product_id)
+        ).first()
+        if row is None:
+            return None
+        return ProductService.version_of(row)
+
+    @staticmethod
+    def version_of(product):
+        """(chave de versão, última modificação) de qualquer objeto com id/created_at/updated_at"""
+        last_modified = product.updated_at or product.created_at
+        return f"product:{product.id}:{last_modified.isoformat()}", last_modified
+
     @staticmethod
     def update_product(product_id, data):
         product = Product.query.get(product_id)
@@ -72,16 +115,177 @@ class ProductService:
         return True
 
     @staticmethod
-    def apply_percentage_discount(product_id, percentage):
+    def reserve_stock(product_id, quantity):
+        """Reserva `quantity` unidades com um único UPDATE condicional (stock >= quantity).
+
+        Verificação e baixa acontecem no mesmo statement, então reservas
+        concorrentes nunca deixam o estoque negativo nem vendem além dele.
+        Retorna o estoque restante, None se o produto não existe (ou está
+        inativo) e levanta InsufficientStockError se não há unidades.
+        """
+        ProductService._validate_stock_quantity(quantity)
+        stock = ProductService._update_stock(
+            product_id,
+            Product.stock - quantity,
+            Product.is_active == True,
+            Product.stock >= quantity
+        )
+        if stock is not None:
+            return stock
+
+        available = db.session.execute(
+            db.select(Product.stock).where(Product.id == product_id, Product.is_active == True)
+        ).scalar()
+        if available is None:
+            return None
+        raise InsufficientStockError(product_id, quantity, available)
+
+    @staticmethod
+    def release_stock(product_id, quantity):
+        """Devolve `quantity` unidades ao estoque (UPDATE atômico); None se o produto não existe"""
+        ProductService._validate_stock_quantity(quantity)
+        return ProductService._update_stock(product_id, Product.stock + quantity)
+
+    @staticmethod
+    def adjust_stock_batch(items, chunk_size=1000):
+        """Aplica ajustes de estoque em lote numa única transação (sincronização com o depósito).
+
+        Cada item identifica o produto por `productId` ou `name` e traz
+        `delta` (soma ao estoque atual) ou `stock` (valor absoluto). Itens do
+        mesmo produto são combinados na ordem recebida. Os produtos são
+        resolvidos com um SELECT por bloco de `chunk_size` e gravados com um
+        UPDATE executemany por bloco; o estoque nunca fica negativo.
+        Ids/nomes inexistentes e itens inválidos voltam no relatório.
+        """
+        report = {'received': len(items), 'updated': 0, 'unknown': [], 'invalid': []}
+
+        entries = []
+        for index, item in enumerate(items):
+            error = ProductService._stock_adjustment_error(item)
+            if error:
+                report['invalid'].append({'index': index, 'error': error})
+            else:
+                entries.append((index, item))
+
+        ids = {item['productId'] for _, item in entries if item.get('productId') is not None}
+        names = {item['name'] for _, item in entries if item.get('name') is not None}
+        known_ids = ProductService._resolve_chunked(Product.id, ids, chunk_size)
+        ids_by_name = ProductService._resolve_chunked(Product.name, names, chunk_size)
+
+        # product_id -> [valor absoluto ou None, delta acumulado após ele]
+        adjustments = {}
+        for index, item in entries:
+            if item.get('productId') is not None:
+                product_id = item['productId'] if item['productId'] in known_ids else None
+            else:
+                product_id = ids_by_name.get(item['name'])
+            if product_id is None:
+                report['unknown'].append({
+                    'index': index,
+                    **({'productId': item['productId']} if item.get('productId') is not None else {'name': item['name']})
+                })
+                continue
+
+            adjustment = adjustments.setdefault(product_id, [None, 0])
+            if item.get('stock') is not None:
+                adjustment[0], adjustment[1] = item['stock'], 0
+            else:
+                adjustment[1] += item['delta']
+
+        products = Product.__table__
+        base_stock = db.func.coalesce(db.bindparam('absolute', type_=db.Integer), products.c.stock)
+        new_stock = base_stock + db.bindparam('delta', type_=db.Integer)
+        statement = (
+            db.update(products)
+            .where(products.c.id == db.bindparam('product_id'))
+            .values(stock=db.case((new_stock < 0, 0), else_=new_stock), updated_at=db.bindparam('now'))
+        )
+
+        now = datetime.utcnow()
+        params = [
+            {'product_id': product_id, 'absolute': absolute, 'delta': delta, 'now': now}
+            for product_id, (absolute, delta) in adjustments.items()
+        ]
+        try:
+            for start in range(0, len(params), chunk_size):
+                db.session.execute(statement, params[start:start + chunk_size])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        report['updated'] = len(params)
+        logging.info(
+            f"Estoque em lote: {report['updated']} produtos atualizados, "
+            f"{len(report['unknown'])} desconhecidos, {len(report['invalid'])} inválidos"
+        )
+        return report
+
+    @staticmethod
+    def _stock_adjustment_error(item):
+        if not isinstance(item, dict):
+            return "Cada item deve ser um objeto"
+        if (item.get('productId') is None) == (item.get('name') is None):
+            return "Informe productId ou name (apenas um)"
+        if (item.get('delta') is None) == (item.get('stock') is None):
+            return "Informe delta ou stock (apenas um)"
+        if item.get('stock') is not None and item['stock'] < 0:
+            return "stock absoluto não pode ser negativo"
+        return None
+
+    @staticmethod
+    def _resolve_chunked(column, values, chunk_size):
+        """Busca Product.id pelos valores de `column` em blocos: {valor: id}"""
+        values = list(values)
+        resolved = {}
+        for start in range(0, len(values), chunk_size):
+            rows = db.session.execute(
+                db.select(column, Product.id).where(column.in_(values[start:start + chunk_size]))
+            )
+            resolved.update(rows.tuples().all())
+        return resolved
+
+    @staticmethod
+    def _validate_stock_quantity(quantity):
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+            raise ValueError("A quantidade deve ser um inteiro maior que zero")
+
+    @staticmethod
+    def _update_stock(product_id, new_stock, *conditions):
+        """UPDATE ... RETURNING stock numa transação própria; None se nenhuma linha casou"""
+        try:
+            stock = db.session.execute(
+                db.update(Product)
+                .where(Product.id == product_id, *conditions)
+                .values(stock=new_stock, updated_at=datetime.utcnow())
+                .returning(Product.stock)
+                .execution_options(synchronize_session=False)
+            ).scalar()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return stock
+
+    @staticmethod
+    def apply_percentage_discount(product_id, percentage, starts_at=None, ends_at=None):
         if not (1 <= percentage <= 80):
             raise ValueError("O desconto deve estar entre 1% e 80%")
 
+        starts_at, ends_at = ProductService._discount_window(starts_at, ends_at)
+
         product = Product.query.get(product_id)
         if not product:
             raise ValueError("Produto não encontrado")
 
+        # Início no futuro: só agenda; o agendador ativa quando a janela começar
+        if starts_at is not None:
+            product.schedule_discount(percentage, starts_at, ends_at)
+            db.session.commit()
+            return product.to_dict()
+
         # Aplica o desconto no modelo
-        product.apply_percentage_discount(percentage)
+        product.apply_percentage_discount(percentage, ends_at=ends_at)
 
         # Cria o registro no histórico de aplicação
         ProductCouponApplication.create_application(
@@ -95,34 +299,147 @@ class ProductService:
         return product.to_dict()
 
     @staticmethod
-    def apply_coupon_discount(product_id, coupon_code):
+    def apply_bulk_percentage_discount(filters, percentage, chunk_size=500, starts_at=None, ends_at=None):
+        """Aplica desconto percentual a todos os produtos que atendem aos filtros.
+
+        Em vez de um ciclo ler/gravar por produto, cada bloco de ids recebe três
+        comandos em lote na mesma transação: desativa as aplicações anteriores,
+        atualiza os produtos e insere as novas aplicações via INSERT ... SELECT.
+        Com início no futuro, cada bloco recebe só o UPDATE de agendamento.
+        """
+        if not (1 <= percentage <= 80):
+            raise ValueError("O desconto deve estar entre 1% e 80%")
+
+        starts_at, ends_at = ProductService._discount_window(starts_at, ends_at)
+
+        criteria = ('product_ids', 'search', 'min_price', 'max_price', 'min_stock', 'max_stock')
+        if not any(filters.get(key) not in (None, '', []) for key in criteria):
+            raise ValueError("Informe ao menos um filtro para o desconto em massa")
+
+        query, _ = ProductService._apply_filters(db.select(Product.id), filters)
+        product_ids = db.session.execute(query.order_by(Product.id)).scalars().all()
+
+        now = datetime.utcnow()
+        discount_amount = db.func.round(Product.price * percentage / 100, 2)
+        final_price = db.func.round(Product.price - Product.price * percentage / 100, 2)
+
+        try:
+            for start in range(0, len(product_ids), chunk_size):
+                chunk = product_ids[start:start + chunk_size]
+
+                if starts_at is not None:
+                    db.session.execute(
+                        db.update(Product)
+                        .where(Product.id.in_(chunk))
+                        .values(
+                            scheduled_discount_percentage=percentage,
+                            scheduled_discount_start=starts_at,
+                            scheduled_discount_end=ends_at,
+                            scheduled_coupon_id=None,
+                            updated_at=now
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                    continue
+
+                # Desativa descontos anteriores dos produtos do bloco
+                db.session.execute(
+                    db.update(ProductCouponApplication)
+                    .where(
+                        ProductCouponApplication.product_id.in_(chunk),
+                        ProductCouponApplication.is_active == True
+                    )
+                    .values(is_active=False)
+                    .execution_options(synchronize_session=False)
+                )
+
+                # Registra as novas aplicações a partir dos preços atuais
+                db.session.execute(
+                    db.insert(ProductCouponApplication.__table__).from_select(
+                        ['product_id', 'coupon_id', 'discount_amount', 'discount_percentage', 'applied_at', 'is_active'],
+                        db.select(
+                            Product.id,
+                            db.null(),
+                            discount_amount,
+                            db.literal(percentage),
+                            db.literal(now),
+                            db.literal(True)
+                        ).where(Product.id.in_(chunk))
+                    )
+                )
+
+                db.session.execute(
+                    db.update(Product)
+                    .where(Product.id.in_(chunk))
+                    .values(
+                        discount_percentage=percentage,
+                        has_active_discount=True,
+                        discount_start_date=now,
+                        discount_end_date=ends_at,
+                        final_price=final_price,
+                        updated_at=now
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        logging.info(
+            f"Desconto de {percentage}% {'agendado' if starts_at else 'aplicado'} em massa a {len(product_ids)} produtos"
+        )
+        return {
+            'updated': len(product_ids),
+            'percentage': percentage,
+            'scheduled': starts_at is not None,
+            'startsAt': (starts_at or now).isoformat() + 'Z',
+            'endsAt': ends_at.isoformat() + 'Z' if ends_at else None
+        }
+
+    @staticmethod
+    def apply_coupon_discount(product_id, coupon_code, starts_at=None, ends_at=None):
+        starts_at, ends_at = ProductService._discount_window(starts_at, ends_at)
+
         product = Product.query.get(product_id)
         if not product:
             raise ValueError("Produto não encontrado")
 
-        coupon = Coupon.query.filter_by(code=coupon_code.upper()).first()
+        coupon = CouponService.get_cached_coupon(coupon_code)
         if not coupon:
             raise ValueError("Cupom não encontrado")
 
-        can_use, reason = coupon.can_be_used()
-        if not can_use:
-            raise ValueError(reason)
-
-        # Marca como usado
-        coupon.use()
-
-        # Aplica desconto no produto
-        product.apply_percentage_discount(coupon.discount_percentage)
+        try:
+            # Marca como usado com um UPDATE condicional atômico (sem ultrapassar o limite)
+            redeemed = Coupon.redeem(coupon.code)
+            if not redeemed:
+                current = Coupon.query.get(coupon.id)
+                can_use, reason = current.can_be_used()
+                raise ValueError(reason if not can_use else "Limite de uso atingido")
+
+            # O cupom é consumido agora; com início no futuro o desconto fica agendado
+            if starts_at is not None:
+                product.schedule_discount(coupon.discount_percentage, starts_at, ends_at, coupon_id=coupon.id)
+            else:
+                # Aplica desconto no produto
+                product.apply_percentage_discount(coupon.discount_percentage, ends_at=ends_at)
+
+                # Cria registro da aplicação
+                ProductCouponApplication.create_application(
+                    product_id=product.id,
+                    coupon_id=coupon.id,
+                    discount_amount=product.discount_amount,
+                    discount_percentage=coupon.discount_percentage
+                )
 
-        # Cria registro da aplicação
-        ProductCouponApplication.create_application(
-            product_id=product.id,
-            coupon_id=coupon.id,
-            discount_amount=product.discount_amount,
-            discount_percentage=coupon.discount_percentage
-        )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
 
-        db.session.commit()
+        # Só depois do commit: antes dele, uma leitura concorrente recolocaria no cache o uso anterior
+        CouponService.invalidate_cached_coupon(coupon.code)
         return product.to_dict()
 
     @staticmethod
@@ -132,24 +449,31 @@ class ProductService:
             raise ValueError("Produto não encontrado")
 
         active_application = ProductCouponApplication.get_active_discount_for_product(product_id)
+        had_scheduled_discount = product.has_scheduled_discount
 
-        if not active_application:
+        if not active_application and not had_scheduled_discount:
             raise ValueError("Nenhum desconto ativo encontrado para este produto")
 
-        active_application.deactivate()
+        # Remove também o desconto agendado, se houver
+        if had_scheduled_discount:
+            product.cancel_scheduled_discount()
 
-        # Atualiza o produto para refletir a remoção do desconto
-        product.discount_percentage = 0
-        product.has_active_discount = False
-        product.discount_end_date = datetime.utcnow()
+        if active_application:
+            active_application.deactivate()
+
+            # Atualiza o produto para refletir a remoção do desconto
+            product.discount_percentage = 0
+            product.has_active_discount = False
+            product.discount_end_date = datetime.utcnow()
 
         db.session.commit()
 
         return {
             'success': True,
             'message': 'Desconto removido com sucesso',
-            'final_price': float(product.price),
-            'removed_application_id': active_application.id
+            'final_price': float(product.final_price),
+            'removed_application_id': active_application.id if active_application else None,
+            'cancelled_scheduled_discount': had_scheduled_discount
         }
 
     @staticmethod
@@ -204,42 +528,163 @@ class ProductService:
 
     @staticmethod
     def list_products_with_discount_info(filters=None):
-        """Lista produtos com informações detalhadas de desconto"""
-        if filters is None:
-            filters = {}
+        """Lista produtos com informações detalhadas de desconto.
 
-        query = Product.query
+        Passa pelo cache de resultados (app/utils/catalog_cache.py): o
+        resultado devolvido pode ser compartilhado e não deve ser alterado.
+        """
+        filters = filters or {}
+        cache = product_list_cache()
+        if cache is None:
+            return ProductService._query_listing(filters)
+
+        key = cache.key(filters)
+        result = cache.get(key)
+        if result is None:
+            result = ProductService._query_listing(filters)
+            cache.set(key, result)
+        return result
+
+    @staticmethod
+    def _query_listing(filters):
+        listing = ProductService._listing_statements(filters)
+
+        # Somente leitura: seleciona colunas e monta ProductRecord, sem hidratar objetos ORM
+        total = db.session.execute(listing['count']).scalar() if listing['count'] is not None else None
+        items = [ProductRecord(row) for row in db.session.execute(listing['query'])]
+        return ProductService._listing_result(listing, items, total)
+
+    @staticmethod
+    def _listing_statements(filters):
+        """Monta (sem executar) as consultas da listagem.
+
+        Compartilhado com o modo ASGI, que executa os mesmos selects numa
+        sessão async. Retorna um dict com 'query' (página, já com LIMIT),
+        'count' (None no modo cursor) e os parâmetros de paginação.
+        """
+        query, relevance = ProductService._apply_filters(db.select(*ProductRecord.columns()), filters)
+
+        # Ordenação por (coluna, id) para ser determinística e usar os índices compostos.
+        # Com busca e sem sortBy explícito, ordena por relevância (exceto no modo cursor).
+        keyset = filters.get('cursor') is not None
+        sort_by = filters.get('sort_by') or ('relevance' if relevance is not None and not keyset else 'name')
+        if sort_by == 'relevance' and relevance is None:
+            sort_by = 'name'
+        if sort_by not in SORTABLE_COLUMNS and sort_by != 'relevance':
+            sort_by = 'name'
+        if sort_by == 'relevance' and keyset:
+            raise ValueError("Ordenação por relevância não suporta paginação por cursor")
+        sort_order = 'desc' if filters.get('sort_order') == 'desc' else 'asc'
+        # bm25: quanto menor, mais relevante
+        sort_column = relevance if sort_by == 'relevance' else SORTABLE_COLUMNS[sort_by]
+
+        if sort_order == 'desc':
+            query = query.order_by(sort_column.desc(), Product.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), Product.id.asc())
+
+        limit = filters.get('limit', 10)
+        listing = {'keyset': keyset, 'sort_by': sort_by, 'sort_order': sort_order, 'limit': limit}
+
+        # Paginação por cursor (keyset): sem OFFSET nem COUNT(*); um item a mais indica hasNext
+        if keyset:
+            if filters['cursor']:
+                value, last_id = decode_cursor(
+                    filters['cursor'], sort_by, sort_order, datetime_fields=('created_at',)
+                )
+                position = db.tuple_(sort_column, Product.id)
+                if sort_order == 'desc':
+                    query = query.filter(position < db.tuple_(value, last_id))
+                else:
+                    query = query.filter(position > db.tuple_(value, last_id))
+
+            return {**listing, 'query': query.limit(limit + 1), 'count': None}
+
+        # Paginação (mesma semântica de paginate(error_out=False): COUNT + LIMIT/OFFSET)
+        page = max(filters.get('page', 1), 1)
+        return {
+            **listing,
+            'page': page,
+            'query': query.limit(limit).offset((page - 1) * limit),
+            'count': db.select(db.func.count()).select_from(query.order_by(None).subquery())
+        }
+
+    @staticmethod
+    def _listing_result(listing, items, total, active_applications=None):
+        """Monta a resposta da listagem a partir dos ProductRecord da página"""
+        limit = listing['limit']
+        sort_by = listing['sort_by']
+        sort_order = listing['sort_order']
+
+        if listing['keyset']:
+            has_next = len(items) > limit
+            items = items[:limit]
+
+            return {
+                'products': ProductService._enrich_with_discount_info(items, active_applications),
+                'meta': {
+                    'limit': limit,
+                    'sortBy': sort_by,
+                    'sortOrder': sort_order,
+                    'hasNext': has_next,
+                    'nextCursor': ProductService._next_cursor(items, sort_by, sort_order) if has_next else None
+                }
+            }
 
+        page = listing['page']
+        total_pages = -(-total // limit) if total else 0
+        has_next = page < total_pages
+
+        return {
+            'products': ProductService._enrich_with_discount_info(items, active_applications),
+            'meta': {
+                'page': page,
+                'limit': limit,
+                'total': total,
+                'totalPages': total_pages,
+                'hasNext': has_next,
+                'hasPrev': page > 1,
+                'nextCursor': (
+                    ProductService._next_cursor(items, sort_by, sort_order)
+                    if has_next and sort_by != 'relevance' else None
+                )
+            }
+        }
+
+    @staticmethod
+    def _apply_filters(query, filters):
+        """Aplica os filtros de listagem a uma Query/Select de produtos.
+
+        Retorna (query, expressão de relevância da busca ou None).
+        """
         # Aplicar filtros básicos
         if 'name' in filters and filters['name']:
             query = query.filter(Product.name.ilike(f"%{filters['name']}%"))
 
-        # Filtros de preço considerando desconto
+        if filters.get('product_ids'):
+            query = query.filter(Product.id.in_(filters['product_ids']))
+
+        # Busca textual em nome e descrição
+        relevance = None
+        if filters.get('search'):
+            query, relevance = ProductService._apply_search(query, filters['search'])
+
+        # Filtros de preço considerando desconto (coluna final_price indexada)
         if 'min_price' in filters and filters['min_price'] is not None:
-            if hasattr(Product, 'final_price'):
-                query = query.filter(
-                    db.or_(
-                        Product.final_price >= filters['min_price'],
-                        db.and_(Product.final_price.is_(None), Product.price >= filters['min_price'])
-                    )
-                )
-            else:
-                query = query.filter(Product.price >= filters['min_price'])
+            query = query.filter(Product.final_price >= filters['min_price'])
 
         if 'max_price' in filters and filters['max_price'] is not None:
-            if hasattr(Product, 'final_price'):
-                query = query.filter(
-                    db.or_(
-                        Product.final_price <= filters['max_price'],
-                        db.and_(Product.final_price.is_(None), Product.price <= filters['max_price'])
-                    )
-                )
-            else:
-                query = query.filter(Product.price <= filters['max_price'])
+            query = query.filter(Product.final_price <= filters['max_price'])
+
+        if filters.get('min_stock') is not None:
+            query = query.filter(Product.stock >= filters['min_stock'])
+
+        if filters.get('max_stock') is not None:
+            query = query.filter(Product.stock <= filters['max_stock'])
 
         # Filtro por produtos com desconto
-        if 'has_discount' in filters:
-            active_product_ids = db.session.query(ProductCouponApplication.product_id).filter_by(is_active=True).subquery()
+        if filters.get('has_discount') is not None:
+            active_product_ids = db.select(ProductCouponApplication.product_id).filter_by(is_active=True)
             if filters['has_discount']:
                 # Produtos com aplicação ativa
                 query = query.filter(Product.id.in_(active_product_ids))
@@ -247,18 +692,89 @@ class ProductService:
                 # Produtos sem aplicação ativa
                 query = query.filter(~Product.id.in_(active_product_ids))
 
-        # Paginação
-        page = filters.get('page', 1)
-        limit = filters.get('limit', 10)
-        pagination = query.paginate(page=page, per_page=limit, error_out=False)
+        return query, relevance
+
+    @staticmethod
+    def _apply_search(query, term):
+        """Filtra por nome/descrição e retorna (query, expressão de relevância ou None).
+
+        No SQLite usa o índice FTS5 `products_fts`; nos demais bancos cai para ILIKE.
+        """
+        if db.engine.dialect.name != 'sqlite':
+            pattern = f"%{term}%"
+            return query.filter(db.or_(Product.name.ilike(pattern), Product.description.ilike(pattern))), None
+
+        # Cada palavra vira um termo entre aspas com prefixo ("tecl"* casa "teclado"),
+        # o que também neutraliza a sintaxe de operadores do FTS5
+        tokens = re.findall(r'\w+', term, re.UNICODE)
+        if not tokens:
+            return query, None
+        match = ' '.join(f'"{token}"*' for token in tokens)
+
+        fts = db.literal_column('products_fts')
+        query = query.join(products_fts, products_fts.c.rowid == Product.id).filter(fts.op('MATCH')(match))
+
+        # Ocorrências no nome pesam mais que na descrição
+        return query, db.func.bm25(fts, 10.0, 1.0)
+
+    @staticmethod
+    def _discount_window(starts_at=None, ends_at=None):
+        """Valida a janela do desconto (ISO 8601) e retorna (início, fim) em UTC sem fuso.
+
+        O início volta como None quando já passou: o desconto vale imediatamente.
+        """
+        now = datetime.utcnow()
+        starts_at = ProductService._parse_utc_datetime(starts_at)
+        ends_at = ProductService._parse_utc_datetime(ends_at)
+
+        if ends_at is not None and ends_at <= max(starts_at or now, now):
+            raise ValueError("Fim do desconto deve ser futuro e posterior ao início")
+        if starts_at is not None and starts_at <= now:
+            starts_at = None
+        return starts_at, ends_at
+
+    @staticmethod
+    def _parse_utc_datetime(value):
+        if value is None or value == '':
+            return None
+        if not isinstance(value, datetime):
+            try:
+                value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except (AttributeError, ValueError):
+                raise ValueError(f"Data inválida: {value}")
+        # As colunas guardam UTC sem fuso (datetime.utcnow)
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    @staticmethod
+    def _next_cursor(items, sort_by, sort_order):
+        """Cursor apontando para depois do último item da página"""
+        if not items:
+            return None
+        last = items[-1]
+        return encode_cursor(sort_by, sort_order, getattr(last, SORTABLE_COLUMNS[sort_by].key), last.id)
+
+    @staticmethod
+    def _enrich_with_discount_info(products, active_applications=None):
+        """Adiciona as informações de desconto ativo aos produtos da página.
+
+        `active_applications` ({product_id: registro}) evita a consulta quando
+        quem chama já buscou os descontos (modo ASGI).
+        """
+        # Buscar os descontos ativos da página inteira de uma só vez (projeções, sem ORM)
+        if active_applications is None:
+            active_applications = ProductCouponApplication.get_active_discount_records_for_products(
+                [product.id for product in products]
+            )
 
         # Enriquecer dados dos produtos
         enriched_products = []
-        for product in pagination.items:
+        for product in products:
             product_dict = product.to_dict()
 
             # Buscar informações de desconto
-            active_application = ProductCouponApplication.get_active_discount_for_product(product.id)
+            active_application = active_applications.get(product.id)
 
             if active_application:
                 product_dict['discount_info'] = active_application.to_dict()
@@ -274,14 +790,4 @@ class ProductService:
 
             enriched_products.append(product_dict)
 
-        return {
-            'products': enriched_products,
-            'meta': {
-                'page': pagination.page,
-                'limit': limit,
-                'total': pagination.total,
-                'totalPages': pagination.pages,
-                'hasNext': pagination.has_next,
-                'hasPrev': pagination.has_prev
-            }
-        }
+        return enriched_products
@@ -0,0 +1,142 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Cache em memória com limite de tamanho, despejo LRU e expiração (TTL).
+
+    Seguro para uso entre threads. Contadores de acerto/falha ficam
+    disponíveis em stats() para ajuste de tamanho e TTL.
+    """
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def approximate_size(value):
+    """Tamanho aproximado em bytes de um valor JSON-like (dicts, listas, escalares)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approximate_size(key) + approximate_size(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(approximate_size(item) for item in value)
+    return size
+
+
+class SizedLRUCache:
+    """Cache em memória limitado pelo tamanho aproximado das entradas (bytes), com despejo LRU.
+
+    O tamanho de cada valor é estimado uma vez, na gravação. Valores
+    maiores que um quarto do limite não entram. O TTL opcional limita
+    quanto tempo uma entrada pode ficar desatualizada quando a invalidação
+    não alcança (outros processos). Seguro para uso entre threads.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, size, value = entry
+                if expires_at is None or expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.bytes -= size
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        size = approximate_size(value)
+        if size > self.max_bytes // 4:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._data[key] = (expires_at, size, value)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'bytes': self.bytes,
+                'maxBytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,122 @@
+import threading
+
+from flask import current_app, g, has_app_context, has_request_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.utils.cache import SizedLRUCache
+
+# Tabelas cujas escritas mudam o resultado das listagens de produtos
+CATALOG_TABLES = frozenset({'products', 'coupons', 'product_coupon_applications'})
+
+
+class ProductListCache:
+    """Cache de resultados da listagem de produtos com invalidação por geração.
+
+    A chave é (geração do catálogo, filtros normalizados). Toda transação
+    que escreve em produtos, cupons ou aplicações de desconto incrementa a
+    geração ao ser confirmada: as entradas antigas deixam de ser
+    encontradas (invalidação O(1)) e saem pelo LRU. A geração é lida antes
+    da consulta, então uma leitura concorrente com um commit nunca grava
+    dados antigos sob a geração nova.
+    """
+
+    def __init__(self, max_bytes, ttl):
+        self.entries = SizedLRUCache(max_bytes=max_bytes, ttl=ttl)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def bump(self):
+        with self._lock:
+            self._generation += 1
+
+    def key(self, filters):
+        """Chave da geração atual para os filtros (ignora filtros vazios e a ordem)"""
+        normalized = tuple(sorted((name, value) for name, value in filters.items() if value not in (None, '')))
+        return self._generation, normalized
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, result):
+        self.entries.set(key, result)
+
+    def stats(self):
+        return {'generation': self._generation, **self.entries.stats()}
+
+
+def product_list_cache():
+    """Cache da listagem do app atual, ou None quando desligado ou a leitura deve ir ao primário.
+
+    Requisições fixadas no primário após uma escrita (read-after-write das
+    réplicas) ignoram o cache: outro processo pode ter gravado a entrada.
+    """
+    cache = current_app.extensions.get('product_list_cache')
+    if cache is None or (has_request_context() and g.get('db_read_only') is False):
+        return None
+    return cache
+
+
+def init_product_list_cache(app):
+    """Cria o cache (PRODUCT_LIST_CACHE_ENABLED) e liga a invalidação por eventos de sessão"""
+    if not app.config.get('PRODUCT_LIST_CACHE_ENABLED'):
+        return None
+
+    cache = ProductListCache(
+        max_bytes=app.config['PRODUCT_LIST_CACHE_MAX_BYTES'],
+        ttl=app.config['PRODUCT_LIST_CACHE_TTL']
+    )
+    app.extensions['product_list_cache'] = cache
+    _listen_catalog_writes()
+    return cache
+
+
+def _listen_catalog_writes():
+    # Eventos na classe Session valem para todas as sessões (inclusive a sync_session do modo async)
+    if event.contains(Session, 'after_commit', _bump_on_commit):
+        return
+    event.listen(Session, 'after_flush', _track_flushed_objects)
+    event.listen(Session, 'do_orm_execute', _track_bulk_statements)
+    event.listen(Session, 'after_commit', _bump_on_commit)
+    event.listen(Session, 'after_rollback', _forget_changes)
+
+
+def _track_flushed_objects(session, flush_context):
+    if session.info.get('catalog_changed'):
+        return
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(instance, '__table__', None)
+        if table is not None and table.name in CATALOG_TABLES:
+            session.info['catalog_changed'] = True
+            return
+
+
+def _track_bulk_statements(orm_execute_state):
+    # UPDATE/INSERT/DELETE em lote (db.update(Product), Product.__table__...) não passam pelo flush
+    if not (orm_execute_state.is_update or orm_execute_state.is_insert or orm_execute_state.is_delete):
+        return None
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if table is None or table.name not in CATALOG_TABLES:
+        return None
+
+    # UPDATE/DELETE condicionais sem linhas afetadas (Coupon.redeem recusado) não invalidam. Resultados sem
+    # rowcount (RETURNING de colunas ORM, INSERT em lote) invalidam sempre: consumi-los aqui quebraria quem chama
+    result = orm_execute_state.invoke_statement()
+    if getattr(result, 'rowcount', None) != 0:
+        orm_execute_state.session.info['catalog_changed'] = True
+    return result
+
+
+def _bump_on_commit(session):
+    if session.info.pop('catalog_changed', False) and has_app_context():
+        cache = current_app.extensions.get('product_list_cache')
+        if cache is not None:
+            cache.bump()
+
+
+def _forget_changes(session):
+    session.info.pop('catalog_changed', None)
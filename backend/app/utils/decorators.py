@@ -1,21 +1,116 @@
 from functools import wraps
-from flask import jsonify
+from flask import request
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import http_date
+from werkzeug.wrappers import Response
+import hashlib
+import json
 import logging
-import traceback
 
 def handle_exceptions(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         try:
-            print(f"=== EXECUTANDO {func.__name__} ===")
-            result = func(*args, **kwargs)
-            print(f"=== RESULTADO: {type(result)} ===")
-            print(f"=== CONTEÚDO: {result} ===")
-            return result
+            return func(*args, **kwargs)
+        except HTTPException:
+            # abort() do Flask-RESTX segue para o tratamento padrão (400, 404...)
+            raise
         except Exception as e:
-            print(f"=== ERRO CAPTURADO: {str(e)} ===")
-            print(f"=== TRACEBACK: {traceback.format_exc()} ===")
-            logging.error(f"Erro em {func.__name__}: {str(e)}")
-            logging.error(traceback.format_exc())
-            return jsonify({'error': str(e)}), 500
-    return wrapper
\ No newline at end of file
+            logging.exception(f"Erro em {func.__name__}: {str(e)}")
+            return {'error': str(e)}, 500
+    return wrapper
+
+
+def make_etag(version):
+    """Gera uma ETag forte (sem aspas) a partir de uma chave de versão"""
+    return hashlib.sha1(str(version).encode('utf-8')).hexdigest()
+
+
+def is_not_modified(etag, last_modified, if_none_match, if_modified_since):
+    """Avalia If-None-Match/If-Modified-Since já parseados (If-None-Match tem precedência)"""
+    if if_none_match:
+        return if_none_match.contains(etag)
+    if last_modified is not None and if_modified_since is not None:
+        # Datas HTTP têm resolução de segundos
+        return last_modified.replace(microsecond=0) <= if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def _is_not_modified(etag, last_modified):
+    return is_not_modified(etag, last_modified, request.if_none_match, request.if_modified_since)
+
+
+def validator_headers(etag, last_modified):
+    headers = {'ETag': f'"{etag}"'}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified)
+    return headers
+
+
+def _with_validators(result, etag, last_modified):
+    """Anexa ETag/Last-Modified ao retorno do recurso (dados, tupla ou Response)"""
+    headers = validator_headers(etag, last_modified)
+
+    if isinstance(result, Response):
+        result.headers.extend(headers)
+        return result
+
+    if isinstance(result, tuple):
+        data = result[0]
+        code = result[1] if len(result) > 1 else 200
+        extra = dict(result[2]) if len(result) > 2 and result[2] else {}
+        return data, code, {**extra, **headers}
+
+    return result, 200, headers
+
+
+def conditional_get(version_loader):
+    """GET condicional a partir de uma versão barata do recurso.
+
+    `version_loader` recebe os mesmos argumentos da view e retorna
+    (chave de versão, last_modified) ou None se o recurso não existir.
+    Se o cliente já tem essa versão, responde 304 antes de carregar e
+    serializar o recurso. Deve ficar acima de marshal_with.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            version = version_loader(*args, **kwargs)
+            if version is None:
+                return func(*args, **kwargs)
+
+            version_key, last_modified = version
+            etag = make_etag(version_key)
+            if _is_not_modified(etag, last_modified):
+                return Response(status=304, headers=validator_headers(etag, last_modified))
+
+            return _with_validators(func(*args, **kwargs), etag, last_modified)
+        return wrapper
+    return decorator
+
+
+def conditional_payload(func):
+    """GET condicional para listagens: ETag a partir do hash do corpo serializado.
+
+    Não evita montar a resposta, mas evita reenviá-la quando nada mudou.
+    Deve ficar acima de marshal_with. Com respostas já serializadas
+    (fast_json.json_response) o hash é feito direto sobre o corpo.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        if isinstance(result, Response):
+            if result.status_code != 200 or result.is_streamed:
+                return result
+            etag = hashlib.sha1(result.get_data()).hexdigest()
+        else:
+            data, code = (result[0], result[1]) if isinstance(result, tuple) else (result, 200)
+            if code != 200:
+                return result
+            etag = make_etag(json.dumps(data, sort_keys=True, default=str))
+
+        if _is_not_modified(etag, None):
+            return Response(status=304, headers=validator_headers(etag, None))
+
+        return _with_validators(result, etag, None)
+    return wrapper
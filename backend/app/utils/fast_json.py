@@ -0,0 +1,31 @@
+import json
+from datetime import date, datetime
+
+from flask import Response
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele usamos o json da biblioteca padrão
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Objeto do tipo {type(value).__name__} não é serializável em JSON")
+
+
+def dumps(data):
+    """Serializa em JSON compacto (bytes UTF-8), com orjson quando disponível"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def json_response(data, status=200, headers=None):
+    """Resposta JSON pronta, sem passar por marshal_with nem pela representação do Flask-RESTX.
+
+    Para endpoints de listagem quentes: os dados já saem serializáveis do
+    service, então montar o modelo de novo e identar só custa CPU e bytes.
+    """
+    return Response(dumps(data), status=status, headers=headers, mimetype='application/json')
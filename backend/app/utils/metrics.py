@@ -0,0 +1,175 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Limites (em segundos) dos buckets do histograma de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Contagem de queries de requisições fora do Flask (leituras async do modo ASGI): [quantidade, segundos]
+_task_query_stats = ContextVar('task_query_stats', default=None)
+
+
+class Metrics:
+    """Métricas de requisições em memória, no formato texto do Prometheus.
+
+    O custo por requisição é um punhado de somas sob um lock; a
+    formatação só acontece quando /api/metrics é lido.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._requests = defaultdict(int)
+        self._latency = defaultdict(lambda: [[0] * len(self.buckets), 0.0, 0])
+        self._db = defaultdict(lambda: [0, 0.0])
+
+    def observe_request(self, method, route, status, duration, query_count, query_time):
+        bucket = bisect_left(self.buckets, duration)
+        with self._lock:
+            self._requests[(method, route, status)] += 1
+            latency = self._latency[(method, route)]
+            if bucket < len(self.buckets):
+                latency[0][bucket] += 1
+            latency[1] += duration
+            latency[2] += 1
+            db_stats = self._db[(method, route)]
+            db_stats[0] += query_count
+            db_stats[1] += query_time
+
+    def render(self, extra_gauges=None):
+        """Gera o texto de exposição (text/plain; version=0.0.4)"""
+        with self._lock:
+            requests = dict(self._requests)
+            latency = {key: ([*value[0]], value[1], value[2]) for key, value in self._latency.items()}
+            db_stats = {key: tuple(value) for key, value in self._db.items()}
+
+        lines = [
+            '# HELP http_requests_total Total de requisições HTTP',
+            '# TYPE http_requests_total counter',
+        ]
+        for (method, route, status), count in sorted(requests.items()):
+            lines.append(f'http_requests_total{_labels(method=method, route=route, status=status)} {count}')
+
+        lines += [
+            '# HELP http_request_duration_seconds Latência das requisições HTTP',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (method, route), (counts, total, count) in sorted(latency.items()):
+            cumulative = 0
+            for limit, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'http_request_duration_seconds_bucket{_labels(method=method, route=route, le=limit)} {cumulative}'
+                )
+            lines.append(
+                f'http_request_duration_seconds_bucket{_labels(method=method, route=route, le="+Inf")} {count}'
+            )
+            lines.append(f'http_request_duration_seconds_sum{_labels(method=method, route=route)} {total:.6f}')
+            lines.append(f'http_request_duration_seconds_count{_labels(method=method, route=route)} {count}')
+
+        lines += [
+            '# HELP db_queries_total Queries SQL executadas durante requisições',
+            '# TYPE db_queries_total counter',
+        ]
+        for (method, route), (count, _) in sorted(db_stats.items()):
+            lines.append(f'db_queries_total{_labels(method=method, route=route)} {count}')
+
+        lines += [
+            '# HELP db_query_duration_seconds_total Tempo gasto em queries SQL durante requisições',
+            '# TYPE db_query_duration_seconds_total counter',
+        ]
+        for (method, route), (_, seconds) in sorted(db_stats.items()):
+            lines.append(f'db_query_duration_seconds_total{_labels(method=method, route=route)} {seconds:.6f}')
+
+        for name, help_text, samples in extra_gauges or ():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+            for labels, value in samples:
+                lines.append(f'{name}{_labels(**labels)} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(**labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start_time'].pop()
+    if has_request_context() and 'metrics_start' in g:
+        g.db_query_count += 1
+        g.db_query_time += time.perf_counter() - started
+        return
+    stats = _task_query_stats.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - started
+
+
+def track_task_queries():
+    """Passa a contar as queries da tarefa asyncio atual; retorna [quantidade, segundos]"""
+    stats = [0, 0.0]
+    _task_query_stats.set(stats)
+    return stats
+
+
+def _handle_error(exception_context):
+    # Query que falhou não passa por after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_start_time'):
+        connection.info['query_start_time'].pop()
+
+
+_listeners_installed = False
+
+
+def init_metrics(app):
+    """Registra a coleta de métricas por requisição e o timing de queries"""
+    global _listeners_installed
+
+    metrics = Metrics()
+    app.extensions['metrics'] = metrics
+
+    # Vale para todos os engines (inclusive os criados depois)
+    if not _listeners_installed:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+        _listeners_installed = True
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        g.db_query_count = 0
+        g.db_query_time = 0.0
+
+    @app.after_request
+    def _record_request_metrics(response):
+        if 'metrics_start' in g:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            metrics.observe_request(
+                request.method,
+                route,
+                response.status_code,
+                time.perf_counter() - g.metrics_start,
+                g.db_query_count,
+                g.db_query_time
+            )
+        return response
+
+    return metrics
@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(sort_by, sort_order, value, item_id):
+    """Gera um cursor opaco a partir da chave (coluna de ordenação, id) do último item"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+
+    payload = json.dumps(
+        {'s': sort_by, 'o': sort_order, 'v': value, 'id': item_id},
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort_by, sort_order, datetime_fields=()):
+    """Decodifica um cursor e retorna (valor, id) da última posição lida.
+
+    O cursor só é aceito para a mesma ordenação em que foi gerado.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        value, item_id = payload['v'], int(payload['id'])
+        cursor_sort_by, cursor_sort_order = payload['s'], payload['o']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Cursor inválido")
+
+    if cursor_sort_by != sort_by or cursor_sort_order != sort_order:
+        raise ValueError("Cursor não corresponde à ordenação solicitada")
+
+    if sort_by in datetime_fields:
+        try:
+            value = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError("Cursor inválido")
+
+    return value, item_id
@@ -0,0 +1,63 @@
+import logging
+from collections import defaultdict
+
+from flask import request
+from flask_sqlalchemy.record_queries import get_recorded_queries
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Requisição excedeu o orçamento de queries ou apresentou padrão N+1"""
+
+
+def _query_problems(queries, budget, nplus1_threshold):
+    """Retorna a lista de problemas encontrados nas queries de uma requisição"""
+    problems = []
+
+    if len(queries) > budget:
+        problems.append(f"{len(queries)} queries (orçamento: {budget})")
+
+    # Mesmo SQL repetido com parâmetros diferentes é o sintoma clássico de N+1
+    by_statement = defaultdict(list)
+    for query in queries:
+        by_statement[query.statement].append(query)
+
+    for statement, executions in by_statement.items():
+        distinct_parameters = {repr(query.parameters) for query in executions}
+        if len(executions) >= nplus1_threshold and len(distinct_parameters) > 1:
+            first_line = ' '.join(statement.split())[:120]
+            problems.append(
+                f"possível N+1: {len(executions)}x '{first_line}...' em {executions[0].location}"
+            )
+
+    return problems
+
+
+def init_query_guard(app):
+    """Confere o orçamento de queries SQL de cada requisição.
+
+    Usa as queries registradas pelo Flask-SQLAlchemy (SQLALCHEMY_RECORD_QUERIES).
+    SQL_QUERY_BUDGET_MODE define a reação: 'raise' (testes), 'log'
+    (desenvolvimento) ou None (desligado). SQL_QUERY_BUDGETS permite um
+    orçamento por endpoint; None nesse dicionário dispensa o endpoint.
+    """
+    mode = app.config.get('SQL_QUERY_BUDGET_MODE')
+    if not mode or not app.config.get('SQLALCHEMY_RECORD_QUERIES'):
+        return
+
+    default_budget = app.config.get('SQL_QUERY_BUDGET', 15)
+    budgets = app.config.get('SQL_QUERY_BUDGETS', {})
+    nplus1_threshold = app.config.get('SQL_NPLUS1_THRESHOLD', 5)
+
+    @app.after_request
+    def _check_query_budget(response):
+        budget = budgets.get(request.endpoint, default_budget)
+        if budget is None:
+            return response
+
+        problems = _query_problems(get_recorded_queries(), budget, nplus1_threshold)
+        if problems:
+            message = f"{request.method} {request.path}: " + '; '.join(problems)
+            if mode == 'raise':
+                raise QueryBudgetExceeded(message)
+            logging.warning(f"Orçamento de queries: {message}")
+        return response
@@ -0,0 +1,174 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.sql import Select
+
+# Bind de cada réplica em SQLALCHEMY_BINDS: replica_0, replica_1...
+REPLICA_BIND_PREFIX = 'replica_'
+
+# Métodos atendidos por réplicas; escritas bem-sucedidas fixam o cliente no primário
+READ_ONLY_METHODS = ('GET', 'HEAD')
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+class ReplicaPool:
+    """Réplicas de leitura: round-robin entre as saudáveis, com quarentena após falha.
+
+    Uma réplica sai do rodízio quando uma query nela falha por conexão
+    (passivo) ou quando o health check periódico falha (ativo), e volta
+    após `cooldown` segundos ou no próximo health check bem-sucedido.
+    Sem réplica saudável, as leituras vão para o primário.
+    """
+
+    def __init__(self, names, cooldown=30.0):
+        self.names = list(names)
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._next = 0
+        self._down_until = {}
+        self._reads = defaultdict(int)
+        self.primary_fallbacks = 0
+
+    def choose(self):
+        """Próxima réplica saudável (nome do bind) ou None"""
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.names)):
+                name = self.names[self._next % len(self.names)]
+                self._next += 1
+                if self._down_until.get(name, 0) <= now:
+                    self._reads[name] += 1
+                    return name
+            self.primary_fallbacks += 1
+            return None
+
+    def mark_down(self, name, reason):
+        with self._lock:
+            was_up = self._down_until.get(name, 0) <= time.monotonic()
+            self._down_until[name] = time.monotonic() + self.cooldown
+        if was_up:
+            logging.warning(f"Réplica {name} fora do rodízio por {self.cooldown:.0f}s: {reason}")
+
+    def mark_up(self, name):
+        with self._lock:
+            was_down = self._down_until.pop(name, 0) > time.monotonic()
+        if was_down:
+            logging.info(f"Réplica {name} de volta ao rodízio")
+
+    def is_healthy(self, name):
+        with self._lock:
+            return self._down_until.get(name, 0) <= time.monotonic()
+
+    def check(self, engines, query='SELECT 1'):
+        """Health check ativo: executa `query` em cada réplica"""
+        for name in self.names:
+            try:
+                with engines[name].connect() as connection:
+                    connection.execute(text(query))
+            except Exception as e:
+                self.mark_down(name, f"health check: {e}")
+            else:
+                self.mark_up(name)
+
+    def stats(self):
+        with self._lock:
+            reads = dict(self._reads)
+            fallbacks = self.primary_fallbacks
+        return {
+            'replicas': {
+                name: {'healthy': self.is_healthy(name), 'reads': reads.get(name, 0)}
+                for name in self.names
+            },
+            'primary_fallbacks': fallbacks
+        }
+
+
+class RoutingSession(Session):
+    """Sessão do Flask-SQLAlchemy que manda SELECTs de requisições de leitura para réplicas.
+
+    Vai para o primário: qualquer coisa fora de requisição (CLI, agendador),
+    métodos de escrita, flush, statements que não são SELECT e, depois de
+    uma escrita, o resto da requisição. A réplica é escolhida uma vez por
+    requisição, então COUNT e página leem o mesmo banco.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and g.get('db_read_only'):
+            if self._flushing or (clause is not None and not isinstance(clause, Select)):
+                # Escrita numa requisição de leitura: daqui em diante, só primário
+                g.db_read_only = False
+            else:
+                name = _request_replica()
+                if name is not None:
+                    return self._db.engines[name]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _request_replica():
+    if 'db_replica' not in g:
+        g.db_replica = current_app.extensions['replicas'].choose()
+    return g.db_replica
+
+
+def replica_binds(urls):
+    """SQLALCHEMY_BINDS das réplicas a partir de DATABASE_REPLICA_URLS"""
+    return {f'{REPLICA_BIND_PREFIX}{index}': url for index, url in enumerate(urls)}
+
+
+def init_replicas(app, db):
+    """Liga o roteamento de leituras (db precisa usar RoutingSession).
+
+    Requisições GET/HEAD leem das réplicas, exceto quando o cliente
+    escreveu há menos de READ_AFTER_WRITE_SECONDS: toda escrita bem-sucedida
+    grava um cookie que fixa as leituras dele no primário nessa janela.
+
+    O frontend é de outra origem, então o cookie só vai e volta com
+    credenciais dos dois lados: supports_credentials no CORS_OPTIONS e
+    withCredentials no cliente (OpenAPI.WITH_CREDENTIALS). Com SameSite=Lax,
+    frontend e API precisam estar no mesmo site (ex.: ambos em localhost).
+    """
+    names = [key for key in (app.config.get('SQLALCHEMY_BINDS') or {}) if key.startswith(REPLICA_BIND_PREFIX)]
+    if not names:
+        return None
+
+    pool = ReplicaPool(names, cooldown=app.config['REPLICA_FAILURE_COOLDOWN'])
+    app.extensions['replicas'] = pool
+    cookie = app.config['READ_AFTER_WRITE_COOKIE']
+    window = app.config['READ_AFTER_WRITE_SECONDS']
+
+    with app.app_context():
+        for name in names:
+            _watch_replica_errors(db.engines[name], name, pool)
+
+    @app.before_request
+    def _route_reads():
+        pinned_until = request.cookies.get(cookie, type=float)
+        g.db_read_only = (
+            request.method in READ_ONLY_METHODS
+            and not (pinned_until and pinned_until > time.time())
+        )
+
+    @app.after_request
+    def _pin_writer_to_primary(response):
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                cookie, f'{time.time() + window:.3f}', max_age=int(window) + 1, httponly=True, samesite='Lax'
+            )
+        return response
+
+    return pool
+
+
+def _watch_replica_errors(engine, name, pool):
+    @event.listens_for(engine, 'handle_error')
+    def _quarantine_on_error(exception_context):
+        # Queda de conexão ou banco indisponível/inconsistente tira a réplica do rodízio
+        if exception_context.is_disconnect or isinstance(
+            exception_context.original_exception, engine.dialect.dbapi.OperationalError
+        ):
+            pool.mark_down(name, exception_context.original_exception)
@@ -0,0 +1,80 @@
+import logging
+import threading
+
+
+class IntervalScheduler:
+    """Executa uma função periodicamente numa thread daemon, dentro do app context.
+
+    Uma instância por processo. Várias instâncias (workers) rodando ao mesmo
+    tempo são seguras desde que a função seja idempotente, como os UPDATEs
+    condicionais do agendador de descontos.
+    """
+
+    def __init__(self, app, func, interval, name):
+        self.app = app
+        self.func = func
+        self.interval = interval
+        self.name = name
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_once(self):
+        with self.app.app_context():
+            return self.func()
+
+    def _run(self):
+        # Primeira execução imediata (recupera janelas vencidas com o processo parado)
+        while True:
+            try:
+                self.run_once()
+            except Exception:
+                logging.exception(f"Erro na tarefa periódica {self.name}")
+            if self._stop.wait(self.interval):
+                break
+
+
+def init_scheduler(app, name, func, interval):
+    """Registra uma tarefa periódica, iniciada por start_schedulers na subida do servidor.
+
+    Não inicia na criação do app: comandos `flask` e o processo mestre de
+    servidores com preload não devem ter threads. Cada ponto de entrada
+    chama start_schedulers no processo que atende requisições (lifespan do
+    ASGI, post_fork do gunicorn, run.py).
+    """
+    scheduler = IntervalScheduler(app, func, interval, name)
+    app.extensions[name] = scheduler
+    return scheduler
+
+
+def _schedulers(app):
+    return [extension for extension in app.extensions.values() if isinstance(extension, IntervalScheduler)]
+
+
+def start_schedulers(app):
+    """Inicia as tarefas periódicas registradas no app (idempotente)"""
+    for scheduler in _schedulers(app):
+        scheduler.start()
+
+
+def stop_schedulers(app, timeout=None):
+    """Sinaliza e aguarda o fim das tarefas periódicas do app"""
+    for scheduler in _schedulers(app):
+        scheduler.stop(timeout)
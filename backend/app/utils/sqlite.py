@@ -0,0 +1,79 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# Perfil de alto throughput: PRAGMAs aplicados a cada conexão nova
+DEFAULT_SQLITE_PRAGMAS = {
+    # Leitores não bloqueiam o escritor (nem o escritor os leitores)
+    'journal_mode': 'WAL',
+    # Em WAL, NORMAL só sincroniza no checkpoint: seguro contra corrupção, pode perder o último commit numa queda de energia
+    'synchronous': 'NORMAL',
+    # Espera (ms) pelo lock de escrita em vez de falhar com "database is locked"
+    'busy_timeout': 5000,
+    # Leituras pelo page cache do SO sem cópia (256 MB)
+    'mmap_size': 268435456,
+    # Cache de páginas por conexão; negativo = KiB (64 MB)
+    'cache_size': -65536,
+    'temp_store': 'MEMORY',
+}
+
+
+def is_sqlite_file(url):
+    """True para SQLite em arquivo (WAL e pool não se aplicam ao banco em memória)"""
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def sqlite_engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS do perfil SQLite (SQLITE_PERFORMANCE_PROFILE).
+
+    Em WAL, leituras são concorrentes e o custo de abrir conexão (PRAGMAs,
+    mmap, cache frio) é o que pesa: QueuePool com uma conexão por thread
+    do servidor, devolvida em LIFO para que cada requisição pegue a conexão
+    de cache mais quente. pool_pre_ping e pool_recycle não servem para um
+    arquivo local e custariam um SELECT por checkout.
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if not config.get('SQLITE_PERFORMANCE_PROFILE') or not is_sqlite_file(config['SQLALCHEMY_DATABASE_URI']):
+        return options
+
+    for option in ('pool_pre_ping', 'pool_recycle'):
+        options.pop(option, None)
+    options.update(
+        poolclass=QueuePool,
+        pool_size=config['SQLITE_POOL_SIZE'],
+        max_overflow=config.get('SQLITE_POOL_MAX_OVERFLOW', 0),
+        pool_use_lifo=True,
+    )
+    return options
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Executa os PRAGMAs em cada conexão nova do engine (inclusive async, via sync_engine)"""
+    statements = [f'PRAGMA {name}={value}' for name, value in pragmas.items()]
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def sqlite_pragmas(config):
+    """PRAGMAs do perfil: os padrões com os ajustes de SQLITE_PRAGMAS"""
+    return {**DEFAULT_SQLITE_PRAGMAS, **(config.get('SQLITE_PRAGMAS') or {})}
+
+
+def init_sqlite_profile(app, db):
+    """Registra os PRAGMAs em todos os engines SQLite em arquivo (primário e réplicas)"""
+    if not app.config.get('SQLITE_PERFORMANCE_PROFILE'):
+        return
+
+    pragmas = sqlite_pragmas(app.config)
+    with app.app_context():
+        for engine in db.engines.values():
+            if is_sqlite_file(engine.url):
+                apply_sqlite_pragmas(engine, pragmas)
@@ -0,0 +1,6 @@
+from app.asgi import create_asgi_app
+import os
+
+# Modo ASGI: uvicorn asgi:app --workers 2 (requer asgiref e aiosqlite/asyncpg)
+# As leituras de catálogo rodam em sessões async; o restante da API segue pelo Flask.
+app = create_asgi_app(os.environ.get('APP_CONFIG', 'config.DevelopmentConfig'))
@@ -0,0 +1,299 @@
+"""Concorrência: modo WSGI com threads (run.py) x modo ASGI com leituras async (asgi.py).
+
+Sobe cada modo num subprocesso, dispara centenas de clientes simultâneos
+em loop sobre as leituras de catálogo (listagens de produtos e cupons,
+detalhe de produto) e compara latência, vazão e erros/timeouts.
+
+--db-latency-ms simula um banco remoto: cada statement espera esse tempo
+na thread que o executa (a da requisição no WSGI, a da conexão aiosqlite
+no ASGI). Os dois modos usam o mesmo tamanho de pool (--pool-size).
+
+Uso (a partir de backend/; o modo ASGI requer asgiref, aiosqlite e uvicorn):
+    python -m benchmarks.concurrency                               # 500 clientes, 15s por modo
+    python -m benchmarks.concurrency --clients 1000 --db-latency-ms 10
+    python -m benchmarks.concurrency --modes asgi --duration 30 --output concurrency.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from urllib.parse import quote
+
+from sqlalchemy import event
+
+from app import create_app
+from app.database import db
+from app.models.coupon import Coupon
+from app.models.product import Product
+from benchmarks.run import make_config, summarize
+from benchmarks.seed import WORDS, seed_catalog
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_server_config(database_path, pool_size):
+    class ConcurrencyConfig(make_config(database_path)):
+        """Mesmo limite de conexões nos dois modos; espera longa pelo pool em vez de erro"""
+        SQLALCHEMY_ENGINE_OPTIONS = {'pool_size': pool_size, 'max_overflow': 0, 'pool_timeout': 120}
+        ASYNC_DB_POOL_SIZE = pool_size
+        ASYNC_DB_MAX_OVERFLOW = 0
+
+    return ConcurrencyConfig
+
+
+def install_db_latency(engine, seconds):
+    """Atraso fixo por statement, na thread que executa a query (callback de trace do SQLite)"""
+    def delay(statement):
+        # Só statements da aplicação: as consultas internas do FTS5 vêm aninhadas ("-- ...") ou em 'main'.*
+        if statement.startswith('--') or "'main'." in statement:
+            return
+        time.sleep(seconds)
+
+    @event.listens_for(engine, 'connect')
+    def _set_trace_callback(dbapi_connection, connection_record):
+        if hasattr(dbapi_connection, 'run_async'):
+            # aiosqlite: registra na thread da própria conexão
+            dbapi_connection.run_async(lambda connection: connection.set_trace_callback(delay))
+        else:
+            dbapi_connection.set_trace_callback(delay)
+
+
+def serve(mode, database_path, port, pool_size, db_latency):
+    """Processo servidor de um modo (chamado via --serve)"""
+    config = make_server_config(database_path, pool_size)
+
+    if mode == 'wsgi':
+        from werkzeug.serving import run_simple
+
+        # Log de acesso por requisição distorceria a medição
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+        app = create_app(config)
+        if db_latency:
+            with app.app_context():
+                install_db_latency(db.engine, db_latency)
+        # Mesmo servidor de run.py (threaded=True), sem reloader nem debugger
+        run_simple('127.0.0.1', port, app, threaded=True, use_reloader=False, use_debugger=False)
+        return
+
+    import uvicorn
+    from app.asgi import create_asgi_app
+
+    asgi_app = create_asgi_app(config)
+    if db_latency:
+        with asgi_app.flask_app.app_context():
+            install_db_latency(db.engine, db_latency)
+        install_db_latency(asgi_app.db.engine.sync_engine, db_latency)
+    uvicorn.run(asgi_app, host='127.0.0.1', port=port, log_level='warning', backlog=4096)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, args, port):
+    command = [
+        sys.executable, '-m', 'benchmarks.concurrency', '--serve', mode,
+        '--database', args.database, '--port', str(port),
+        '--pool-size', str(args.pool_size), '--db-latency-ms', str(args.db_latency_ms),
+    ]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Servidor {mode} terminou com código {process.returncode}")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/health/', timeout=2):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Servidor {mode} não respondeu em 60s")
+
+
+def stop_server(process):
+    # SIGINT: o uvicorn executa o shutdown do lifespan (descarta o engine async)
+    process.send_signal(2)
+    try:
+        process.wait(10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def build_paths(app, rng, count=2000):
+    """Mistura de leituras de navegação: listagens, buscas, páginas e detalhes"""
+    with app.app_context():
+        product_ids = db.session.execute(db.select(Product.id).limit(5000)).scalars().all()
+        pages = max(min(Product.query.count() // 20, 200), 1)
+        coupon_pages = max(min(Coupon.query.count() // 10, 50), 1)
+
+    paths = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.35:
+            paths.append(f'/api/products/?page={rng.randint(1, pages)}&limit=20')
+        elif roll < 0.5:
+            paths.append(f'/api/products/?search={quote(rng.choice(WORDS))}&limit=20')
+        elif roll < 0.6:
+            paths.append(f'/api/products/?limit=20&sortBy=price&minPrice={rng.randint(5, 1000)}')
+        elif roll < 0.85:
+            paths.append(f'/api/products/{rng.choice(product_ids)}')
+        else:
+            paths.append(f'/api/coupons/?page={rng.randint(1, coupon_pages)}')
+    return paths
+
+
+async def _request(port, connection, path, timeout):
+    """GET com keep-alive quando o servidor permite; retorna (status, conexão reaproveitável ou None)"""
+    if connection is None:
+        connection = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), timeout)
+    reader, writer = connection
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: keep-alive\r\n\r\n'.encode())
+    await writer.drain()
+
+    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout)
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if 'content-length' in headers:
+        await asyncio.wait_for(reader.readexactly(int(headers['content-length'])), timeout)
+    else:
+        await asyncio.wait_for(reader.read(), timeout)
+
+    # O servidor de desenvolvimento do Werkzeug responde em HTTP/1.0 e fecha a conexão
+    if lines[0].startswith('HTTP/1.0') or headers.get('connection', '').lower() == 'close':
+        writer.close()
+        return status, None
+    return status, connection
+
+
+async def _client(port, paths, offset, deadline, timeout, durations, counters):
+    connection = None
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            status, connection = await _request(port, connection, path, timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError) as error:
+            counters['timeouts' if isinstance(error, asyncio.TimeoutError) else 'errors'] += 1
+            if connection is not None:
+                connection[1].close()
+            connection = None
+            continue
+        durations.append((time.perf_counter() - started) * 1000)
+        if status >= 500:
+            counters['errors'] += 1
+    if connection is not None:
+        connection[1].close()
+
+
+async def run_load(port, paths, clients, duration, timeout):
+    durations = []
+    counters = {'errors': 0, 'timeouts': 0}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        _client(port, paths, i * 7, deadline, timeout, durations, counters) for i in range(clients)
+    ))
+    return durations, time.perf_counter() - started, counters
+
+
+def measure_mode(mode, args, paths):
+    port = free_port()
+    process = start_server(mode, args, port)
+    try:
+        # Aquecimento com poucos clientes: conexões do pool, caches e imports
+        asyncio.run(run_load(port, paths, min(args.clients, 20), 2, args.timeout))
+        durations, elapsed, counters = asyncio.run(
+            run_load(port, paths, args.clients, args.duration, args.timeout)
+        )
+    finally:
+        stop_server(process)
+
+    if not durations:
+        return {'iterations': 0, **counters}
+    stats = summarize(durations, elapsed, counters['errors'])
+    stats['timeouts'] = counters['timeouts']
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Concorrência: WSGI com threads x ASGI async')
+    parser.add_argument('--clients', type=int, default=500, help='clientes simultâneos')
+    parser.add_argument('--duration', type=float, default=15, help='segundos de carga por modo')
+    parser.add_argument('--timeout', type=float, default=30, help='timeout por requisição (s)')
+    parser.add_argument('--modes', default='wsgi,asgi', help='modos a medir, separados por vírgula')
+    parser.add_argument('--pool-size', type=int, default=20, help='conexões do pool em cada modo')
+    parser.add_argument('--db-latency-ms', type=float, default=0.0, help='atraso simulado por statement')
+    parser.add_argument('--products', type=int, default=20_000)
+    parser.add_argument('--coupons', type=int, default=2_000)
+    parser.add_argument('--applications', type=int, default=50_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', help='arquivo SQLite a usar (reaproveitado se já estiver populado)')
+    parser.add_argument('--output', help='grava os resultados em JSON')
+    parser.add_argument('--serve', choices=('wsgi', 'asgi'), help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.serve, args.database, args.port, args.pool_size, args.db_latency_ms / 1000)
+        return 0
+
+    # Cada cliente e cada conexão aceita consomem um descritor
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = args.clients * 2 + 256
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+
+    args.database = args.database or os.path.join(tempfile.mkdtemp(prefix='pm-bench-'), 'bench.db')
+    app = create_app(make_config(args.database))
+    with app.app_context():
+        if Product.query.first() is None:
+            sizes = seed_catalog(args.products, args.coupons, args.applications, seed=args.seed)
+            print(f"Catálogo populado: {sizes}")
+        else:
+            print(f"Reaproveitando banco {args.database}")
+    paths = build_paths(app, random.Random(args.seed))
+
+    print(f"{args.clients} clientes, {args.duration:.0f}s por modo, pool {args.pool_size}, "
+          f"latência simulada {args.db_latency_ms:.1f}ms/statement")
+    results = {'meta': {k: v for k, v in vars(args).items() if k not in ('serve', 'port')}, 'results': {}}
+    for mode in args.modes.split(','):
+        stats = measure_mode(mode, args, paths)
+        results['results'][mode] = stats
+        if not stats['iterations']:
+            print(f"  {mode:<5} nenhuma resposta ({stats['errors']} erros, {stats['timeouts']} timeouts)")
+            continue
+        print(f"  {mode:<5} p50 {stats['p50_ms']:8.1f}ms  p95 {stats['p95_ms']:8.1f}ms  "
+              f"p99 {stats['p99_ms']:8.1f}ms  {stats['throughput_rps']:8.1f} req/s  "
+              f"{stats['errors']} erros  {stats['timeouts']} timeouts")
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+        print(f"Resultados gravados em {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Cenários de leitura: objetos ORM x projeções ProductRecord (CPU e alocações por linha)."""
+import tracemalloc
+
+from app.database import db
+from app.models.product import Product, ProductRecord
+from app.models.product_coupon_application import ProductCouponApplication
+
+
+def _orm_page(limit):
+    """Caminho anterior: hidrata Product no identity map (descontos pelo mesmo helper da listagem)"""
+    products = Product.query.order_by(Product.name, Product.id).limit(limit).all()
+    applications = ProductCouponApplication.get_active_discount_records_for_products([p.id for p in products])
+    return [
+        (product.to_dict(), applications[product.id].to_dict() if product.id in applications else None)
+        for product in products
+    ]
+
+
+def _projection_page(limit):
+    """Caminho de leitura atual: select de colunas -> registros com __slots__"""
+    products = [
+        ProductRecord(row)
+        for row in db.session.execute(
+            db.select(*ProductRecord.columns()).order_by(Product.name, Product.id).limit(limit)
+        )
+    ]
+    applications = ProductCouponApplication.get_active_discount_records_for_products([p.id for p in products])
+    return [
+        (product.to_dict(), applications[product.id].to_dict() if product.id in applications else None)
+        for product in products
+    ]
+
+
+def _in_fresh_session(app, page, limit):
+    def run():
+        # Sessão nova a cada chamada: o identity map não pode reaproveitar objetos entre medições
+        with app.app_context():
+            rows = page(limit)
+            db.session.remove()
+            return rows
+    return run
+
+
+def peak_allocation_per_row(fn, rows):
+    """Pico de memória alocada (bytes) durante uma chamada, dividido pelo número de linhas"""
+    fn()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / max(rows, 1))
+
+
+def build_projection_scenarios(app, page_sizes=(50, 1000)):
+    """Cenários (nome, função sem argumentos, linhas por chamada)"""
+    scenarios = []
+    for limit in page_sizes:
+        scenarios.append((f'read_products_orm_{limit}', _in_fresh_session(app, _orm_page, limit), limit))
+        scenarios.append((f'read_products_projection_{limit}', _in_fresh_session(app, _projection_page, limit), limit))
+    return scenarios
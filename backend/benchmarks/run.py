@@ -0,0 +1,293 @@
+"""Suite de benchmarks da API.
+
+Popula um banco SQLite temporário com um catálogo grande, mede cada
+endpoint pelo test client do Flask e grava p50/p95/p99 e vazão em JSON.
+Se houver baseline, compara e aponta regressões.
+
+Uso (a partir de backend/):
+    python -m benchmarks.run                                  # 100k produtos, 10k cupons, 500k aplicações
+    python -m benchmarks.run --products 10000 --coupons 1000 --applications 50000 --iterations 100
+    python -m benchmarks.run --update-baseline                # grava benchmarks/baseline.json
+    python -m benchmarks.run --only products_list --fail-on-regression
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import sqlalchemy
+
+from app import create_app
+from app.database import db
+from app.models.coupon import Coupon
+from app.models.product import Product
+from app.models.product_coupon_application import ProductCouponApplication
+from app.utils.pagination import encode_cursor
+from benchmarks.projection import build_projection_scenarios, peak_allocation_per_row
+from benchmarks.seed import seed_catalog
+from benchmarks.serialization import build_serialization_scenarios
+from config import TestingConfig
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, 'results.json')
+
+
+def make_config(database_path):
+    class BenchmarkConfig(TestingConfig):
+        """Banco em arquivo, sem registro de queries, orçamento nem cache de listagem (medimos o caminho real)"""
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + database_path
+        SQLALCHEMY_RECORD_QUERIES = False
+        SQL_QUERY_BUDGET_MODE = None
+        PRODUCT_LIST_CACHE_ENABLED = False
+
+    return BenchmarkConfig
+
+
+def build_scenarios(app, rng, sizes):
+    """Monta os cenários: (nome, função(i) -> (método, url, kwargs do test client))"""
+    with app.app_context():
+        middle = db.session.execute(
+            db.select(Product.name, Product.id).order_by(Product.name, Product.id)
+            .offset(sizes['products'] // 2).limit(1)
+        ).first()
+        names = dict(db.session.execute(db.select(Product.id, Product.name).limit(5000)).all())
+
+        # Cupom com limite alto para os cenários de uso
+        now = datetime.utcnow()
+        if not Coupon.query.filter_by(code='BENCHUSE').first():
+            db.session.add(Coupon('BENCHUSE', 10, now - timedelta(days=1), now + timedelta(days=30),
+                                  usage_limit=10_000_000))
+            db.session.commit()
+
+    product_ids = list(names)
+    deep_page = max(sizes['products'] // 50 // 2, 1)
+    deep_cursor = encode_cursor('name', 'asc', middle.name, middle.id) if middle else ''
+    coupon_codes = [f"BENCH{i:06d}" for i in range(max(sizes['coupons'], 1))]
+    etags = {}
+
+    def product_get_not_modified(i):
+        product_id = product_ids[i % len(product_ids)]
+        if product_id not in etags:
+            with app.test_client() as client:
+                etags[product_id] = client.get(f'/api/products/{product_id}').headers.get('ETag', '')
+        return 'GET', f'/api/products/{product_id}', {'headers': {'If-None-Match': etags[product_id]}}
+
+    def import_body(i):
+        rows = [json.dumps({'name': f'bench import {i:06d}-{j:03d}', 'price': 10.0 + j, 'stock': j})
+                for j in range(100)]
+        return 'POST', '/api/products/import', {'data': '\n'.join(rows), 'content_type': 'application/x-ndjson'}
+
+    read = [
+        ('health', lambda i: ('GET', '/api/health/', {})),
+        ('products_list_first_page', lambda i: ('GET', '/api/products/', {})),
+        ('products_list_deep_offset', lambda i: ('GET', f'/api/products/?limit=50&page={deep_page}', {})),
+        ('products_list_deep_cursor', lambda i: ('GET', f'/api/products/?limit=50&cursor={deep_cursor}', {})),
+        ('products_list_search', lambda i: ('GET', '/api/products/?search=teclado%20gamer', {})),
+        ('products_list_price_range', lambda i: ('GET', '/api/products/?minPrice=100&maxPrice=200&sortBy=price', {})),
+        ('products_list_has_discount', lambda i: ('GET', '/api/products/?hasDiscount=1', {})),
+        ('product_get', lambda i: ('GET', f'/api/products/{rng.choice(product_ids)}', {})),
+        ('product_get_not_modified', product_get_not_modified),
+        ('coupons_list', lambda i: ('GET', '/api/coupons/', {})),
+        ('coupons_list_valid', lambda i: ('GET', '/api/coupons/?is_valid=1', {})),
+        ('coupon_get', lambda i: ('GET', f'/api/coupons/{rng.choice(coupon_codes[:50])}', {})),
+        ('coupon_get_by_id', lambda i: ('GET', f'/api/coupons/{rng.randint(1, max(sizes["coupons"], 1))}', {})),
+        ('coupon_validate', lambda i: ('GET', f'/api/coupons/validate/{rng.choice(coupon_codes[:50])}', {})),
+        ('metrics', lambda i: ('GET', '/api/metrics/', {})),
+    ]
+    write = [
+        ('product_create', lambda i: ('POST', '/api/products/',
+                                      {'json': {'name': f'bench product {i:06d}', 'price': 19.9, 'stock': 5}})),
+        ('product_patch', lambda i: ('PATCH', f'/api/products/{product_ids[i % len(product_ids)]}',
+                                     {'json': {'name': names[product_ids[i % len(product_ids)]],
+                                               'price': round(rng.uniform(5, 500), 2), 'stock': rng.randint(0, 50)}})),
+        ('product_discount_percent', lambda i: ('POST', f'/api/products/{product_ids[i % len(product_ids)]}/discount/percent',
+                                                {'json': {'percentage': rng.randint(1, 80)}})),
+        ('product_discount_remove', lambda i: ('DELETE', f'/api/products/{product_ids[i % len(product_ids)]}/discount', {})),
+        ('product_discount_coupon', lambda i: ('POST', f'/api/products/{product_ids[i % len(product_ids)]}/discount/coupon',
+                                               {'json': {'code': 'BENCHUSE'}})),
+        ('coupon_use', lambda i: ('POST', '/api/coupons/use/BENCHUSE', {})),
+        ('products_import_100', import_body),
+        ('products_bulk_discount_100', lambda i: ('POST', '/api/products/discount/percent',
+                                                  {'json': {'percentage': 15, 'productIds': rng.sample(product_ids, 100)}})),
+    ]
+    return read + write
+
+
+def measure(app, request_factory, iterations, warmup):
+    """Executa o cenário e devolve latências (ms) e vazão"""
+    client = app.test_client()
+    for i in range(warmup):
+        method, url, kwargs = request_factory(i)
+        client.open(url, method=method, **kwargs)
+
+    durations, errors = [], 0
+    started = time.perf_counter()
+    for i in range(warmup, warmup + iterations):
+        method, url, kwargs = request_factory(i)
+        request_started = time.perf_counter()
+        response = client.open(url, method=method, **kwargs)
+        durations.append((time.perf_counter() - request_started) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    return summarize(durations, elapsed, errors)
+
+
+def measure_callable(fn, iterations, warmup):
+    """Mede uma função sem HTTP (ex.: serialização); registra o tamanho se devolver uma Response"""
+    for _ in range(warmup):
+        fn()
+
+    durations = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        response = fn()
+        durations.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+
+    stats = summarize(durations, elapsed, 0)
+    if hasattr(response, 'get_data'):
+        stats['bytes'] = len(response.get_data())
+    return stats
+
+
+def summarize(durations, elapsed, errors):
+    """Percentis (ms) e vazão de uma série de medições"""
+    iterations = len(durations)
+    cuts = statistics.quantiles(durations, n=100, method='inclusive') if len(durations) > 1 else durations * 99
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'p50_ms': round(cuts[49], 3),
+        'p95_ms': round(cuts[94], 3),
+        'p99_ms': round(cuts[98], 3),
+        'mean_ms': round(statistics.fmean(durations), 3),
+        'throughput_rps': round(iterations / elapsed, 1),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Compara p50/p95 com a baseline; regressão = p95 acima da tolerância"""
+    report, regressions = [], []
+    for name, current in results['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            report.append(f"  {name:<32} (sem baseline)")
+            continue
+        delta_p50 = (current['p50_ms'] - previous['p50_ms']) / previous['p50_ms'] * 100 if previous['p50_ms'] else 0.0
+        delta_p95 = (current['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100 if previous['p95_ms'] else 0.0
+        flag = ''
+        if delta_p95 > tolerance * 100:
+            flag = '  <-- REGRESSÃO'
+            regressions.append(name)
+        report.append(f"  {name:<32} p50 {delta_p50:+7.1f}%  p95 {delta_p95:+7.1f}%{flag}")
+    return report, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks da Product Management API')
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--coupons', type=int, default=10_000)
+    parser.add_argument('--applications', type=int, default=500_000)
+    parser.add_argument('--iterations', type=int, default=200, help='requisições medidas por cenário')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', help='arquivo SQLite a usar (reaproveitado se já estiver populado)')
+    parser.add_argument('--only', help='executa apenas cenários cujo nome contém este texto')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help='grava os resultados como nova baseline')
+    parser.add_argument('--tolerance', type=float, default=0.20, help='aumento de p95 tolerado (0.20 = 20%%)')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+
+    database_path = args.database or os.path.join(tempfile.mkdtemp(prefix='pm-bench-'), 'bench.db')
+    app = create_app(make_config(database_path))
+    sizes = {'products': args.products, 'coupons': args.coupons, 'applications': args.applications}
+
+    with app.app_context():
+        if Product.query.first() is None:
+            started = time.perf_counter()
+            sizes.update(seed_catalog(args.products, args.coupons, args.applications, seed=args.seed))
+            print(f"Catálogo populado em {time.perf_counter() - started:.1f}s: {sizes}")
+        else:
+            sizes = {
+                'products': Product.query.count(),
+                'coupons': Coupon.query.count(),
+                'applications': ProductCouponApplication.query.count(),
+            }
+            print(f"Reaproveitando banco {database_path}: {sizes}")
+
+    rng = random.Random(args.seed)
+    results = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat() + 'Z',
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'platform': platform.platform(),
+            'sizes': sizes,
+            'iterations': args.iterations,
+        },
+        'results': {}
+    }
+
+    for name, factory in build_scenarios(app, rng, sizes):
+        if args.only and args.only not in name:
+            continue
+        stats = measure(app, factory, args.iterations, args.warmup)
+        results['results'][name] = stats
+        print(f"  {name:<32} p50 {stats['p50_ms']:8.2f}ms  p95 {stats['p95_ms']:8.2f}ms  "
+              f"p99 {stats['p99_ms']:8.2f}ms  {stats['throughput_rps']:8.1f} req/s"
+              + (f"  ({stats['errors']} erros)" if stats['errors'] else ''))
+
+    for name, fn in build_serialization_scenarios(app):
+        if args.only and args.only not in name:
+            continue
+        stats = measure_callable(fn, args.iterations, args.warmup)
+        results['results'][name] = stats
+        print(f"  {name:<32} p50 {stats['p50_ms']:8.2f}ms  p95 {stats['p95_ms']:8.2f}ms  "
+              f"p99 {stats['p99_ms']:8.2f}ms  {stats['bytes']:>8} bytes")
+
+    for name, fn, rows in build_projection_scenarios(app):
+        if args.only and args.only not in name:
+            continue
+        stats = measure_callable(fn, args.iterations, args.warmup)
+        stats['us_per_row'] = round(stats['p50_ms'] * 1000 / rows, 2)
+        stats['peak_alloc_bytes_per_row'] = peak_allocation_per_row(fn, rows)
+        results['results'][name] = stats
+        print(f"  {name:<32} p50 {stats['p50_ms']:8.2f}ms  {stats['us_per_row']:8.2f}us/linha  "
+              f"{stats['peak_alloc_bytes_per_row']:>6} bytes/linha (pico)")
+
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2)
+    print(f"Resultados gravados em {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f"Baseline atualizada em {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        report, regressions = compare(results, baseline, args.tolerance)
+        print(f"Comparação com {args.baseline}:")
+        print('\n'.join(report))
+        if regressions and args.fail_on_regression:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
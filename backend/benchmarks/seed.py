@@ -0,0 +1,124 @@
+"""Geração de catálogo grande para benchmarks, com inserts em lote."""
+import random
+from datetime import datetime, timedelta
+
+from app.database import db
+from app.models.coupon import Coupon
+from app.models.product import Product
+from app.models.product_coupon_application import ProductCouponApplication
+
+WORDS = (
+    'mouse', 'teclado', 'monitor', 'headset', 'cadeira', 'mesa', 'notebook', 'webcam',
+    'microfone', 'caixa', 'som', 'gamer', 'sem', 'fio', 'mecânico', 'ultra', 'pro',
+    'compacto', 'rgb', 'usb', 'bluetooth', 'café', 'garrafa', 'luminária', 'suporte'
+)
+
+
+def _chunks(total, batch_size):
+    for start in range(0, total, batch_size):
+        yield start, min(start + batch_size, total)
+
+
+def seed_catalog(products=100_000, coupons=10_000, applications=500_000, batch_size=5_000, seed=42):
+    """Popula o banco com produtos, cupons e histórico de aplicações.
+
+    Usa INSERTs executemany em lotes (sem objetos ORM) para que catálogos
+    de centenas de milhares de linhas sejam criados em segundos. Cerca de
+    um terço dos produtos termina com um desconto ativo; as demais
+    aplicações ficam como histórico inativo.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    product_table = Product.__table__
+    for start, end in _chunks(products, batch_size):
+        rows = []
+        for i in range(start, end):
+            price = round(rng.uniform(5, 5000), 2)
+            rows.append({
+                'name': f"{' '.join(rng.sample(WORDS, 3))} {i:07d}",
+                'description': ' '.join(rng.choices(WORDS, k=8)),
+                'price': price,
+                'final_price': price,
+                'stock': rng.randint(0, 500),
+                'is_active': True,
+                'created_at': now - timedelta(seconds=products - i),
+                'discount_percentage': 0.0,
+                'has_active_discount': False,
+            })
+        db.session.execute(product_table.insert(), rows)
+    db.session.commit()
+
+    coupon_table = Coupon.__table__
+    for start, end in _chunks(coupons, batch_size):
+        rows = []
+        for i in range(start, end):
+            valid_from = now - timedelta(days=rng.randint(-10, 60))
+            rows.append({
+                'code': f"BENCH{i:06d}",
+                'description': f"Cupom de benchmark {i}",
+                'discount_percentage': float(rng.randint(5, 50)),
+                'valid_from': valid_from,
+                'valid_until': valid_from + timedelta(days=rng.randint(1, 120)),
+                'usage_limit': rng.randint(1, 1000),
+                'usage_count': 0,
+                'is_active': True,
+                'created_at': now,
+            })
+        db.session.execute(coupon_table.insert(), rows)
+    db.session.commit()
+
+    # Histórico: aplicações inativas espalhadas + uma ativa por produto com desconto
+    discounted = set(rng.sample(range(1, products + 1), min(products // 3, applications))) if products else set()
+    application_table = ProductCouponApplication.__table__
+    history = max(applications - len(discounted), 0)
+    for start, end in _chunks(history, batch_size):
+        rows = []
+        for _ in range(start, end):
+            percentage = float(rng.randint(1, 80))
+            rows.append({
+                'product_id': rng.randint(1, products),
+                'coupon_id': rng.randint(1, coupons) if coupons and rng.random() < 0.5 else None,
+                'discount_amount': percentage,
+                'discount_percentage': percentage,
+                'applied_at': now - timedelta(days=rng.randint(1, 720)),
+                'is_active': False,
+            })
+        db.session.execute(application_table.insert(), rows)
+    db.session.commit()
+
+    discounted = sorted(discounted)
+    for start, end in _chunks(len(discounted), batch_size):
+        chunk = discounted[start:end]
+        percentage = float(rng.randint(1, 80))
+        db.session.execute(
+            application_table.insert().from_select(
+                ['product_id', 'coupon_id', 'discount_amount', 'discount_percentage', 'applied_at', 'is_active'],
+                db.select(
+                    Product.id,
+                    db.null(),
+                    db.func.round(Product.price * percentage / 100, 2),
+                    db.literal(percentage),
+                    db.literal(now),
+                    db.literal(True)
+                ).where(Product.id.in_(chunk))
+            )
+        )
+        db.session.execute(
+            db.update(Product)
+            .where(Product.id.in_(chunk))
+            .values(
+                discount_percentage=percentage,
+                has_active_discount=True,
+                discount_start_date=now,
+                final_price=db.func.round(Product.price - Product.price * percentage / 100, 2)
+            )
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+
+    return {
+        'products': products,
+        'coupons': coupons,
+        'applications': history + len(discounted),
+    }
@@ -0,0 +1,45 @@
+"""Cenários de serialização: caminho Flask-RESTX (marshal + indent) x caminho rápido."""
+from flask_restx import marshal
+from flask_restx.representations import output_json
+
+from app.api.coupons.routes import coupon_list_model
+from app.api.products.routes import product_list_model
+from app.services.coupon_service import CouponService
+from app.services.product_service import ProductService
+from app.utils.fast_json import json_response
+
+RESTX_INDENTED = {'ensure_ascii': False, 'indent': 2}
+
+
+def _restx_response(app, payload, model=None):
+    """Reproduz o caminho anterior: marshal_with (opcional) + output_json com indent 2"""
+    settings = app.config['RESTX_JSON']
+    app.config['RESTX_JSON'] = dict(RESTX_INDENTED)
+    try:
+        return output_json(marshal(payload, model) if model is not None else payload, 200)
+    finally:
+        app.config['RESTX_JSON'] = settings
+
+
+def build_serialization_scenarios(app, page_size=50):
+    """Cenários (nome, função sem argumentos -> Response) sobre páginas reais do banco"""
+    with app.test_request_context():
+        products = ProductService.list_products_with_discount_info({'page': 1, 'limit': page_size})
+        coupons = CouponService.list_coupons({'page': 1, 'limit': page_size})
+
+    products_payload = {'data': products['products'], 'meta': products['meta']}
+    coupons_payload = {'data': coupons['coupons'], 'meta': coupons['meta']}
+
+    def in_request(fn):
+        def run():
+            with app.test_request_context():
+                return fn()
+        return run
+
+    return [
+        ('serialize_products_page_restx', in_request(lambda: _restx_response(app, products_payload))),
+        ('serialize_products_page_marshal', in_request(lambda: _restx_response(app, products_payload, product_list_model))),
+        ('serialize_products_page_fast', in_request(lambda: json_response(products_payload))),
+        ('serialize_coupons_page_marshal', in_request(lambda: _restx_response(app, coupons_payload, coupon_list_model))),
+        ('serialize_coupons_page_fast', in_request(lambda: json_response(coupons_payload))),
+    ]
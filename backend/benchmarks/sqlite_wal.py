@@ -0,0 +1,181 @@
+"""SQLite com e sem o perfil de alto throughput (WAL + PRAGMAs + pool) sob carga mista.
+
+Threads simultâneas alternam leituras (listagem, busca, detalhe) e
+escritas (PATCH de estoque, criação de produto) pelo test client do
+Flask, no mesmo arquivo SQLite. Com o journal padrão (DELETE) cada
+escrita bloqueia todas as leituras e paga um fsync por commit; em WAL os
+leitores seguem enquanto um escritor grava, e com synchronous=NORMAL o
+commit só anexa ao WAL. Estouros do busy_timeout aparecem como
+"database is locked".
+
+Cada modo roda numa cópia do mesmo banco populado (o journal_mode fica
+gravado no arquivo).
+
+Uso (a partir de backend/):
+    python -m benchmarks.sqlite_wal                                # 16 threads, 20% escritas, 10s por modo
+    python -m benchmarks.sqlite_wal --threads 32 --write-ratio 0.5 --output wal.json
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+from app import create_app
+from app.database import db
+from app.models.product import Product
+from benchmarks.run import make_config, summarize
+from benchmarks.seed import WORDS, seed_catalog
+
+MODES = {
+    # Journal DELETE, pool padrão com pre-ping: o comportamento anterior
+    'default': {'SQLITE_PERFORMANCE_PROFILE': False},
+    'wal': {'SQLITE_PERFORMANCE_PROFILE': True},
+}
+
+
+def make_mode_config(database_path, mode, threads):
+    settings = {**MODES[mode], 'SQLITE_POOL_SIZE': threads, 'SQLITE_POOL_MAX_OVERFLOW': 0}
+    return type(f'{mode.title()}Config', (make_config(database_path),), settings)
+
+
+def build_requests(product_ids, rng, write_ratio, count=5000):
+    """Sequência de (método, url, corpo): leituras de navegação intercaladas com escritas"""
+    requests = []
+    for i in range(count):
+        if rng.random() < write_ratio:
+            if rng.random() < 0.8:
+                requests.append(('PATCH', f'/api/products/{rng.choice(product_ids)}', {'stock': rng.randint(0, 500)}))
+            else:
+                # Nome completado no envio (a sequência se repete e products.name é único)
+                requests.append(('POST', '/api/products/', {
+                    'name': f"{' '.join(rng.sample(WORDS, 2))} carga",
+                    'price': round(rng.uniform(5, 500), 2),
+                    'stock': rng.randint(0, 100)
+                }))
+            continue
+        roll = rng.random()
+        if roll < 0.4:
+            requests.append(('GET', f'/api/products/?page={rng.randint(1, 50)}&limit=20', None))
+        elif roll < 0.6:
+            requests.append(('GET', f'/api/products/?search={quote(rng.choice(WORDS))}&limit=20', None))
+        else:
+            requests.append(('GET', f'/api/products/{rng.choice(product_ids)}', None))
+    return requests
+
+
+def run_mode(database_path, mode, args, requests):
+    app = create_app(make_mode_config(database_path, mode, args.threads))
+    client = app.test_client()
+    with app.app_context():
+        journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+
+    durations = {'read': [], 'write': []}
+    counters = {'errors': 0, 'locked': 0}
+    lock = threading.Lock()
+    sequence = itertools.count()
+    deadline = time.perf_counter() + args.duration
+
+    def worker(offset):
+        i = offset
+        local = {'read': [], 'write': []}
+        errors = locked = 0
+        while time.perf_counter() < deadline:
+            method, url, body = requests[i % len(requests)]
+            i += 1
+            kind = 'read' if method == 'GET' else 'write'
+            if method == 'POST':
+                body = {**body, 'name': f"{body['name']} {mode} {next(sequence):07d}"}
+            started = time.perf_counter()
+            try:
+                response = client.open(url, method=method, json=body)
+                status = response.status_code
+            except Exception as error:  # propagado pelo test client (TESTING)
+                status = 500
+                locked += 'database is locked' in str(error)
+            local[kind].append((time.perf_counter() - started) * 1000)
+            if status >= 500:
+                errors += 1
+        with lock:
+            for key in local:
+                durations[key].extend(local[key])
+            counters['errors'] += errors
+            counters['locked'] += locked
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n * 97,)) for n in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+    all_durations = durations['read'] + durations['write']
+    return {
+        'journal_mode': journal_mode,
+        'total': summarize(all_durations, elapsed, counters['errors']),
+        'reads': summarize(durations['read'], elapsed, 0) if durations['read'] else None,
+        'writes': summarize(durations['write'], elapsed, 0) if durations['write'] else None,
+        'locked_errors': counters['locked'],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='SQLite: journal padrão x perfil WAL sob carga mista')
+    parser.add_argument('--threads', type=int, default=16, help='threads simultâneas')
+    parser.add_argument('--duration', type=float, default=10, help='segundos de carga por modo')
+    parser.add_argument('--write-ratio', type=float, default=0.2, help='fração de requisições de escrita')
+    parser.add_argument('--modes', default='default,wal', help='modos a medir, separados por vírgula')
+    parser.add_argument('--products', type=int, default=20_000)
+    parser.add_argument('--coupons', type=int, default=2_000)
+    parser.add_argument('--applications', type=int, default=50_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='grava os resultados em JSON')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='pm-wal-')
+    base_path = os.path.join(workdir, 'base.db')
+    try:
+        # Banco base em journal DELETE (perfil desligado); cada modo usa uma cópia
+        app = create_app(make_mode_config(base_path, 'default', args.threads))
+        with app.app_context():
+            sizes = seed_catalog(args.products, args.coupons, args.applications, seed=args.seed)
+            product_ids = db.session.execute(db.select(Product.id).limit(5000)).scalars().all()
+            db.engine.dispose()
+        print(f"Catálogo populado: {sizes}")
+        requests = build_requests(product_ids, random.Random(args.seed), args.write_ratio)
+
+        print(f"{args.threads} threads, {args.write_ratio:.0%} escritas, {args.duration:.0f}s por modo")
+        results = {'meta': vars(args), 'results': {}}
+        for mode in args.modes.split(','):
+            path = os.path.join(workdir, f'{mode}.db')
+            shutil.copy(base_path, path)
+            stats = run_mode(path, mode, args, requests)
+            results['results'][mode] = stats
+            total, reads, writes = stats['total'], stats['reads'] or {}, stats['writes'] or {}
+            print(f"  {mode:<8} ({stats['journal_mode']:<6}) {total['throughput_rps']:8.1f} req/s  "
+                  f"leitura p95 {reads.get('p95_ms', 0):7.1f}ms  escrita p95 {writes.get('p95_ms', 0):7.1f}ms  "
+                  f"{writes.get('throughput_rps', 0):6.1f} escritas/s  {total['errors']} erros "
+                  f"({stats['locked_errors']} 'database is locked')")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+        print(f"Resultados gravados em {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
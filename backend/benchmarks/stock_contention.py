@@ -0,0 +1,158 @@
+"""Estresse de reservas de estoque concorrentes: sem venda além do estoque.
+
+Muitas threads disputam as poucas unidades de um mesmo produto até
+esgotá-lo. Compara:
+  - naive:  leitura + baixa em Python (Product.reduce_stock), o padrão antigo,
+            chamado direto no ORM (sem HTTP; a vazão não é comparável)
+  - atomic: POST /api/products/<id>/stock/reserve (UPDATE condicional stock >= qty)
+
+Ao final mostra a conta: unidades reservadas com sucesso além de
+estoque inicial - estoque final são venda além do estoque (oversell).
+A garantia do modo atomic é verificada em tests/test_stock_reservations.py;
+aqui medimos vazão e latência.
+
+Uso (a partir de backend/):
+    python -m benchmarks.stock_contention                           # 64 threads, estoque 1000, 3 rodadas
+    python -m benchmarks.stock_contention --threads 128 --stock 5000 --max-quantity 3
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from app import create_app
+from app.database import db
+from app.models.product import Product
+from benchmarks.run import make_config, summarize
+
+
+def naive_reserve(app, product_id, quantity):
+    """Lê o estoque, confere em Python e grava: duas requisições podem ler o mesmo valor"""
+    with app.app_context():
+        product = db.session.get(Product, product_id)
+        if product.stock < quantity:
+            return False
+        product.reduce_stock(quantity)
+        db.session.commit()
+        return True
+
+
+def run_round(app, client, mode, args, rng_seed):
+    with app.app_context():
+        product = Product(name=f'estresse {mode} {rng_seed}', price=10, stock=args.stock)
+        db.session.add(product)
+        db.session.commit()
+        product_id = product.id
+
+    barrier = threading.Barrier(args.threads)
+    lock = threading.Lock()
+    totals = {'reserved': 0, 'accepted': 0, 'rejected': 0, 'errors': 0}
+    durations = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local = {'reserved': 0, 'accepted': 0, 'rejected': 0, 'errors': 0}
+        local_durations = []
+        barrier.wait()
+        while True:
+            quantity = rng.randint(1, args.max_quantity)
+            started = time.perf_counter()
+            try:
+                if mode == 'atomic':
+                    response = client.post(f'/api/products/{product_id}/stock/reserve', json={'quantity': quantity})
+                    accepted, sold_out = response.status_code == 200, response.status_code == 409
+                    if not (accepted or sold_out):
+                        local['errors'] += 1
+                    elif sold_out and response.get_json()['stock'] == 0:
+                        break
+                else:
+                    accepted = naive_reserve(app, product_id, quantity)
+                    sold_out = not accepted
+            except Exception:
+                local['errors'] += 1
+                accepted = sold_out = False
+            local_durations.append((time.perf_counter() - started) * 1000)
+            if accepted:
+                local['accepted'] += 1
+                local['reserved'] += quantity
+            elif sold_out:
+                local['rejected'] += 1
+                # Sem unidades para ninguém: encerra (com pedidos maiores que o restante, tenta de novo)
+                if mode == 'naive' and _remaining(app, product_id) == 0:
+                    break
+            if local['errors'] > 100:
+                break
+        with lock:
+            for key in totals:
+                totals[key] += local[key]
+            durations.extend(local_durations)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(rng_seed * 1000 + n,)) for n in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    final_stock = _remaining(app, product_id)
+    sold = args.stock - final_stock
+    return {
+        **totals,
+        'final_stock': final_stock,
+        # Unidades entregues além do que saiu do estoque (atualizações perdidas) ou do estoque inicial
+        'oversold': max(totals['reserved'] - sold, totals['reserved'] - args.stock, 0),
+        'negative_stock': final_stock < 0,
+        'latency': summarize(durations, elapsed, totals['errors']) if durations else None,
+    }
+
+
+def _remaining(app, product_id):
+    with app.app_context():
+        return db.session.execute(db.select(Product.stock).where(Product.id == product_id)).scalar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Reservas de estoque concorrentes: naive x UPDATE condicional')
+    parser.add_argument('--threads', type=int, default=64, help='threads disputando o mesmo produto')
+    parser.add_argument('--stock', type=int, default=1000, help='estoque inicial do produto')
+    parser.add_argument('--max-quantity', type=int, default=3, help='unidades por reserva (1..N)')
+    parser.add_argument('--rounds', type=int, default=3, help='rodadas por modo')
+    parser.add_argument('--modes', default='naive,atomic', help='modos a medir, separados por vírgula')
+    parser.add_argument('--output', help='grava os resultados em JSON')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='pm-stock-')
+    results = {'meta': vars(args), 'results': {}}
+    try:
+        app = create_app(make_config(os.path.join(workdir, 'stock.db')))
+        client = app.test_client()
+        print(f"{args.threads} threads, estoque {args.stock}, 1..{args.max_quantity} unidades por reserva")
+        for mode in args.modes.split(','):
+            rounds = [run_round(app, client, mode, args, seed) for seed in range(args.rounds)]
+            results['results'][mode] = rounds
+            for stats in rounds:
+                latency = stats['latency'] or {}
+                print(f"  {mode:<7} {stats['accepted']:6d} reservas ({stats['reserved']} un.)  "
+                      f"{stats['rejected']:6d} recusadas  estoque final {stats['final_stock']:5d}  "
+                      f"oversell {stats['oversold']:5d}  {latency.get('throughput_rps', 0):8.1f} req/s  "
+                      f"p95 {latency.get('p95_ms', 0):6.1f}ms  {stats['errors']} erros")
+        with app.app_context():
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+        print(f"Resultados gravados em {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -32,6 +32,71 @@ class Config:
         'pool_recycle': 300,
         'pool_pre_ping': True
     }
+    
+    # Orçamento de queries SQL por requisição (consome SQLALCHEMY_RECORD_QUERIES).
+    # Modo: 'raise' falha a requisição, 'log' só registra, None desliga.
+    SQL_QUERY_BUDGET_MODE = None
+    SQL_QUERY_BUDGET = 15
+    SQL_NPLUS1_THRESHOLD = 5
+    # Orçamentos por endpoint; None dispensa endpoints de lote (várias queries por design)
+    SQL_QUERY_BUDGETS = {
+        'products_product_list_resource': 5,
+        'products_product_import_resource': None,
+        'products_product_bulk_percent_discount_resource': None,
+        'products_product_stock_batch_resource': None,
+    }
+    
+    # Cache de cupons por código (entradas e segundos de validade)
+    COUPON_CACHE_MAXSIZE = int(os.environ.get('COUPON_CACHE_MAXSIZE', 1024))
+    COUPON_CACHE_TTL = float(os.environ.get('COUPON_CACHE_TTL', 30))
+    
+    # Cache de resultados da listagem de produtos (por processo; limite em bytes, despejo LRU).
+    # Escritas no catálogo invalidam o processo que as fez; o TTL limita a defasagem nos demais workers
+    PRODUCT_LIST_CACHE_ENABLED = os.environ.get('PRODUCT_LIST_CACHE_ENABLED', 'true').lower() == 'true'
+    PRODUCT_LIST_CACHE_MAX_BYTES = int(os.environ.get('PRODUCT_LIST_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    PRODUCT_LIST_CACHE_TTL = float(os.environ.get('PRODUCT_LIST_CACHE_TTL', 5))
+    
+    # Arquivamento do histórico de aplicações de desconto (flask archive-applications)
+    APPLICATION_RETENTION_DAYS = int(os.environ.get('APPLICATION_RETENTION_DAYS', 90))
+    APPLICATION_ARCHIVE_BATCH_SIZE = int(os.environ.get('APPLICATION_ARCHIVE_BATCH_SIZE', 1000))
+    
+    # Agendador em processo que ativa/expira janelas de desconto (segundos entre ciclos)
+    DISCOUNT_SCHEDULER_ENABLED = os.environ.get('DISCOUNT_SCHEDULER_ENABLED', 'true').lower() == 'true'
+    DISCOUNT_SCHEDULER_INTERVAL = float(os.environ.get('DISCOUNT_SCHEDULER_INTERVAL', 30))
+    DISCOUNT_SCHEDULER_BATCH_SIZE = int(os.environ.get('DISCOUNT_SCHEDULER_BATCH_SIZE', 500))
+    
+    # Varredura que move cupons agendado -> vigente -> expirado (segundos entre ciclos)
+    COUPON_STATUS_SWEEPER_ENABLED = os.environ.get('COUPON_STATUS_SWEEPER_ENABLED', 'true').lower() == 'true'
+    COUPON_STATUS_SWEEP_INTERVAL = float(os.environ.get('COUPON_STATUS_SWEEP_INTERVAL', 30))
+    
+    # Modo ASGI (asgi.py): leituras de catálogo em engine async.
+    # Sem ASYNC_DATABASE_URL, deriva da URL principal trocando o driver (aiosqlite, asyncpg...)
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')
+    ASYNC_DB_POOL_SIZE = int(os.environ.get('ASYNC_DB_POOL_SIZE', 20))
+    ASYNC_DB_MAX_OVERFLOW = int(os.environ.get('ASYNC_DB_MAX_OVERFLOW', 20))
+    
+    # Réplicas de leitura (URLs separadas por vírgula; viram binds replica_0, replica_1...).
+    # GET/HEAD leem das réplicas em round-robin; escritas e leituras logo após escrever ficam no primário.
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    REPLICA_FAILURE_COOLDOWN = float(os.environ.get('REPLICA_FAILURE_COOLDOWN', 30))
+    REPLICA_HEALTH_CHECK_INTERVAL = float(os.environ.get('REPLICA_HEALTH_CHECK_INTERVAL', 10))
+    REPLICA_HEALTH_CHECK_QUERY = os.environ.get('REPLICA_HEALTH_CHECK_QUERY', 'SELECT 1')
+    READ_AFTER_WRITE_SECONDS = float(os.environ.get('READ_AFTER_WRITE_SECONDS', 5))
+    READ_AFTER_WRITE_COOKIE = 'db_read_primary'
+    
+    # Servidor de produção (wsgi.py): workers pré-forkados (gunicorn) com threads cada.
+    # DB_CONNECTION_BUDGET > 0 limita as conexões somando todos os workers (0 = sem limite global).
+    # WEB_CONCURRENCY vazio = 2 x CPUs + 1, limitado ao orçamento (app.database.worker_concurrency)
+    WEB_CONCURRENCY = int(os.environ['WEB_CONCURRENCY']) if os.environ.get('WEB_CONCURRENCY') else None
+    WEB_THREADS = int(os.environ.get('WEB_THREADS', 4))
+    DB_CONNECTION_BUDGET = int(os.environ.get('DB_CONNECTION_BUDGET', 0))
+    
+    # Perfil SQLite de alto throughput (só SQLite em arquivo): WAL, synchronous=NORMAL,
+    # busy_timeout, mmap e cache por conexão (app/utils/sqlite.py); SQLITE_PRAGMAS sobrescreve PRAGMAs.
+    SQLITE_PERFORMANCE_PROFILE = os.environ.get('SQLITE_PERFORMANCE_PROFILE', 'true').lower() == 'true'
+    SQLITE_PRAGMAS = {}
+    SQLITE_POOL_SIZE = int(os.environ.get('SQLITE_POOL_SIZE', 10))
+    SQLITE_POOL_MAX_OVERFLOW = int(os.environ.get('SQLITE_POOL_MAX_OVERFLOW', 10))
 
 class DevelopmentConfig(Config):
     """Configuração para ambiente de desenvolvimento"""
@@ -45,6 +110,7 @@ class DevelopmentConfig(Config):
     
     # Configurações mais verbosas para desenvolvimento
     SQLALCHEMY_ECHO = True  # Log de queries SQL
+    SQL_QUERY_BUDGET_MODE = 'log'
     
     # Hot reload para templates
     TEMPLATES_AUTO_RELOAD = True
@@ -63,6 +129,13 @@ class TestingConfig(Config):
     
     # Acelerar testes
     SQLALCHEMY_ECHO = False
+    
+    # Regressões de performance (excesso de queries, N+1) falham o teste
+    SQL_QUERY_BUDGET_MODE = 'raise'
+    
+    # Testes disparam o agendamento explicitamente (DiscountScheduleService.run_due, CouponService.sweep_statuses)
+    DISCOUNT_SCHEDULER_ENABLED = False
+    COUPON_STATUS_SWEEPER_ENABLED = False
 
 class ProductionConfig(Config):
     """Configuração para produção"""
@@ -80,7 +153,19 @@ class ProductionConfig(Config):
     # Logging em produção
     SQLALCHEMY_ECHO = False
     
-    # Configurações otimizadas para produção
+    # JSON compacto: indentação só aumenta o tamanho das respostas
+    RESTX_JSON = {
+        'ensure_ascii': False,
+        'separators': (',', ':')
+    }
+    
+    # O registro de queries percorre a pilha a cada execução; desligado em produção
+    SQLALCHEMY_RECORD_QUERIES = False
+    
+    # Orçamento total de conexões do banco, dividido entre os workers (pool_size por worker)
+    DB_CONNECTION_BUDGET = int(os.environ.get('DB_CONNECTION_BUDGET', 30))
+    
+    # Configurações otimizadas para produção (pool_size/max_overflow recalculados por worker)
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_size': 10,
         'pool_recycle': 120,
@@ -0,0 +1,62 @@
+"""add products full-text search index
+
+Revision ID: 3f1c2a9d7b54
+Revises: 96aa60482e80
+Create Date: 2026-10-18 05:10:42.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b54'
+down_revision = '96aa60482e80'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 existe apenas no SQLite; nos demais bancos a busca usa ILIKE
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+            name, description,
+            content='products', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+            INSERT INTO products_fts(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+            INSERT INTO products_fts(products_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description ON products BEGIN
+            INSERT INTO products_fts(products_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO products_fts(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """)
+    # Indexa os produtos já existentes
+    op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS products_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS products_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS products_fts_ai")
+    op.execute("DROP TABLE IF EXISTS products_fts")
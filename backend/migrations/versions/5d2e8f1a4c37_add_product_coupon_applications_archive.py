@@ -0,0 +1,47 @@
+"""add product coupon applications archive
+
+Revision ID: 5d2e8f1a4c37
+Revises: bcc3ed228c16
+Create Date: 2026-10-18 06:12:40.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2e8f1a4c37'
+down_revision = 'bcc3ed228c16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() roda db.create_all(): num banco existente a tabela (com seus índices)
+    # pode já ter sido criada pelo modelo antes do `flask db upgrade`
+    if not sa.inspect(op.get_bind()).has_table('product_coupon_applications_archive'):
+        op.create_table('product_coupon_applications_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('coupon_id', sa.Integer(), nullable=True),
+        sa.Column('discount_amount', sa.Float(), nullable=False),
+        sa.Column('discount_percentage', sa.Float(), nullable=True),
+        sa.Column('applied_at', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('idx_application_archive_product_applied', 'product_coupon_applications_archive',
+                        ['product_id', 'applied_at'], unique=False)
+        op.create_index('idx_application_archive_coupon', 'product_coupon_applications_archive',
+                        ['coupon_id'], unique=False)
+
+    op.create_index('idx_product_coupon_inactive_applied', 'product_coupon_applications',
+                    ['is_active', 'applied_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_product_coupon_inactive_applied', table_name='product_coupon_applications')
+
+    op.drop_index('idx_application_archive_coupon', table_name='product_coupon_applications_archive')
+    op.drop_index('idx_application_archive_product_applied', table_name='product_coupon_applications_archive')
+    op.drop_table('product_coupon_applications_archive')
@@ -0,0 +1,37 @@
+"""add scheduled discount windows
+
+Revision ID: 8e4b7c2f9a16
+Revises: 5d2e8f1a4c37
+Create Date: 2026-10-18 06:48:21.530914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4b7c2f9a16'
+down_revision = '5d2e8f1a4c37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ADD COLUMN simples (sem recriar a tabela, preservando os triggers do FTS)
+    op.add_column('products', sa.Column('scheduled_discount_percentage', sa.Float(), nullable=True))
+    op.add_column('products', sa.Column('scheduled_discount_start', sa.DateTime(), nullable=True))
+    op.add_column('products', sa.Column('scheduled_discount_end', sa.DateTime(), nullable=True))
+    op.add_column('products', sa.Column('scheduled_coupon_id', sa.Integer(), nullable=True))
+
+    op.create_index('idx_product_discount_end', 'products', ['has_active_discount', 'discount_end_date'], unique=False)
+    op.create_index('idx_product_scheduled_start', 'products', ['scheduled_discount_start'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_product_scheduled_start', table_name='products')
+    op.drop_index('idx_product_discount_end', table_name='products')
+
+    op.drop_column('products', 'scheduled_coupon_id')
+    op.drop_column('products', 'scheduled_discount_end')
+    op.drop_column('products', 'scheduled_discount_start')
+    op.drop_column('products', 'scheduled_discount_percentage')
@@ -0,0 +1,59 @@
+"""add persisted coupon status
+
+Revision ID: a7c3e91d5b28
+Revises: 8e4b7c2f9a16
+Create Date: 2026-10-18 09:12:40.318266
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e91d5b28'
+down_revision = '8e4b7c2f9a16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ADD COLUMN simples (sem recriar a tabela)
+    op.add_column('coupons', sa.Column('status', sa.String(length=20), nullable=False, server_default='valid'))
+
+    # Backfill com a mesma precedência de Coupon.status_expression
+    coupons = sa.table(
+        'coupons',
+        sa.column('status', sa.String),
+        sa.column('is_active', sa.Boolean),
+        sa.column('valid_from', sa.DateTime),
+        sa.column('valid_until', sa.DateTime),
+        sa.column('usage_count', sa.Integer),
+        sa.column('usage_limit', sa.Integer),
+    )
+    now = datetime.utcnow()
+    op.execute(
+        coupons.update().values(status=sa.case(
+            (coupons.c.is_active == sa.false(), 'inactive'),
+            (coupons.c.valid_until < now, 'expired'),
+            (coupons.c.usage_count >= coupons.c.usage_limit, 'exhausted'),
+            (coupons.c.valid_from > now, 'scheduled'),
+            else_='valid'
+        ))
+    )
+
+    op.create_index('idx_coupon_valid_created', 'coupons', ['created_at'], unique=False,
+                    sqlite_where=sa.text("status = 'valid'"), postgresql_where=sa.text("status = 'valid'"))
+    op.create_index('idx_coupon_valid_until', 'coupons', ['valid_until'], unique=False,
+                    sqlite_where=sa.text("status = 'valid'"), postgresql_where=sa.text("status = 'valid'"))
+    op.create_index('idx_coupon_scheduled_from', 'coupons', ['valid_from'], unique=False,
+                    sqlite_where=sa.text("status = 'scheduled'"), postgresql_where=sa.text("status = 'scheduled'"))
+
+
+def downgrade():
+    op.drop_index('idx_coupon_scheduled_from', table_name='coupons')
+    op.drop_index('idx_coupon_valid_until', table_name='coupons')
+    op.drop_index('idx_coupon_valid_created', table_name='coupons')
+
+    op.drop_column('coupons', 'status')
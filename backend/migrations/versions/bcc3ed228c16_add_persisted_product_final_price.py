@@ -0,0 +1,40 @@
+"""add persisted product final price
+
+Revision ID: bcc3ed228c16
+Revises: 3f1c2a9d7b54
+Create Date: 2026-10-18 05:31:08.504117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bcc3ed228c16'
+down_revision = '3f1c2a9d7b54'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ADD COLUMN simples (sem recriar a tabela, preservando os triggers do FTS)
+    op.add_column('products', sa.Column('final_price', sa.Float(), nullable=False, server_default='0'))
+
+    # Preenche o preço efetivo dos produtos existentes
+    op.execute("""
+        UPDATE products SET final_price = CASE
+            WHEN has_active_discount = 1 AND discount_percentage > 0
+                THEN ROUND(price - price * discount_percentage / 100, 2)
+            ELSE price
+        END
+    """)
+
+    op.drop_index('idx_product_price_id', table_name='products')
+    op.create_index('idx_product_final_price_id', 'products', ['final_price', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_product_final_price_id', table_name='products')
+    op.create_index('idx_product_price_id', 'products', ['price', 'id'], unique=False)
+
+    op.drop_column('products', 'final_price')
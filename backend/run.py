@@ -1,6 +1,7 @@
 from app import create_app
 # Importa a configuração de desenvolvimento para definir variáveis específicas do ambiente
 from config import DevelopmentConfig
+from app.utils.scheduler import start_schedulers
 import os
 
 # Criar aplicação
@@ -27,6 +28,10 @@ if __name__ == '__main__':
     • Cupons: /api/coupons/
     """)
     
+    # Com o reloader do modo debug, só o processo filho (WERKZEUG_RUN_MAIN) atende requisições
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_schedulers(app)
+
     app.run(
         debug=debug,
         host='0.0.0.0',
@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.database import db
+from config import TestingConfig
+
+
+def _dispose(app):
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def make_app():
+    """Fábrica de apps de teste: TestingConfig com os ajustes passados como kwargs"""
+    apps = []
+
+    def factory(**settings):
+        app = create_app(type('TestConfig', (TestingConfig,), settings))
+        apps.append(app)
+        return app
+
+    yield factory
+    for app in apps:
+        _dispose(app)
+
+
+@pytest.fixture(autouse=True)
+def _push_request_context():
+    """Desliga o contexto de requisição que o pytest-flask abre em volta de cada teste.
+
+    Com ele, as requisições do test client reaproveitariam o mesmo app
+    context (e o mesmo g): queries registradas se acumulariam entre
+    requisições e o orçamento de queries (query_guard) estouraria.
+    """
+    yield
+
+
+@pytest.fixture
+def app(make_app):
+    """App de testes com banco SQLite em memória (fixture usada pelo pytest-flask)"""
+    return make_app()
+
+
+@pytest.fixture
+def file_app(make_app, tmp_path):
+    """App com SQLite em arquivo (perfil WAL): uma conexão real por thread, para testes de concorrência"""
+    return make_app(SQLALCHEMY_DATABASE_URI='sqlite:///' + str(tmp_path / 'test.db'))
+
+
+class QueryCounter:
+    """Conta os comandos SQL enviados a um engine dentro do bloco with"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    def __len__(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_queries():
+    """Abre um QueryCounter no engine principal do app: with count_queries(app) as queries: ..."""
+    def factory(app):
+        with app.app_context():
+            return QueryCounter(db.engine)
+    return factory
@@ -0,0 +1,44 @@
+"""Execução em escala mínima da suíte de benchmarks: popula, mede todos os cenários e compara com a baseline."""
+import json
+
+from benchmarks import run
+from benchmarks.run import compare
+
+SIZES = ['--products', '300', '--coupons', '30', '--applications', '600']
+
+
+def run_suite(tmp_path, *extra):
+    argv = [*SIZES, '--iterations', '3', '--warmup', '1',
+            '--database', str(tmp_path / 'bench.db'),
+            '--output', str(tmp_path / 'results.json'),
+            '--baseline', str(tmp_path / 'baseline.json'), *extra]
+    return run.main(argv)
+
+
+def test_suite_runs_every_scenario_without_errors(tmp_path):
+    assert run_suite(tmp_path, '--update-baseline') == 0
+
+    results = json.loads((tmp_path / 'results.json').read_text())
+    assert results['meta']['sizes'] == {'products': 300, 'coupons': 30, 'applications': 600}
+    assert results['results']
+    for name, stats in results['results'].items():
+        assert stats.get('errors', 0) == 0, name
+        assert stats['p95_ms'] >= stats['p50_ms'] >= 0, name
+    assert json.loads((tmp_path / 'baseline.json').read_text()) == results
+
+
+def test_compare_flags_p95_regressions():
+    baseline = {'results': {
+        'estavel': {'p50_ms': 10.0, 'p95_ms': 20.0},
+        'regrediu': {'p50_ms': 10.0, 'p95_ms': 20.0},
+    }}
+    results = {'results': {
+        'estavel': {'p50_ms': 11.0, 'p95_ms': 22.0},
+        'regrediu': {'p50_ms': 10.0, 'p95_ms': 30.0},
+        'novo': {'p50_ms': 1.0, 'p95_ms': 2.0},
+    }}
+
+    report, regressions = compare(results, baseline, tolerance=0.20)
+
+    assert regressions == ['regrediu']
+    assert any('novo' in line and 'sem baseline' in line for line in report)
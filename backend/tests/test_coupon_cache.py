@@ -0,0 +1,87 @@
+"""O cache de cupons só é invalidado depois do commit do uso (senão uma leitura concorrente regrava o valor antigo)."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import db
+from app.models.coupon import Coupon
+from app.models.product import Product
+from app.services.coupon_service import CouponService
+
+
+@pytest.fixture
+def committed_usage_on_invalidate(file_app, monkeypatch):
+    """Espiona invalidate_cached_coupon: registra (usage_count, status) já confirmados no banco naquele instante"""
+    seen = []
+    invalidate = CouponService.invalidate_cached_coupon
+
+    def spy(*codes):
+        # Conexão separada: só enxerga o que já foi commitado
+        with db.engine.connect() as connection:
+            seen.extend(
+                connection.execute(
+                    db.select(Coupon.usage_count, Coupon.status).where(Coupon.code.in_(codes))
+                ).tuples().all()
+            )
+        invalidate(*codes)
+
+    monkeypatch.setattr(CouponService, 'invalidate_cached_coupon', staticmethod(spy))
+    return seen
+
+
+def create_coupon(app, code, usage_limit=2):
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.add(Coupon(code, 10, now - timedelta(days=1), now + timedelta(days=1), usage_limit=usage_limit))
+        db.session.add(Product(name=f'produto {code}', price=100, stock=1))
+        db.session.commit()
+
+
+def test_use_coupon_invalidates_after_commit(file_app, committed_usage_on_invalidate):
+    create_coupon(file_app, 'USO')
+    client = file_app.test_client()
+    assert client.get('/api/coupons/validate/USO').get_json()['coupon']['usage_count'] == 0
+
+    assert client.post('/api/coupons/use/USO').status_code == 200
+
+    assert [usage for usage, _ in committed_usage_on_invalidate] == [1]
+    assert client.get('/api/coupons/validate/USO').get_json()['coupon']['usage_count'] == 1
+
+
+def test_refused_use_does_not_invalidate(file_app, committed_usage_on_invalidate):
+    create_coupon(file_app, 'UNICO', usage_limit=1)
+    client = file_app.test_client()
+    assert client.post('/api/coupons/use/UNICO').status_code == 200
+
+    assert client.post('/api/coupons/use/UNICO').status_code == 400
+
+    assert [usage for usage, _ in committed_usage_on_invalidate] == [1]
+
+
+@pytest.mark.parametrize('scheduled', [False, True])
+def test_apply_coupon_discount_invalidates_after_commit(file_app, committed_usage_on_invalidate, scheduled):
+    create_coupon(file_app, 'PRODUTO')
+    client = file_app.test_client()
+    client.get('/api/coupons/validate/PRODUTO')
+    body = {'code': 'PRODUTO'}
+    if scheduled:
+        body['startsAt'] = (datetime.utcnow() + timedelta(days=1)).isoformat() + 'Z'
+
+    assert client.post('/api/products/1/discount/coupon', json=body).status_code == 200
+
+    assert [usage for usage, _ in committed_usage_on_invalidate] == [1]
+    assert client.get('/api/coupons/validate/PRODUTO').get_json()['coupon']['usage_count'] == 1
+
+
+def test_sweep_invalidates_after_commit(file_app, committed_usage_on_invalidate):
+    now = datetime.utcnow()
+    with file_app.app_context():
+        db.session.add(Coupon('AGENDADO', 10, now + timedelta(minutes=1), now + timedelta(days=1)))
+        db.session.commit()
+    client = file_app.test_client()
+    assert client.get('/api/coupons/AGENDADO').get_json()['status'] == Coupon.STATUS_SCHEDULED
+
+    with file_app.app_context():
+        CouponService.sweep_statuses(now + timedelta(minutes=2))
+
+    assert committed_usage_on_invalidate == [(0, Coupon.STATUS_VALID)]
@@ -0,0 +1,68 @@
+"""Usos concorrentes de cupom nunca passam de usage_limit (SQLite em arquivo, uma conexão por thread)."""
+import threading
+from datetime import datetime, timedelta
+
+from app.database import db
+from app.models.coupon import Coupon
+
+THREADS = 40
+USAGE_LIMIT = 25
+
+
+def create_coupon(app, code):
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.add(Coupon(code, 10, now - timedelta(days=1), now + timedelta(days=1), usage_limit=USAGE_LIMIT))
+        db.session.commit()
+
+
+def run_concurrently(attempt):
+    """Dispara `attempt` em THREADS threads ao mesmo tempo; devolve os resultados"""
+    barrier = threading.Barrier(THREADS)
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        barrier.wait()
+        outcome = attempt()
+        with lock:
+            results.append(outcome)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def usage_of(app, code):
+    with app.app_context():
+        coupon = Coupon.query.filter_by(code=code).one()
+        return coupon.usage_count, coupon.status
+
+
+def test_concurrent_redeem_stops_at_usage_limit(file_app):
+    create_coupon(file_app, 'ESTRESSE')
+
+    def attempt():
+        with file_app.app_context():
+            redeemed = Coupon.redeem('ESTRESSE')
+            db.session.commit()
+            return redeemed
+
+    results = run_concurrently(attempt)
+
+    assert results.count(True) == USAGE_LIMIT
+    assert usage_of(file_app, 'ESTRESSE') == (USAGE_LIMIT, Coupon.STATUS_EXHAUSTED)
+
+
+def test_concurrent_use_endpoint_stops_at_usage_limit(file_app):
+    create_coupon(file_app, 'ESTRESSEAPI')
+    client = file_app.test_client()
+
+    results = run_concurrently(lambda: client.post('/api/coupons/use/ESTRESSEAPI').status_code)
+
+    assert results.count(200) == USAGE_LIMIT
+    assert results.count(400) == THREADS - USAGE_LIMIT
+    assert usage_of(file_app, 'ESTRESSEAPI') == (USAGE_LIMIT, Coupon.STATUS_EXHAUSTED)
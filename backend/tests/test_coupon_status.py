@@ -0,0 +1,72 @@
+"""Situação dos cupons: varredura por tempo e indicadores calculados no momento da resposta."""
+from datetime import datetime, timedelta
+
+from app.database import db
+from app.models.coupon import Coupon
+from app.services.coupon_service import CouponService
+
+
+def create_coupon(app, code, valid_from, valid_until, usage_limit=10, usage_count=0, stored_status=None):
+    """Cria o cupom; stored_status grava uma coluna status desatualizada (como antes da varredura)"""
+    with app.app_context():
+        db.session.add(Coupon(code, 10, valid_from, valid_until, usage_limit=usage_limit, usage_count=usage_count))
+        db.session.commit()
+        if stored_status:
+            db.session.execute(db.update(Coupon).where(Coupon.code == code).values(status=stored_status))
+            db.session.commit()
+
+
+def stored_status(app, code):
+    with app.app_context():
+        return db.session.execute(db.select(Coupon.status).where(Coupon.code == code)).scalar()
+
+
+def test_sweep_expires_exhausted_coupon(app):
+    now = datetime.utcnow()
+    create_coupon(app, 'ESGOTADO', now - timedelta(days=10), now + timedelta(days=1), usage_limit=1, usage_count=1)
+    assert stored_status(app, 'ESGOTADO') == Coupon.STATUS_EXHAUSTED
+
+    with app.app_context():
+        result = CouponService.sweep_statuses(now + timedelta(days=2))
+
+    assert result == {'activated': 0, 'expired': 1}
+    assert stored_status(app, 'ESGOTADO') == Coupon.STATUS_EXPIRED
+
+
+def test_sweep_activates_and_expires(app):
+    now = datetime.utcnow()
+    create_coupon(app, 'AGENDADO', now + timedelta(hours=1), now + timedelta(days=1))
+    create_coupon(app, 'VIGENTE', now - timedelta(days=1), now + timedelta(hours=1))
+
+    with app.app_context():
+        result = CouponService.sweep_statuses(now + timedelta(hours=2))
+
+    assert result == {'activated': 1, 'expired': 1}
+    assert stored_status(app, 'AGENDADO') == Coupon.STATUS_VALID
+    assert stored_status(app, 'VIGENTE') == Coupon.STATUS_EXPIRED
+
+
+def test_serialized_flags_ignore_stale_stored_status(app, client):
+    now = datetime.utcnow()
+    # Já venceu, mas a varredura ainda não rodou
+    create_coupon(app, 'VENCIDO', now - timedelta(days=2), now - timedelta(days=1), stored_status=Coupon.STATUS_VALID)
+
+    coupon = client.get('/api/coupons/VENCIDO').get_json()
+
+    assert coupon['status'] == Coupon.STATUS_EXPIRED
+    assert coupon['is_expired'] is True
+    assert coupon['is_valid'] is False
+
+
+def test_validate_agrees_with_serialized_status(app, client):
+    now = datetime.utcnow()
+    # Já começou, mas a coluna ainda diz "agendado"
+    create_coupon(app, 'COMECOU', now - timedelta(minutes=1), now + timedelta(days=1),
+                  stored_status=Coupon.STATUS_SCHEDULED)
+
+    validation = client.get('/api/coupons/validate/COMECOU').get_json()
+
+    assert validation['valid'] is True
+    assert validation['coupon']['status'] == Coupon.STATUS_VALID
+    assert validation['coupon']['is_valid'] is True
+    assert validation['coupon']['is_not_started'] is False
@@ -0,0 +1,110 @@
+"""Janelas de desconto: ativação e expiração em lote por DiscountScheduleService.run_due."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import db
+from app.models.product import Product
+from app.models.product_coupon_application import ProductCouponApplication
+from app.services.discount_schedule_service import DiscountScheduleService
+
+NOW = datetime.utcnow()
+
+
+def create_product(app, configure):
+    with app.app_context():
+        product = Product(name='produto agendado', price=100, stock=5)
+        db.session.add(product)
+        db.session.flush()
+        configure(product)
+        db.session.commit()
+        return product.id
+
+
+def run_due(app, now):
+    with app.app_context():
+        return DiscountScheduleService.run_due(now)
+
+
+def product_state(app, product_id):
+    with app.app_context():
+        product = db.session.get(Product, product_id)
+        applications = ProductCouponApplication.query.filter_by(product_id=product_id).order_by(
+            ProductCouponApplication.id
+        ).all()
+        return product.to_dict() | {
+            'has_active_discount': product.has_active_discount,
+            'discount_percentage': product.discount_percentage,
+            'scheduled': (product.scheduled_discount_percentage, product.scheduled_discount_start,
+                          product.scheduled_discount_end, product.scheduled_coupon_id),
+        }, [(application.discount_percentage, application.discount_amount, application.is_active)
+            for application in applications]
+
+
+def with_current_discount(product, ends_at=None):
+    product.apply_percentage_discount(10, ends_at=ends_at)
+    db.session.add(ProductCouponApplication(product_id=product.id, discount_amount=10, discount_percentage=10))
+
+
+def test_future_window_is_activated(app):
+    def configure(product):
+        with_current_discount(product)
+        product.schedule_discount(20, NOW + timedelta(hours=1), NOW + timedelta(days=1))
+
+    product_id = create_product(app, configure)
+
+    assert run_due(app, NOW + timedelta(minutes=30)) == {'activated': 0, 'expired': 0}
+    assert run_due(app, NOW + timedelta(hours=2)) == {'activated': 1, 'expired': 0}
+
+    product, applications = product_state(app, product_id)
+    assert product['has_active_discount'] is True
+    assert product['discount_percentage'] == 20
+    assert product['finalPrice'] == 80
+    assert product['scheduled'] == (None, None, None, None)
+    # A aplicação anterior é desativada e a nova registrada
+    assert applications == [(10, 10, False), (20, 20, True)]
+
+
+def test_expired_window_is_reset(app):
+    product_id = create_product(app, lambda product: with_current_discount(product, NOW + timedelta(hours=1)))
+
+    assert run_due(app, NOW + timedelta(hours=2)) == {'activated': 0, 'expired': 1}
+
+    product, applications = product_state(app, product_id)
+    assert product['has_active_discount'] is False
+    assert product['discount_percentage'] == 0
+    assert product['finalPrice'] == product['price'] == 100
+    assert applications == [(10, 10, False)]
+
+
+def test_window_entirely_in_the_past_only_clears_the_schedule(app):
+    def configure(product):
+        product.schedule_discount(20, NOW + timedelta(hours=1), NOW + timedelta(hours=2))
+
+    product_id = create_product(app, configure)
+
+    assert run_due(app, NOW + timedelta(hours=3)) == {'activated': 0, 'expired': 0}
+
+    product, applications = product_state(app, product_id)
+    assert product['has_active_discount'] is False
+    assert product['finalPrice'] == 100
+    assert product['scheduled'] == (None, None, None, None)
+    assert applications == []
+
+
+@pytest.fixture
+def cached_listing(app, client):
+    def final_prices():
+        return [product['finalPrice'] for product in client.get('/api/products/').get_json()['data']]
+    return final_prices
+
+
+def test_scheduler_run_invalidates_listing_cache(app, cached_listing):
+    create_product(app, lambda product: product.schedule_discount(25, NOW + timedelta(hours=1)))
+    assert cached_listing() == [100]
+    before = app.extensions['product_list_cache'].generation
+
+    run_due(app, NOW + timedelta(hours=2))
+
+    assert app.extensions['product_list_cache'].generation > before
+    assert cached_listing() == [75]
@@ -0,0 +1,32 @@
+"""A cadeia de migrations sobe o dev.db versionado até a head, mesmo após o create_all do create_app()."""
+import os
+import shutil
+
+import sqlalchemy as sa
+from alembic.script import ScriptDirectory
+from flask_migrate import upgrade
+
+from app.database import db
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, 'migrations')
+
+
+def test_upgrade_dev_database_to_head(make_app, tmp_path):
+    database_path = tmp_path / 'dev.db'
+    shutil.copy(os.path.join(BACKEND_DIR, 'dev.db'), database_path)
+
+    # Como no `flask db upgrade`: o app (e o create_all) sobe antes do Alembic
+    app = make_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{database_path}')
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+
+        version = db.session.execute(db.text('SELECT version_num FROM alembic_version')).scalar()
+        inspector = sa.inspect(db.engine)
+        coupon_columns = {column['name'] for column in inspector.get_columns('coupons')}
+        application_indexes = {index['name'] for index in inspector.get_indexes('product_coupon_applications')}
+
+    assert version == ScriptDirectory(MIGRATIONS_DIR).get_current_head()
+    assert inspector.has_table('product_coupon_applications_archive')
+    assert 'status' in coupon_columns
+    assert 'idx_product_coupon_inactive_applied' in application_indexes
@@ -0,0 +1,50 @@
+"""Export de produtos: uma linha por produto e isOutOfStock igual ao do modelo."""
+import csv
+import io
+import json
+
+from app.database import db
+from app.models.product import Product
+from app.models.product_coupon_application import ProductCouponApplication
+
+
+def seed(app):
+    with app.app_context():
+        discounted = Product(name='com dois descontos', price=100, stock=5)
+        oversold = Product(name='estoque negativo', price=50, stock=1)
+        db.session.add_all([discounted, oversold])
+        db.session.flush()
+        # Duas aplicações ativas para o mesmo produto (ex.: gravadas por processos concorrentes)
+        db.session.add_all([
+            ProductCouponApplication(product_id=discounted.id, discount_amount=10, discount_percentage=10),
+            ProductCouponApplication(product_id=discounted.id, discount_amount=20, discount_percentage=20),
+        ])
+        db.session.execute(db.update(Product).where(Product.id == oversold.id).values(stock=-2))
+        db.session.commit()
+        return discounted.id, oversold.id
+
+
+def test_ndjson_export_has_one_row_per_product(app, client):
+    discounted_id, oversold_id = seed(app)
+
+    response = client.get('/api/products/export')
+    records = [json.loads(line) for line in response.data.decode().splitlines()]
+
+    assert [record['id'] for record in records] == [discounted_id, oversold_id]
+    # A aplicação mais antiga, a mesma exibida pela listagem
+    assert records[0]['discount']['percentage'] == 10
+    assert records[1]['isOutOfStock'] is True
+
+    listed = {product['id']: product for product in client.get('/api/products/').get_json()['data']}
+    assert listed[discounted_id]['discount_info']['discount_percentage'] == records[0]['discount']['percentage']
+
+
+def test_csv_export_has_one_row_per_product(app, client):
+    seed(app)
+
+    response = client.get('/api/products/export?format=csv')
+    rows = list(csv.DictReader(io.StringIO(response.data.decode())))
+
+    assert len(rows) == 2
+    assert rows[0]['discountPercentage'] == '10.0'
+    assert rows[1]['isOutOfStock'] == 'True'
@@ -0,0 +1,55 @@
+"""Cache da listagem de produtos: toda escrita confirmada no catálogo invalida (inclusive em lote)."""
+import json
+from datetime import datetime, timedelta
+
+from app.database import db
+from app.models.coupon import Coupon
+
+
+def listed_names(client):
+    return sorted(product['name'] for product in client.get('/api/products/').get_json()['data'])
+
+
+def generation(app):
+    return app.extensions['product_list_cache'].generation
+
+
+def import_ndjson(client, names, mode='insert'):
+    body = '\n'.join(json.dumps({'name': name, 'price': 10, 'stock': 5}) for name in names)
+    return client.post(f'/api/products/import?mode={mode}', data=body, content_type='application/x-ndjson')
+
+
+def test_insert_mode_import_invalidates_listing(app, client):
+    assert listed_names(client) == []
+
+    response = import_ndjson(client, ['importado 1', 'importado 2'])
+
+    assert response.status_code == 200
+    assert listed_names(client) == ['importado 1', 'importado 2']
+
+
+def test_upsert_mode_import_invalidates_listing(app, client):
+    import_ndjson(client, ['importado'])
+    assert listed_names(client) == ['importado']
+
+    response = import_ndjson(client, ['importado', 'novo'], mode='upsert')
+
+    assert response.status_code == 200
+    assert listed_names(client) == ['importado', 'novo']
+
+
+def test_bulk_writes_bump_generation_only_when_rows_change(app, client):
+    product_id = client.post('/api/products/', json={'name': 'produto', 'price': 10, 'stock': 1}).get_json()['id']
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.add(Coupon('ESGOTADO', 10, now - timedelta(days=1), now + timedelta(days=1), usage_count=1))
+        db.session.commit()
+
+    before = generation(app)
+    # UPDATE condicional que não afeta linhas (cupom esgotado): nada mudou no catálogo
+    assert client.post('/api/coupons/use/ESGOTADO').status_code == 400
+    assert generation(app) == before
+
+    assert client.post(f'/api/products/{product_id}/stock/reserve', json={'quantity': 1}).status_code == 200
+    assert generation(app) > before
+    assert client.get('/api/products/').get_json()['data'][0]['stock'] == 0
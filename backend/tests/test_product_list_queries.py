@@ -0,0 +1,58 @@
+"""A listagem de produtos faz um número fixo de queries por página, com ou sem descontos (sem N+1)."""
+import pytest
+
+from app.database import db
+from app.models.product import Product
+from app.models.product_coupon_application import ProductCouponApplication
+
+PRODUCTS = 30
+PAGE_SIZE = 10
+
+
+def seed_products(app, with_discounts):
+    with app.app_context():
+        products = [Product(name=f'produto {n:03d}', price=100 + n, stock=10) for n in range(PRODUCTS)]
+        db.session.add_all(products)
+        db.session.flush()
+        if with_discounts:
+            db.session.add_all(
+                ProductCouponApplication(product_id=product.id, discount_amount=10, discount_percentage=10)
+                for product in products
+            )
+        db.session.commit()
+
+
+def queries_per_page(app, client, count_queries):
+    counts = []
+    for page in range(1, PRODUCTS // PAGE_SIZE + 1):
+        with count_queries(app) as queries:
+            response = client.get(f'/api/products/?page={page}&limit={PAGE_SIZE}')
+        assert response.status_code == 200
+        assert len(response.get_json()['data']) == PAGE_SIZE
+        counts.append(len(queries))
+    return counts
+
+
+@pytest.fixture
+def uncached_app(make_app):
+    # Cada página precisa ir ao banco para ser contada
+    return make_app(PRODUCT_LIST_CACHE_ENABLED=False)
+
+
+def test_list_query_count_is_constant_per_page(uncached_app, make_app, count_queries):
+    seed_products(uncached_app, with_discounts=False)
+    without_discounts = queries_per_page(uncached_app, uncached_app.test_client(), count_queries)
+
+    discounted_app = make_app(PRODUCT_LIST_CACHE_ENABLED=False)
+    seed_products(discounted_app, with_discounts=True)
+    with_discounts = queries_per_page(discounted_app, discounted_app.test_client(), count_queries)
+
+    assert len(set(without_discounts)) == 1
+    assert with_discounts == without_discounts
+
+
+def test_list_returns_active_discount(uncached_app):
+    seed_products(uncached_app, with_discounts=True)
+    response = uncached_app.test_client().get(f'/api/products/?limit={PAGE_SIZE}')
+    products = response.get_json()['data']
+    assert all(product['has_active_discount'] for product in products)
@@ -0,0 +1,52 @@
+"""Leituras nas réplicas e read-after-write entre origens (cookie com credenciais no CORS)."""
+import shutil
+import sqlite3
+
+import pytest
+
+ORIGIN = 'http://localhost:5173'
+
+
+@pytest.fixture
+def replicated_app(make_app, tmp_path):
+    primary = tmp_path / 'primary.db'
+    app = make_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{primary}', SQLITE_PERFORMANCE_PROFILE=False)
+    app.test_client().post('/api/products/', json={'name': 'produto', 'price': 10, 'stock': 5})
+
+    # Réplica atrasada: cópia do primário com o nome divergente
+    replica = tmp_path / 'replica.db'
+    shutil.copy(primary, replica)
+    with sqlite3.connect(replica) as connection:
+        connection.execute("UPDATE products SET name = 'produto (réplica)'")
+
+    return make_app(
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{primary}',
+        SQLITE_PERFORMANCE_PROFILE=False,
+        DATABASE_REPLICA_URLS=[f'sqlite:///{replica}'],
+        REPLICA_HEALTH_CHECK_INTERVAL=3600,
+    )
+
+
+def product_name(client, **kwargs):
+    return client.get('/api/products/1', **kwargs).get_json()['name']
+
+
+def test_cross_origin_write_pins_reads_to_primary(replicated_app):
+    client = replicated_app.test_client()
+    assert product_name(client, headers={'Origin': ORIGIN}) == 'produto (réplica)'
+
+    preflight = client.options('/api/products/1', headers={
+        'Origin': ORIGIN, 'Access-Control-Request-Method': 'PATCH', 'Access-Control-Request-Headers': 'Content-Type'
+    })
+    assert preflight.headers['Access-Control-Allow-Credentials'] == 'true'
+
+    response = client.patch('/api/products/1', json={'name': 'produto', 'price': 10, 'stock': 3}, headers={'Origin': ORIGIN})
+    assert response.status_code == 200
+    assert response.headers['Access-Control-Allow-Origin'] == ORIGIN
+    assert response.headers['Access-Control-Allow-Credentials'] == 'true'
+    assert 'db_read_primary=' in response.headers['Set-Cookie']
+
+    # O test client devolve o cookie como o navegador com withCredentials
+    assert product_name(client, headers={'Origin': ORIGIN}) == 'produto'
+    # Outro cliente, sem o cookie, segue lendo da réplica
+    assert product_name(replicated_app.test_client()) == 'produto (réplica)'
@@ -0,0 +1,56 @@
+"""Tarefas periódicas sobem com o servidor (lifespan ASGI), não com o app nem com requisições."""
+import asyncio
+
+import pytest
+
+pytest.importorskip('asgiref')
+pytest.importorskip('aiosqlite')
+
+from app.asgi import CatalogAsgiApp  # noqa: E402
+
+SCHEDULERS = ('discount_scheduler', 'coupon_status_sweeper')
+
+
+@pytest.fixture
+def scheduled_app(make_app, tmp_path):
+    return make_app(
+        SQLALCHEMY_DATABASE_URI='sqlite:///' + str(tmp_path / 'test.db'),
+        DISCOUNT_SCHEDULER_ENABLED=True,
+        COUPON_STATUS_SWEEPER_ENABLED=True,
+    )
+
+
+def running(app):
+    return {name: app.extensions[name].running for name in SCHEDULERS}
+
+
+async def lifespan(asgi_app, app):
+    """Sobe o app ASGI, devolve o estado dos agendadores após a subida e encerra"""
+    messages = asyncio.Queue()
+    sent = []
+
+    async def send(message):
+        sent.append(message['type'])
+
+    task = asyncio.create_task(asgi_app({'type': 'lifespan'}, messages.get, send))
+    await messages.put({'type': 'lifespan.startup'})
+    while 'lifespan.startup.complete' not in sent:
+        await asyncio.sleep(0.01)
+    after_startup = running(app)
+
+    await messages.put({'type': 'lifespan.shutdown'})
+    await task
+    return after_startup, sent
+
+
+def test_create_app_and_requests_do_not_start_schedulers(scheduled_app):
+    scheduled_app.test_client().get('/api/products/')
+    assert running(scheduled_app) == {name: False for name in SCHEDULERS}
+
+
+def test_asgi_lifespan_starts_and_stops_schedulers(scheduled_app):
+    after_startup, sent = asyncio.run(lifespan(CatalogAsgiApp(scheduled_app), scheduled_app))
+
+    assert after_startup == {name: True for name in SCHEDULERS}
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+    assert running(scheduled_app) == {name: False for name in SCHEDULERS}
@@ -0,0 +1,106 @@
+"""Ajuste de estoque em lote: delta x absoluto, ordem dos itens, piso zero e relatório de ids/nomes desconhecidos."""
+from app.database import db
+from app.models.product import Product
+from app.services.product_service import ProductService
+
+
+def create_products(app, *stocks):
+    with app.app_context():
+        products = [Product(name=f'produto {n}', price=10, stock=stock) for n, stock in enumerate(stocks)]
+        db.session.add_all(products)
+        db.session.commit()
+        return [product.id for product in products]
+
+
+def stocks(app, product_ids):
+    with app.app_context():
+        rows = dict(db.session.execute(db.select(Product.id, Product.stock).where(Product.id.in_(product_ids))).all())
+    return [rows[product_id] for product_id in product_ids]
+
+
+def adjust(client, items, **extra):
+    response = client.post('/api/products/stock/batch', json={'items': items, **extra})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_delta_and_absolute_adjustments(app, client):
+    by_delta, by_stock, by_name = create_products(app, 10, 10, 10)
+
+    report = adjust(client, [
+        {'productId': by_delta, 'delta': -3},
+        {'productId': by_stock, 'stock': 42},
+        {'name': 'produto 2', 'delta': 5},
+    ])
+
+    assert report == {'received': 3, 'updated': 3, 'unknown': [], 'invalid': []}
+    assert stocks(app, [by_delta, by_stock, by_name]) == [7, 42, 15]
+
+
+def test_items_of_the_same_product_apply_in_order(app, client):
+    delta_then_stock, stock_then_delta = create_products(app, 10, 10)
+
+    report = adjust(client, [
+        {'productId': delta_then_stock, 'delta': 5},
+        {'productId': stock_then_delta, 'stock': 20},
+        {'productId': delta_then_stock, 'stock': 3},
+        {'productId': stock_then_delta, 'delta': -4},
+        {'name': 'produto 1', 'delta': 1},
+    ])
+
+    # Um UPDATE por produto, com o resultado da sequência
+    assert report['updated'] == 2
+    assert stocks(app, [delta_then_stock, stock_then_delta]) == [3, 17]
+
+
+def test_stock_never_goes_below_zero(app, client):
+    product_id, = create_products(app, 4)
+
+    adjust(client, [{'productId': product_id, 'delta': -10}])
+
+    assert stocks(app, [product_id]) == [0]
+
+
+def test_unknown_and_invalid_items_are_reported(app, client):
+    product_id, = create_products(app, 5)
+
+    report = adjust(client, [
+        {'productId': 99999, 'delta': 1},
+        {'name': 'não existe', 'stock': 1},
+        {'productId': product_id, 'name': 'produto 0', 'delta': 1},
+        {'productId': product_id},
+        {'productId': product_id, 'delta': 1, 'stock': 2},
+        {'productId': product_id, 'delta': 2},
+    ])
+
+    assert report['received'] == 6
+    assert report['updated'] == 1
+    assert report['unknown'] == [{'index': 0, 'productId': 99999}, {'index': 1, 'name': 'não existe'}]
+    assert [entry['index'] for entry in report['invalid']] == [2, 3, 4]
+    assert stocks(app, [product_id]) == [7]
+
+
+def test_chunk_size_smaller_than_payload(app, client, count_queries):
+    product_ids = create_products(app, *[10] * 7)
+    items = [{'productId': product_id, 'delta': n} for n, product_id in enumerate(product_ids)]
+
+    with count_queries(app) as queries:
+        report = adjust(client, items, chunkSize=3)
+
+    assert report['updated'] == 7
+    assert stocks(app, product_ids) == [10 + n for n in range(7)]
+    # 7 produtos em blocos de 3: três SELECTs de resolução e três UPDATEs executemany
+    assert sum(statement.lstrip().upper().startswith('SELECT') for statement in queries.statements) == 3
+    assert sum(statement.lstrip().upper().startswith('UPDATE') for statement in queries.statements) == 3
+
+
+def test_database_errors_return_500(app, client, monkeypatch):
+    def fail(items, chunk_size):
+        raise RuntimeError('banco indisponível')
+
+    monkeypatch.setattr(ProductService, 'adjust_stock_batch', staticmethod(fail))
+
+    response = client.post('/api/products/stock/batch', json={'items': [{'productId': 1, 'delta': 1}]})
+
+    assert response.status_code == 500
+    assert response.get_json() == {'error': 'banco indisponível'}
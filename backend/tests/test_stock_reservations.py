@@ -0,0 +1,88 @@
+"""Reservas de estoque concorrentes não vendem além do estoque (SQLite em arquivo, uma conexão por thread)."""
+import threading
+
+from app.database import db
+from app.models.product import Product
+
+THREADS = 32
+INITIAL_STOCK = 100
+
+
+def create_product(app, stock):
+    with app.app_context():
+        product = Product(name='estoque disputado', price=10, stock=stock)
+        db.session.add(product)
+        db.session.commit()
+        return product.id
+
+
+def remaining_stock(app, product_id):
+    with app.app_context():
+        return db.session.execute(db.select(Product.stock).where(Product.id == product_id)).scalar()
+
+
+def reserve_until_sold_out(client, product_id, quantity_of):
+    """Cada thread reserva até receber 409 com o estoque zerado; devolve (unidades reservadas, erros)"""
+    barrier = threading.Barrier(THREADS)
+    lock = threading.Lock()
+    totals = {'reserved': 0, 'errors': 0}
+
+    def worker(seed):
+        reserved = errors = 0
+        attempt = 0
+        barrier.wait()
+        while errors <= 10:
+            quantity = quantity_of(seed, attempt)
+            attempt += 1
+            response = client.post(f'/api/products/{product_id}/stock/reserve', json={'quantity': quantity})
+            if response.status_code == 200:
+                reserved += quantity
+            elif response.status_code == 409:
+                if response.get_json()['stock'] == 0:
+                    break
+            else:
+                errors += 1
+        with lock:
+            totals['reserved'] += reserved
+            totals['errors'] += errors
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return totals
+
+
+def test_concurrent_reservations_never_oversell(file_app):
+    product_id = create_product(file_app, INITIAL_STOCK)
+
+    # Pedidos de 1 a 3 unidades: perto do fim, alguns não cabem no que resta
+    totals = reserve_until_sold_out(file_app.test_client(), product_id, lambda seed, attempt: 1 + (seed + attempt) % 3)
+    final_stock = remaining_stock(file_app, product_id)
+
+    assert totals['errors'] == 0
+    assert final_stock >= 0
+    assert totals['reserved'] == INITIAL_STOCK - final_stock
+    assert final_stock == 0
+    assert totals['reserved'] == INITIAL_STOCK
+
+
+def test_concurrent_reserve_and_release_keep_stock_consistent(file_app):
+    product_id = create_product(file_app, INITIAL_STOCK)
+    client = file_app.test_client()
+    barrier = threading.Barrier(THREADS)
+
+    def worker():
+        barrier.wait()
+        for _ in range(5):
+            if client.post(f'/api/products/{product_id}/stock/reserve', json={'quantity': 2}).status_code == 200:
+                client.post(f'/api/products/{product_id}/stock/release', json={'quantity': 2})
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert remaining_stock(file_app, product_id) == INITIAL_STOCK
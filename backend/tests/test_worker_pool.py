@@ -0,0 +1,61 @@
+"""Workers e pool por worker derivados do orçamento de conexões (servidor de produção, wsgi.py)."""
+import pytest
+
+from app.database import worker_concurrency, worker_engine_options
+
+
+@pytest.fixture
+def cpus(monkeypatch):
+    def set_cpus(count):
+        monkeypatch.setattr('app.database.os.cpu_count', lambda: count)
+    return set_cpus
+
+
+def sized(**config):
+    config.setdefault('WEB_THREADS', 4)
+    config['WEB_CONCURRENCY'], config['WEB_THREADS'] = worker_concurrency(config)
+    return config, worker_engine_options(config)
+
+
+@pytest.mark.parametrize('cpu_count', [1, 4, 8, 16, 64])
+def test_default_workers_fit_the_budget(cpus, cpu_count):
+    cpus(cpu_count)
+    config, options = sized(DB_CONNECTION_BUDGET=30)
+
+    assert 1 <= config['WEB_CONCURRENCY'] <= cpu_count * 2 + 1
+    assert options['pool_size'] >= config['WEB_THREADS'] == 4
+    assert config['WEB_CONCURRENCY'] * options['pool_size'] <= 30
+    assert options['max_overflow'] == 0
+
+
+def test_explicit_workers_are_clamped_with_warning(caplog):
+    config, options = sized(DB_CONNECTION_BUDGET=30, WEB_CONCURRENCY=20)
+
+    assert (config['WEB_CONCURRENCY'], options['pool_size']) == (7, 4)
+    assert 'WEB_CONCURRENCY=20 reduzido para 7' in caplog.text
+
+
+def test_budget_smaller_than_threads_reduces_threads():
+    config, options = sized(DB_CONNECTION_BUDGET=2, WEB_CONCURRENCY=3)
+
+    assert (config['WEB_CONCURRENCY'], config['WEB_THREADS'], options['pool_size']) == (1, 2, 2)
+
+
+def test_no_budget_keeps_workers_and_pool(cpus):
+    cpus(16)
+    config, options = sized(SQLALCHEMY_ENGINE_OPTIONS={'pool_size': 10})
+
+    assert config['WEB_CONCURRENCY'] == 33
+    assert options == {'pool_size': 10}
+
+
+def test_create_app_on_many_cores_does_not_fail(cpus, make_app, tmp_path):
+    cpus(32)
+    app = make_app(
+        SQLALCHEMY_DATABASE_URI='sqlite:///' + str(tmp_path / 'prod.db'),
+        DB_CONNECTION_BUDGET=30,
+        WEB_CONCURRENCY=None,
+    )
+
+    assert app.config['WEB_CONCURRENCY'] == 7
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_size'] == 4
@@ -0,0 +1,71 @@
+from app import create_app
+from app.database import db
+from app.utils.scheduler import start_schedulers
+import os
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # gunicorn é opcional; só o servidor de produção depende dele (Linux/Mac)
+    BaseApplication = object
+
+# Servidor de produção: python wsgi.py (gunicorn com workers pré-forkados).
+# O app é carregado uma vez no processo mestre (preload) e herdado pelos workers.
+app = create_app(os.environ.get('APP_CONFIG', 'config.ProductionConfig'))
+
+
+def dispose_engines(close=True):
+    """Descarta as conexões dos pools de todos os engines (primário e réplicas)"""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=close)
+
+
+def post_fork(server, worker):
+    # Conexões abertas no mestre (create_all) não podem ser compartilhadas entre processos:
+    # o worker esquece as herdadas sem fechá-las e abre as próprias sob demanda
+    dispose_engines(close=False)
+    # Tarefas periódicas por worker (threads não sobrevivem ao fork; o mestre não as inicia)
+    start_schedulers(app)
+
+
+class ProductionServer(BaseApplication):
+    """Gunicorn embutido, configurado a partir do app (WEB_CONCURRENCY, WEB_THREADS)"""
+
+    def __init__(self, application, options):
+        self.application = application
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
+
+
+def main():
+    if BaseApplication is object:
+        raise RuntimeError("Servidor de produção requer gunicorn (pip install gunicorn)")
+
+    threads = app.config['WEB_THREADS']
+    options = {
+        'bind': f"0.0.0.0:{os.environ.get('PORT', 5000)}",
+        'workers': app.config['WEB_CONCURRENCY'],
+        'threads': threads,
+        'worker_class': 'gthread' if threads > 1 else 'sync',
+        'preload_app': True,
+        'post_fork': post_fork,
+        'accesslog': '-',
+    }
+
+    # O mestre não atende requisições: fecha as conexões abertas durante o carregamento
+    dispose_engines()
+
+    pool = app.config['SQLALCHEMY_ENGINE_OPTIONS'].get('pool_size', 'padrão')
+    print(f"Product Management API: {options['workers']} workers x {threads} threads, pool de {pool} conexões por worker")
+    ProductionServer(app, options).run()
+
+
+if __name__ == '__main__':
+    main()